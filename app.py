@@ -1,169 +1,663 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 import numpy as np
 
+from cache_scores import cle_cache, ecrire_scores, lire_dernier, lire_scores
+from cube import construire_cube, cube_incremental, distribution
+from chargement import COLONNE_GROUPE, TAILLE_MORCEAU, assembler_catalogue, empreinte_donnees, lire_catalogue
+from electre import (CLASSES, LAMBDAS, SEUILS_NUTRITION, classes_depuis_concordances, classes_depuis_credibilites,
+                     construire_profils_groupes, credibilites_catalogue, masques_catalogue, matrice_criteres,
+                     profils_en_tableau, stabilite_lambda, suffixe_lambda)
+from nutriscore import GRADES as NUTRI_GRADES, grade_nutriscore, points_nutriscore
+from export import EXTENSIONS, LIGNES_MAX_XLSX, TYPES_MIME, exporter
+from figures import CacheFigures
+from grille import COLONNES_NOTES, TAILLE_PAGE, GrilleProduits
+from mesures import Journal, cache_mesure, compter_cache, debut_rerun, etape, jalon
+from profils import ProfilsELECTRE, profils_communs
+from recherche import IndexRecherche
+from recommandation import K_DEFAUT, Recommandeur
+from robustesse import CONCENTRATION_DEFAUT, acceptabilite_classes
+from scoring import regles_depuis_masque, score_incremental, supernutri_produit
+
 st.set_page_config(page_title="SuperNutri-Score", page_icon="🥖", layout="wide")
+mesures_rerun = debut_rerun()
 
 st.markdown('<h1 style="text-align:center;color:#1f77b4;">🥖 SuperNutri-Score - Interface Consommateur</h1>', 
             unsafe_allow_html=True)
 
-# Chargement données
-@st.cache_data
+# Plage du curseur λ
+LAMBDA_MIN, LAMBDA_MAX = 0.5, 1.0
+CLASSES_LIBELLES = np.array(CLASSES, dtype=object)
+
+# Catalogues sources: un groupe par fichier
+FICHIERS = {"Pains": "Products.csv", "Yaourts": "data_yaourt.csv"}
+ICONES = {"Pains": "🥖", "Yaourts": "🥛"}
+COULEURS_GROUPES = ['#3498db', '#e74c3c', '#2ecc71', '#9b59b6', '#e67e22', '#1abc9c', '#34495e', '#f1c40f']
+NOMS_COLONNES_GROUPES = {COLONNE_GROUPE: "Fichier source", 'category': "Catégorie"}
+PAGES = [
+    "📖 Transparence des Algorithmes",
+    "🧮 Calculateur Complet",
+    "🧮 Calculator (English)",
+    "📊 Analyse de Données", 
+    "⚖️ Comparaison Groupes"
+]
+# Pages qui n'utilisent ni le catalogue ni les scores
+PAGES_SANS_DONNEES = {"📖 Transparence des Algorithmes"}
+
+# Chargement données (cache_resource: le catalogue est partagé, jamais copié ni modifié).
+# Sans indicateur Streamlit: ces fonctions tournent aussi dans le fil de préchauffage
+@cache_mesure(st.cache_resource(show_spinner=False))
 def load_data():
+    """Charge les catalogues (colonnes utiles, types compacts, par morceaux) en un seul.
+    
+    Seule l'absence des fichiers bascule sur des données d'exemple; toute autre
+    erreur de lecture est levée.
+    """
     try:
-        pain = pd.read_csv("Products.csv", encoding='utf-8-sig')
-        yaourt = pd.read_csv("data_yaourt.csv", encoding='utf-8-sig')
-        return pain, yaourt, True
-    except:
-        pain = pd.DataFrame({'product_name': [f'Pain {i}' for i in range(121)],
-                            'nutriscore_grade': np.random.choice(['A','B','C','D','E'], 121),
-                            'ecoscore_grade': np.random.choice(['A','B','C','D','E'], 121)})
-        yaourt = pd.DataFrame({'product_name': [f'Yaourt {i}' for i in range(208)],
-                              'nutriscore_grade': np.random.choice(['A','B','C','D','E'], 208),
-                              'ecoscore_grade': np.random.choice(['A','B','C','D','E'], 208)})
-        return pain, yaourt, False
-
-# Fonctions ELECTRE TRI
-def concordance_partielle(H, b, crit, sens_dict):
-    if sens_dict[crit] == 'max':
-        return 1 if H[crit] >= b[crit] else 0
+        catalogues, rapports = {}, []
+        for groupe, chemin in FICHIERS.items():
+            catalogues[groupe], rapport = lire_catalogue(chemin)
+            rapports.append(rapport)
+        return assembler_catalogue(catalogues), True, rapports
+    except FileNotFoundError:
+        catalogues = {groupe: pd.DataFrame({
+            'product_name': [f'{groupe} {i}' for i in range(n)],
+            'nutriscore_grade': np.random.choice(['A','B','C','D','E'], n),
+            'ecoscore_grade': np.random.choice(['A','B','C','D','E'], n)})
+            for groupe, n in zip(FICHIERS, (121, 208))}
+        return assembler_catalogue(catalogues), False, []
+
+@cache_mesure(st.cache_resource(show_spinner=False))
+def get_profils(empreinte, _catalogue, reprendre=False):
+    """Profils π1…π6 communs à tout le catalogue, calculés une fois par jeu de données
+    
+    Avec `reprendre`, les profils communs du dernier calcul sur disque sont conservés
+    tant que les nouvelles données ne les déplacent pas au-delà de TOLERANCE_PROFILS:
+    seules les lignes modifiées sont alors recalculées (voir calculate_all_scores).
+    """
+    return ProfilsELECTRE(profils_communs(_catalogue, reprendre), empreinte)
+
+@cache_mesure(st.cache_resource)
+def get_profils_groupes(empreinte, _catalogue, colonne):
+    """Profils π1…π6 de chaque groupe de `colonne`, en une passe de quantiles"""
+    return {groupe: profils_en_tableau(profils)
+            for groupe, profils in construire_profils_groupes(_catalogue, colonne).items()}
+
+def colonnes_cubes(df):
+    """Colonnes de regroupement pour lesquelles un cube des grades est gardé"""
+    return [c for c in NOMS_COLONNES_GROUPES if c in df.columns]
+
+@cache_mesure(st.cache_resource(show_spinner=False))
+def calculate_all_scores(empreinte, _catalogue, colonne_profils=None):
+    """Calcule ELECTRE TRI et SuperNutri-Score pour tous les produits
+    
+    Le cache est indexé par l'empreinte des données (pas de hachage des DataFrames).
+    colonne_profils=None: profils communs; sinon profils propres à chaque groupe
+    de cette colonne, les groupes étant classés en parallèle.
+    Retourne (catalogue scoré, concordances N × 6 × 2, profils {groupe: P}, rapport, cubes)
+    où les concordances permettent de reclasser pour n'importe quel λ sans
+    recalcul, le rapport donne le nombre de lignes réutilisées / recalculées, et
+    cubes = {colonne: cube des grades} pour chaque colonne de regroupement.
+    Les résultats sont aussi gardés sur disque (cache_scores): un redémarrage
+    avec les mêmes données et le même modèle ne recalcule rien, et si seules
+    quelques lignes ont changé depuis le dernier calcul (mêmes profils), seules
+    ces lignes sont recalculées et les cubes mis à jour par différence.
+    """
+    if colonne_profils is None:
+        profils = {None: get_profils(empreinte, _catalogue, reprendre=True).P}
     else:
-        return 1 if H[crit] <= b[crit] else 0
-
-def concordance_globale(H, b, poids_dict, sens_dict):
-    num = sum(poids_dict[c] * concordance_partielle(H, b, c, sens_dict) for c in poids_dict)
-    denom = sum(poids_dict.values())
-    return num / denom
-
-@st.cache_data
-def calculate_all_scores(df_pain, df_yaourt):
-    """Calcule ELECTRE TRI et SuperNutri-Score pour tous les produits"""
-    
-    # Paramètres fixes
-    poids = {
-        'energy_kj': 2, 'saturated_fat': 2, 'sugar': 2, 'sodium_g': 1,
-        'protein': 1, 'fiber': 1, 'fruits_veg_nuts_pct': 1, 'additives_count': 1
-    }
-    
-    sens = {
-        'energy_kj': 'min', 'saturated_fat': 'min', 'sugar': 'min', 'sodium_g': 'min',
-        'protein': 'max', 'fiber': 'max', 'fruits_veg_nuts_pct': 'max', 'additives_count': 'min'
-    }
-    
-    criteres = list(poids.keys())
-    quantiles = [0.05, 0.2, 0.4, 0.6, 0.8, 0.95]
-    
-    # Calcul profils
-    profils = {}
-    for i, q in enumerate(quantiles, start=1):
-        profils[f"pi{i}"] = {}
-        for crit in criteres:
-            if crit in df_pain.columns and crit in df_yaourt.columns:
-                data = pd.concat([df_pain[crit], df_yaourt[crit]]).dropna()
-                if sens[crit] == 'max':
-                    profils[f"pi{i}"][crit] = float(data.quantile(q))
-                else:
-                    profils[f"pi{i}"][crit] = float(data.quantile(1-q))
+        profils = get_profils_groupes(empreinte, _catalogue, colonne_profils)
+    groupes = np.array(["" if g is None else str(g) for g in profils])
+    P = np.stack(list(profils.values()))
+    colonnes = colonnes_cubes(_catalogue)
+    
+    cle = cle_cache(f"{empreinte}/{colonne_profils}", P)
+    with etape("cache disque: lecture"):
+        en_cache = lire_scores(cle)
+    if en_cache is not None:
+        tables, tableaux = en_cache
+        rapport = {'reutilisees': len(tables['catalogue']), 'recalculees': 0}
+        cubes = {c: (tableaux[f'cube_{c}'], tableaux[f'groupes_cube_{c}']) for c in colonnes}
+        return tables['catalogue'], tableaux['conc'], profils, rapport, cubes
+    
+    # Base incrémentale: dernier calcul fait avec les mêmes profils
+    base = None
+    with etape("cache disque: base incrémentale"):
+        precedent = lire_dernier()
+    if precedent is not None:
+        tables, tableaux = precedent
+        if np.array_equal(tableaux['groupes'], groupes) and np.array_equal(tableaux['profils'], P):
+            base = (tables['catalogue'], tableaux['conc'], tableaux['empreintes'])
+    
+    jobs = (os.cpu_count() or 1) if len(_catalogue) >= TAILLE_MORCEAU else 1
+    with etape("scores"):
+        df_calc, conc, empreintes, rapport = score_incremental(
+            _catalogue, profils if colonne_profils else profils[None], base, colonne_profils, jobs=jobs)
+    
+    # Cubes des grades: mis à jour par différence si le précédent en a pour cette colonne
+    cubes = {}
+    with etape("cubes"):
+        for c in colonnes:
+            if base is not None and f'cube_{c}' in tableaux:
+                precedent_cube = (tableaux[f'cube_{c}'], np.asarray(tableaux[f'groupes_cube_{c}'], dtype=object))
+                cubes[c] = cube_incremental(precedent_cube, base[0], df_calc, rapport['sources'], c)
             else:
-                defaults = {
-                    'energy_kj': [2000, 1500, 1200, 1100, 1050, 1000],
-                    'saturated_fat': [10, 5, 2, 1, 0.5, 0.3],
-                    'sugar': [18, 8, 4, 3, 2.5, 2],
-                    'sodium_g': [1.0, 0.7, 0.5, 0.4, 0.4, 0.35],
-                    'protein': [7, 8, 9, 10, 11, 12],
-                    'fiber': [0, 2.5, 4, 5.5, 8.5, 9.5],
-                    'fruits_veg_nuts_pct': [0, 0, 0, 0, 5, 12],
-                    'additives_count': [12, 7, 4, 1, 0, 0]
-                }
-                profils[f"pi{i}"][crit] = defaults[crit][i-1]
-    
-    def classify_product(row, lambda_val):
-        """Classifie un produit avec ELECTRE TRI"""
-        produit = {crit: row.get(crit, 0) for crit in criteres}
-        
-        # Pessimiste
-        classe_pess = "E'"
-        for i in reversed(range(1, 6)):
-            c = concordance_globale(produit, profils[f"pi{i}"], poids, sens)
-            if c >= lambda_val:
-                classe_pess = ["E'", "D'", "C'", "B'", "A'"][i-1]
-                break
-        
-        # Optimiste
-        classe_opt = "A'"
-        for i in range(2, 7):
-            b = profils[f"pi{i-1}"]
-            c_biH = concordance_globale(b, produit, poids, sens)
-            c_Hbi = concordance_globale(produit, b, poids, sens)
-            if c_biH >= lambda_val and c_Hbi < lambda_val:
-                classe_opt = ["E'", "D'", "C'", "B'", "A'"][i-2]
-                break
-        
-        return classe_pess, classe_opt
-    
-    def calculate_supernutri(row, electre_pess_06):
-        """Calcule SuperNutri-Score"""
-        map_in = {"A'":1, "B'":2, "C'":3, "D'":4, "E'":5}
-        map_out = {1:"A", 2:"B", 3:"C", 4:"D", 5:"E"}
-        
-        score = map_in[electre_pess_06]
-        eco = str(row.get('ecoscore_grade', 'C')).upper()
-        is_bio = str(row.get('is_organic', 'No')).lower() in ['yes', 'oui', '1', 'true']
-        
-        if eco == "A" and score > 1:
-            score -= 1
-        if eco in ["D", "E"] and score < 5:
-            score += 1
-        if is_bio and eco != "E" and score > 1:
-            score -= 1
-        if eco == "E":
-            score = max(score, 3)
-        
-        score = max(1, min(5, score))
-        return map_out[score]
-    
-    # Calculer pour les pains
-    df_pain_calc = df_pain.copy()
-    df_pain_calc[['electre_pess_06', 'electre_opt_06']] = df_pain_calc.apply(
-        lambda row: classify_product(row, 0.6), axis=1, result_type='expand')
-    df_pain_calc[['electre_pess_07', 'electre_opt_07']] = df_pain_calc.apply(
-        lambda row: classify_product(row, 0.7), axis=1, result_type='expand')
-    df_pain_calc['supernutri_score'] = df_pain_calc.apply(
-        lambda row: calculate_supernutri(row, row['electre_pess_06']), axis=1)
-    
-    # Calculer pour les yaourts
-    df_yaourt_calc = df_yaourt.copy()
-    df_yaourt_calc[['electre_pess_06', 'electre_opt_06']] = df_yaourt_calc.apply(
-        lambda row: classify_product(row, 0.6), axis=1, result_type='expand')
-    df_yaourt_calc[['electre_pess_07', 'electre_opt_07']] = df_yaourt_calc.apply(
-        lambda row: classify_product(row, 0.7), axis=1, result_type='expand')
-    df_yaourt_calc['supernutri_score'] = df_yaourt_calc.apply(
-        lambda row: calculate_supernutri(row, row['electre_pess_06']), axis=1)
-    
-    return df_pain_calc, df_yaourt_calc
-
-df_pain, df_yaourt, is_real = load_data()
-
-# Calculer tous les scores
-if is_real:
-    df_pain, df_yaourt = calculate_all_scores(df_pain, df_yaourt)
-    st.success("✅ Données chargées et scores calculés!")
-else:
-    st.warning("⚠️ Données d'exemple. Ajoutez Products.csv et data_yaourt.csv pour les vraies données.")
+                cubes[c] = construire_cube(df_calc, c)
+    
+    with etape("cache disque: écriture"):
+        ecrire_scores(cle, {'catalogue': df_calc},
+                      {'conc': conc, 'empreintes': empreintes, 'profils': P, 'groupes': groupes,
+                       **{f'cube_{c}': cube for c, (cube, _) in cubes.items()},
+                       **{f'groupes_cube_{c}': np.asarray(g, dtype=str) for c, (_, g) in cubes.items()}})
+    return df_calc, conc, profils, rapport, cubes
+
+@cache_mesure(st.cache_data)
+def calculate_stabilite(empreinte, groupe, _conc):
+    """Classes sur toute la plage de λ du curseur et λ de changement par produit"""
+    return stabilite_lambda(_conc, LAMBDA_MIN, LAMBDA_MAX)
+
+@cache_mesure(st.cache_data)
+def calculate_credibilites(empreinte, groupe, _df, _P):
+    """Indices de crédibilité ELECTRE TRI complet (seuils SEUILS_NUTRITION)"""
+    return credibilites_catalogue(matrice_criteres(_df), _P, SEUILS_NUTRITION)
+
+@cache_mesure(st.cache_data)
+def calculate_robustesse(empreinte, groupe, n_tirages, lambda_val, procedure, mode, concentration, _df, _P):
+    """Acceptabilité des classes A'…E' sous tirages aléatoires des poids (N × 5)"""
+    masques = masques_catalogue(matrice_criteres(_df), _P)
+    return acceptabilite_classes(masques, n_tirages, lambda_val, procedure, mode, concentration, seed=0)
+
+@cache_mesure(st.cache_resource)
+def get_index_recherche(empreinte, colonne_profils, _catalogue):
+    """Index de recherche (codes-barres, noms, marques) du catalogue scoré, construit une fois par version"""
+    return IndexRecherche(_catalogue)
+
+@cache_mesure(st.cache_resource)
+def get_recommandeur(empreinte, colonne_profils, colonne, _catalogue, _P):
+    """Arbres k-d par grade SuperNutri (et par groupe de `colonne`), construits une fois par version"""
+    return Recommandeur(_catalogue, _P, colonne)
+
+@cache_mesure(st.cache_resource)
+def get_grille(empreinte, colonne_profils, colonne, _catalogue):
+    """Catalogue scoré rangé en colonnes codées pour la grille paginée, une fois par version"""
+    return GrilleProduits(_catalogue, colonne)
+
+@st.cache_resource
+def get_cache_figures():
+    """Cache LRU des figures Plotly, commun à toutes les sessions"""
+    return CacheFigures()
+
+@st.cache_resource
+def get_journal_mesures():
+    """Durées par page et trace JSONL des rafraîchissements, communes à toutes les sessions"""
+    return Journal()
+
+def empreinte_catalogue(catalogue, rapports):
+    """Empreinte du jeu de données: clé des caches de profils et de scores"""
+    if rapports:
+        return "+".join(r['empreinte'] for r in rapports)
+    return empreinte_donnees(catalogue)
+
+def prechauffer(etat):
+    """Chargement, profils, scores et grille de la page Analyse, avec les réglages par défaut.
+
+    Appels avec les mêmes arguments positionnels que les pages: mêmes clés de cache.
+    Une exception est journalisée et gardée dans etat['erreur'].
+    """
+    try:
+        catalogue, is_real, rapports = load_data()
+        empreinte = empreinte_catalogue(catalogue, rapports)
+        get_profils(empreinte, catalogue, reprendre=is_real)
+        if is_real:
+            catalogue = calculate_all_scores(empreinte, catalogue, None)[0]
+            get_grille(empreinte, None, COLONNE_GROUPE, catalogue)
+    except Exception as erreur:
+        logging.getLogger(__name__).exception("Échec du préchauffage des données")
+        etat['erreur'] = erreur
+
+@st.cache_resource
+def get_etat_prechauffage():
+    """Erreur du préchauffage, relevée par la première page qui a besoin des données"""
+    return {'erreur': None}
+
+def relever_erreur_prechauffage():
+    """Relève (une seule fois) l'exception levée par le fil de préchauffage"""
+    erreur = get_etat_prechauffage()['erreur']
+    if erreur is not None:
+        get_etat_prechauffage()['erreur'] = None
+        raise erreur
+
+@st.cache_resource
+def get_prechauffage():
+    """Fil qui remplit les caches des données pendant l'affichage d'une page qui n'en a pas besoin.
+
+    Lancé une fois par processus. Une page qui demande les données avant la fin
+    attend le calcul en cours (verrou par clé des caches Streamlit) au lieu de le refaire.
+    """
+    fil = threading.Thread(target=prechauffer, args=(get_etat_prechauffage(),), name="prechauffage", daemon=True)
+    fil.start()
+    return fil
 
 # Sidebar Navigation
+jalon("navigation")
 st.sidebar.title("📊 Navigation")
-page = st.sidebar.radio("", [
-    "📖 Transparence des Algorithmes",
-    "🧮 Calculateur Complet",
-    "🧮 Calculator (English)",
-    "📊 Analyse de Données", 
-    "⚖️ Comparaison Groupes"
-])
+page = st.sidebar.radio("", PAGES)
+
+if page in PAGES_SANS_DONNEES:
+    # Affichée sans attendre le chargement ni les scores, préparés en arrière-plan
+    get_prechauffage()
+    # Les widgets des groupes ne sont pas affichés: leur valeur est gardée pour les autres pages
+    for cle in ('colonne_groupes', 'profils_par_groupe'):
+        if cle in st.session_state:
+            st.session_state[cle] = st.session_state[cle]
+else:
+    # Plotly n'est importé que par les pages qui tracent des figures
+    import plotly.graph_objects as go
+    
+    jalon("chargement")
+    relever_erreur_prechauffage()
+    with st.spinner("Chargement des données…"):
+        catalogue, is_real, rapports_chargement = load_data()
+        empreinte = empreinte_catalogue(catalogue, rapports_chargement)
+        jalon("profils")
+        profils_electre = get_profils(empreinte, catalogue, reprendre=is_real)
+    
+    # Groupes affichés par les pages Analyse et Comparaison, et profils utilisés
+    with st.sidebar.expander("🗂️ Groupes et profils"):
+        colonne_groupes = st.selectbox(
+            "Groupes", [c for c in NOMS_COLONNES_GROUPES if c in catalogue.columns],
+            format_func=NOMS_COLONNES_GROUPES.get, key="colonne_groupes")
+        profils_par_groupe = st.checkbox("Profils ELECTRE propres à chaque groupe", value=False,
+                                         key="profils_par_groupe")
+    colonne_profils = colonne_groupes if profils_par_groupe else None
+    
+    # Calculer tous les scores
+    jalon("scores")
+    if is_real:
+        with st.spinner("Calcul des scores…"):
+            catalogue, conc_catalogue, profils_groupes, rapport_scores, cubes = calculate_all_scores(
+                empreinte, catalogue, colonne_profils)
+        st.success("✅ Données chargées et scores calculés!")
+    else:
+        cubes = {c: construire_cube(catalogue, c) for c in colonnes_cubes(catalogue)}
+        st.warning("⚠️ Données d'exemple. Ajoutez Products.csv et data_yaourt.csv pour les vraies données.")
+    
+    # Lignes de chaque groupe affiché
+    jalon("groupes")
+    indices_groupes = catalogue.groupby(colonne_groupes, observed=True).indices
+    groupes = list(indices_groupes)
+    
+    # Rapport de chargement (mémoire et temps par fichier)
+    if rapports_chargement:
+        with st.sidebar.expander("💾 Chargement des données"):
+            for r in rapports_chargement:
+                st.caption(f"**{r['fichier']}**: {r['lignes']} lignes × {r['colonnes']} colonnes, "
+                           f"{r['memoire_mo']:.2f} Mo en {r['duree_s']:.2f} s")
+            st.caption(f"Scores: {rapport_scores['reutilisees']} lignes réutilisées, "
+                       f"{rapport_scores['recalculees']} recalculées")
+            stats = get_cache_figures().statistiques()
+            st.caption(f"Figures: {stats['entrees']} en cache ({stats['octets'] / 2 ** 20:.1f} Mo), "
+                       f"{stats['succes']} relues, {stats['echecs']} construites")
+
+def vue_groupe(groupe):
+    """(produits, concordances, profils P, clé de vue) d'un groupe affiché"""
+    positions = indices_groupes[groupe]
+    P = profils_groupes[groupe if colonne_profils else None] if is_real else profils_electre.P
+    cle = f"{colonne_groupes}:{colonne_profils}:{groupe}"
+    return catalogue.iloc[positions], conc_catalogue[positions] if is_real else None, P, cle
+
+def comptes_grades(groupe, methode):
+    """Nombre de produits par grade (5 valeurs) de `methode` dans un groupe affiché, lu dans le cube"""
+    return distribution(cubes[colonne_groupes], groupe, methode)
+
+def libelle_groupe(groupe):
+    return f"{ICONES.get(groupe, '📦')} {groupe}"
 
 COLORS = {'A':'#038141','B':'#85BB2F','C':'#FECB02','D':'#EE8100','E':'#E63E11'}
 
+def figure_barres(x, comptes, couleurs, titre, hauteur):
+    """Histogramme simple des comptes par grade"""
+    fig = go.Figure(go.Bar(x=x, y=comptes, marker_color=couleurs, text=comptes, textposition='outside'))
+    fig.update_layout(title=titre, height=hauteur, showlegend=False)
+    return fig
+
+def afficher_figure(construire, cle, *parametres):
+    """st.plotly_chart d'une figure mémorisée par (données, groupes, profils, page, graphique, paramètres)
+
+    `construire()` n'est appelée que si la figure n'est pas déjà dans le cache.
+    """
+    version = (empreinte, colonne_groupes, colonne_profils, page, cle)
+    construites = []
+
+    def construire_mesure():
+        construites.append(cle)
+        with etape("construction"):
+            return construire()
+
+    with etape(f"figure {cle}"):
+        fig = get_cache_figures().figure(version + parametres, construire_mesure)
+        compter_cache("figures", echec=bool(construites))
+        st.plotly_chart(fig, use_container_width=True, key=cle)
+
+def afficher_lambda_libre(conc, groupe):
+    """Distributions ELECTRE TRI pour un λ choisi au curseur (seuil sur les concordances)"""
+    st.markdown("#### 🎚️ ELECTRE TRI pour un λ libre")
+    lambda_val = st.slider("λ", LAMBDA_MIN, LAMBDA_MAX, 0.6, 0.01, key=f"lambda_{groupe}")
+    
+    def figure(k, nom, couleur):
+        comptes = np.bincount(classes_depuis_concordances(conc, lambda_val)[k], minlength=len(CLASSES))
+        fig = go.Figure(go.Bar(x=CLASSES, y=comptes, marker_color=couleur,
+                               text=comptes, textposition='outside'))
+        fig.update_layout(title=f"{nom} λ={lambda_val:.2f}", height=250, showlegend=False)
+        return fig
+    
+    for col, k, nom, couleur in zip(st.columns(2), (0, 1), ("Pessimiste", "Optimiste"), ('#3498db', '#2ecc71')):
+        with col:
+            afficher_figure(lambda: figure(k, nom, couleur), f"lambda_{nom}_{groupe}", lambda_val)
+
+def afficher_stabilite_lambda(df, conc, groupe):
+    """λ à partir duquel chaque produit change de classe"""
+    stab = calculate_stabilite(empreinte, groupe, conc)
+    paliers = stab['paliers']
+    bornes = list(paliers[1:]) + [None]
+    etiquettes = [f"[{a:.2f}, {b:.2f})" if b is not None else f"[{a:.2f}, {LAMBDA_MAX:.2f}]"
+                  for a, b in zip(paliers, bornes)]
+    
+    st.caption("Les concordances valent k/11: la classification ne change qu'à ces paliers de λ.")
+    
+    def figure():
+        fig = go.Figure()
+        couleurs = ['#038141', '#85BB2F', '#FECB02', '#EE8100', '#E63E11']
+        for code, (classe, couleur) in enumerate(zip(CLASSES, couleurs)):
+            fig.add_trace(go.Bar(name=classe, x=etiquettes, y=(stab['pess'] == code).sum(axis=0),
+                                 marker_color=couleur))
+        fig.update_layout(barmode='stack', height=300, title="Pessimiste: classes par palier de λ",
+                          xaxis_title="λ", yaxis_title="Nombre")
+        return fig
+    
+    afficher_figure(figure, f"stabilite_{groupe}")
+    
+    stables = np.isnan(stab['changement_pess']).mean() * 100
+    st.metric(f"Produits dont la classe pessimiste ne change pas entre λ={LAMBDA_MIN} et λ={LAMBDA_MAX}",
+              f"{stables:.1f}%")
+    
+    instables = pd.DataFrame({
+        'product_name': df['product_name'].to_numpy() if 'product_name' in df.columns else np.arange(len(df)),
+        f'Pessimiste λ={LAMBDA_MIN}': CLASSES_LIBELLES[stab['pess'][:, 0]],
+        'λ changement (pess.)': stab['changement_pess'],
+        f'Optimiste λ={LAMBDA_MIN}': CLASSES_LIBELLES[stab['opt'][:, 0]],
+        'λ changement (opt.)': stab['changement_opt'],
+    }).sort_values('λ changement (pess.)').head(20)
+    st.markdown("**Produits les plus sensibles à λ**")
+    st.dataframe(instables, use_container_width=True, hide_index=True, key=f"instables_{groupe}")
+
+def afficher_electre_complet(conc, df, groupe, P):
+    """Classes pessimistes du modèle binaire et du modèle complet (q, p, veto) au même λ"""
+    lambda_val = st.select_slider("λ", [0.6, 0.7], key=f"lambda_complet_{groupe}")
+    binaire = classes_depuis_concordances(conc, lambda_val)[0]
+    complet = classes_depuis_credibilites(calculate_credibilites(empreinte, groupe, df, P), lambda_val)[0]
+    
+    def figure():
+        fig = go.Figure()
+        for codes, nom, couleur in ((binaire, "Binaire", '#3498db'), (complet, "Complet (q, p, veto)", '#e67e22')):
+            fig.add_trace(go.Bar(name=nom, x=CLASSES, y=np.bincount(codes, minlength=len(CLASSES)),
+                                 marker_color=couleur))
+        fig.update_layout(barmode='group', height=300, title=f"Pessimiste λ={lambda_val}",
+                          xaxis_title="Classe", yaxis_title="Nombre")
+        return fig
+    
+    afficher_figure(figure, f"complet_{groupe}", lambda_val)
+    st.metric("Produits changeant de classe avec les seuils", f"{(binaire != complet).mean() * 100:.1f}%")
+
+def afficher_robustesse_poids(df, conc, groupe, P):
+    """Part des tirages de poids classant chaque produit en A'…E'"""
+    st.caption("Les poids (2,2,2,1,1,1,1,1) sont tirés au hasard et tout le catalogue est reclassé "
+               "pour chaque tirage.")
+    col1, col2, col3, col4 = st.columns(4)
+    n_tirages = col1.number_input("Tirages", 100, 10000, 1000, 100, key=f"tirages_{groupe}")
+    mode = col2.radio("Poids", ['dirichlet', 'simplexe'], key=f"mode_{groupe}",
+                      format_func=lambda m: "Autour des poids actuels" if m == 'dirichlet' else "Uniformes")
+    concentration = col3.slider("Concentration", 5.0, 200.0, CONCENTRATION_DEFAUT, 5.0,
+                                key=f"concentration_{groupe}", disabled=mode == 'simplexe')
+    lambda_val = col4.select_slider("λ", [0.6, 0.7], key=f"lambda_robustesse_{groupe}")
+    
+    cle = f"robustesse_{groupe}"
+    if st.button("🎲 Lancer les tirages", key=f"bouton_{cle}"):
+        st.session_state[cle] = (n_tirages, mode, concentration, lambda_val)
+    if cle not in st.session_state:
+        return
+    n_tirages, mode, concentration, lambda_val = st.session_state[cle]
+    acc = calculate_robustesse(empreinte, groupe, n_tirages, lambda_val, 'pess', mode, concentration, df, P)
+    
+    # Part des tirages qui confirment la classe obtenue avec les poids actuels
+    actuelle = classes_depuis_concordances(conc, lambda_val)[0]
+    confirmation = acc[np.arange(len(acc)), actuelle]
+    st.metric(f"Produits dont la classe pessimiste λ={lambda_val} est confirmée par ≥ 90% des tirages",
+              f"{(confirmation >= 0.9).mean() * 100:.1f}%")
+    
+    def figure():
+        fig = go.Figure(go.Histogram(x=confirmation, nbinsx=20, marker_color='#3498db'))
+        fig.update_layout(title="Part des tirages confirmant la classe actuelle", height=250,
+                          xaxis_title="Part des tirages", yaxis_title="Produits", showlegend=False)
+        return fig
+    
+    afficher_figure(figure, f"robustesse_{groupe}", n_tirages, mode, concentration, lambda_val)
+    
+    fragiles = pd.DataFrame(acc * 100, columns=CLASSES).round(1)
+    fragiles.insert(0, 'Classe actuelle', CLASSES_LIBELLES[actuelle])
+    fragiles.insert(0, 'product_name',
+                    df['product_name'].to_numpy() if 'product_name' in df.columns else np.arange(len(df)))
+    fragiles['Confirmation (%)'] = (confirmation * 100).round(1)
+    st.markdown("**Produits les plus sensibles aux poids** (% des tirages par classe)")
+    st.dataframe(fragiles.sort_values('Confirmation (%)').head(20), use_container_width=True, hide_index=True,
+                 key=f"fragiles_{groupe}")
+
+def afficher_comparaison(colonne, grades, titre, cle):
+    """Distribution de `colonne` dans chaque groupe: barres groupées puis pourcentages"""
+    comptes = {groupe: pd.Series(comptes_grades(groupe, colonne), index=grades) for groupe in groupes}
+    
+    def figure():
+        fig = go.Figure()
+        for i, groupe in enumerate(groupes):
+            fig.add_trace(go.Bar(name=libelle_groupe(groupe), x=grades, y=comptes[groupe].values,
+                                 marker_color=COULEURS_GROUPES[i % len(COULEURS_GROUPES)],
+                                 text=comptes[groupe].values, textposition='outside'))
+        fig.update_layout(barmode='group', height=400, title=titre, xaxis_title="Grade", yaxis_title="Nombre")
+        return fig
+    
+    afficher_figure(figure, f"comparaison_{cle}")
+    pourcentages = {libelle_groupe(groupe): (c / max(len(indices_groupes[groupe]), 1) * 100).round(1)
+                    for groupe, c in comptes.items()}
+    
+    st.markdown("#### Répartition en pourcentage")
+    st.dataframe(pd.DataFrame(pourcentages).T.map(lambda x: f"{x:.1f}%"), use_container_width=True,
+                 key=f"pourcentages_{cle}")
+
+def afficher_recherche():
+    """Recherche par nom, marque ou code-barres dans tout le catalogue, avec tous les scores"""
+    requete = st.text_input("🔎 Rechercher un produit (nom, marque ou code-barres)", key="recherche")
+    if not requete.strip():
+        return
+    index = get_index_recherche(empreinte, colonne_profils, catalogue)
+    debut = time.perf_counter()
+    positions, total = index.rechercher(requete)
+    duree = (time.perf_counter() - debut) * 1000
+    st.caption(f"{total} produit(s) trouvé(s) en {duree:.1f} ms"
+               + (f", {len(positions)} premiers affichés" if total > len(positions) else ""))
+    if total:
+        colonnes = [c for c in ('product_name', 'brand', 'code_barre', COLONNE_GROUPE)
+                    if c in catalogue.columns]
+        colonnes += [c for c in catalogue.columns
+                     if c.startswith(('nutriscore_grade', 'ecoscore_grade', 'electre_', 'supernutri_'))]
+        st.dataframe(catalogue.iloc[positions][colonnes], use_container_width=True, hide_index=True,
+                     key="resultats_recherche")
+
+NOMS_NOTES = {
+    'nutriscore_grade': "Nutri-Score", 'nutriscore_grade_recalc': "Nutri-Score 2025 recalculé",
+    'ecoscore_grade': "Eco-Score", 'electre_pess_06': "ELECTRE Pess. λ=0.6", 'electre_opt_06': "ELECTRE Opt. λ=0.6",
+    'electre_pess_07': "ELECTRE Pess. λ=0.7", 'electre_opt_07': "ELECTRE Opt. λ=0.7",
+    'supernutri_score': "SuperNutri-Score",
+}
+
+def afficher_grille():
+    """Tous les produits, filtrés, triés et paginés côté serveur (seule la page est envoyée)"""
+    st.markdown("#### 🗂️ Tous les produits")
+    grille = get_grille(empreinte, colonne_profils, colonne_groupes, catalogue)
+    notes = [c for c in COLONNES_NOTES if c in grille.codes]
+    
+    modalites, plages = {}, {}
+    with st.expander("Filtres"):
+        choix = st.multiselect(NOMS_COLONNES_GROUPES[colonne_groupes], grille.modalites(colonne_groupes),
+                               key="grille_groupes")
+        if choix:
+            modalites[colonne_groupes] = choix
+        for col, c in zip(st.columns(4) * 2, notes):
+            choix = col.multiselect(NOMS_NOTES[c], grille.modalites(c), key=f"grille_{c}")
+            if choix:
+                modalites[c] = choix
+        bio = st.radio("Bio", [None, True, False], horizontal=True, key="grille_bio",
+                       format_func=lambda b: "Tous" if b is None else ("Bio" if b else "Non bio"))
+        for c in st.multiselect("Plages de nutriments", list(grille.nutriments), key="grille_nutriments"):
+            bas, haut = grille.etendue(c)
+            if bas < haut:
+                plages[c] = st.slider(c, bas, haut, (bas, haut), key=f"grille_plage_{c}")
+    masque = grille.filtrer(modalites, bio, plages)
+    total = int(masque.sum())
+    
+    st.metric("Produits retenus", f"{total:,}".replace(",", " "))
+    # Une ligne par méthode, une colonne par grade (A' et A côte à côte)
+    comptes = pd.DataFrame({NOMS_NOTES[c]: serie.groupby(serie.index.str.rstrip("'")).sum()
+                            for c, serie in grille.comptes(masque, notes).items()}).T
+    st.dataframe(comptes.fillna(0).astype(int), use_container_width=True, key="grille_comptes")
+    
+    colonnes = [c for c in ('product_name', 'brand', colonne_groupes, 'is_organic') if c in catalogue.columns]
+    colonnes += notes + list(grille.nutriments)
+    col1, col2, col3, col4 = st.columns(4)
+    tri = col1.selectbox("Trier par", [None] + colonnes, key="grille_tri",
+                         format_func=lambda c: "Ordre du catalogue" if c is None else NOMS_NOTES.get(c, c))
+    croissant = col2.radio("Ordre", [True, False], horizontal=True, key="grille_ordre",
+                           format_func=lambda b: "Croissant" if b else "Décroissant")
+    taille = col3.selectbox("Lignes par page", [25, TAILLE_PAGE, 100, 200], index=1, key="grille_taille")
+    n_pages = max((total + taille - 1) // taille, 1)
+    numero = col4.number_input(f"Page (sur {n_pages})", 1, n_pages, 1, key="grille_page")
+    regles = ['supernutri_regles'] if 'supernutri_regles' in catalogue.columns else []
+    page = grille.page(masque, numero - 1, taille, tri, croissant, colonnes + regles)
+    if regles:
+        # Règles décodées pour les seules lignes affichées
+        page = page.assign(supernutri_regles=textes_regles(page['supernutri_regles'], 'fr'))
+    st.dataframe(page.rename(columns={'supernutri_regles': "Règles SuperNutri"}),
+                 use_container_width=True, hide_index=True, key="grille_page_produits")
+    afficher_export(grille, masque, total, tri, croissant)
+
+FORMATS_EXPORT = {'xlsx': "Excel (.xlsx)", 'csv': "CSV", 'parquet': "Parquet"}
+
+def regles_en_texte(morceau):
+    if 'supernutri_regles' not in morceau.columns:
+        return morceau
+    return morceau.assign(supernutri_regles=textes_regles(morceau['supernutri_regles'], 'fr'))
+
+def afficher_export(grille, masque, total, tri, croissant):
+    """Export des produits retenus (ordre du tri, toutes les colonnes) dans un fichier temporaire, écrit par morceaux"""
+    with st.expander("📥 Exporter les produits retenus"):
+        fmt = st.radio("Format", list(FORMATS_EXPORT), horizontal=True, key="export_format",
+                       format_func=FORMATS_EXPORT.get)
+        if fmt == 'xlsx' and total > LIGNES_MAX_XLSX - 1:
+            st.caption(f"Au-delà de {LIGNES_MAX_XLSX - 1:,} lignes, la suite est écrite dans d'autres feuilles."
+                       .replace(",", " "))
+        signature = (empreinte, colonne_profils, fmt, tri, croissant, hashlib.sha1(masque.tobytes()).hexdigest())
+        export = st.session_state.get('export')
+        if st.button(f"Préparer l'export de {total:,} produits".replace(",", " "), disabled=not total,
+                     key="export_preparer"):
+            if export is not None and os.path.exists(export['chemin']):
+                os.remove(export['chemin'])
+            fd, chemin = tempfile.mkstemp(prefix="supernutri_export_", suffix=EXTENSIONS[fmt])
+            os.close(fd)
+            barre = st.progress(0.0)
+            with etape("export"):
+                exporter(catalogue, chemin, fmt, grille.positions(masque, tri, croissant), transformer=regles_en_texte,
+                         progression=lambda n, m: barre.progress(n / m, f"{n:,} / {m:,}".replace(",", " ")))
+            barre.empty()
+            export = st.session_state['export'] = {'chemin': chemin, 'signature': signature}
+        if export is not None and export['signature'] == signature and os.path.exists(export['chemin']):
+            # Fichier relu seulement au clic, pas à chaque rafraîchissement
+            def contenu(chemin=export['chemin']):
+                with open(chemin, 'rb') as f:
+                    return f.read()
+            octets = os.path.getsize(export['chemin'])
+            taille = f"{octets / 2 ** 20:.1f} Mo" if octets >= 2 ** 20 else f"{octets / 2 ** 10:.0f} Ko"
+            st.download_button(f"💾 Télécharger ({taille})", contenu,
+                               file_name=f"produits_scores{EXTENSIONS[fmt]}", mime=TYPES_MIME[fmt],
+                               key="export_telecharger")
+
+TEXTES_REGLES = {
+    'fr': {'bonus_eco_a': "✅ Bonus Eco-Score A: +1 grade",
+           'malus_eco_de': "⚠️ Malus Eco-Score D/E: -1 grade",
+           'bonus_bio': "✅ Bonus Bio: +1 grade",
+           'plafond_eco_e': "⚠️ Limitation Eco-Score E: grade max = C"},
+    'en': {'bonus_eco_a': "✅ Eco-Score A Bonus: +1 grade",
+           'malus_eco_de': "⚠️ Eco-Score D/E Penalty: -1 grade",
+           'bonus_bio': "✅ Organic Bonus: +1 grade",
+           'plafond_eco_e': "⚠️ Eco-Score E Limitation: max grade = C"},
+}
+
+def textes_regles(masques, langue):
+    """Colonne supernutri_regles (masques) → texte des règles appliquées, décodé une fois par masque distinct"""
+    textes = {m: " · ".join(TEXTES_REGLES[langue][r] for r in regles_depuis_masque(m))
+              for m in pd.unique(masques)}
+    return masques.map(textes)
+
+TEXTES_ALTERNATIVES = {
+    'fr': {'titre': "🔁 Alternatives plus saines", 'nombre': "Nombre d'alternatives",
+           'groupe': "Chercher dans", 'tous': "Tout le catalogue", 'distance': "Distance",
+           'regles': "Règles SuperNutri",
+           'aucune': "Aucun produit du catalogue n'a un meilleur SuperNutri-Score.",
+           'demo': "Chargez les vraies données pour obtenir des alternatives."},
+    'en': {'titre': "🔁 Healthier Alternatives", 'nombre': "Number of alternatives",
+           'groupe': "Search in", 'tous': "Whole catalog", 'distance': "Distance",
+           'regles': "SuperNutri rules",
+           'aucune': "No catalog product has a better SuperNutri-Score.",
+           'demo': "Load the real data to get alternatives."},
+}
+
+def choisir_alternatives(langue):
+    """Nombre d'alternatives et groupe où les chercher (saisis avant le calcul)"""
+    textes = TEXTES_ALTERNATIVES[langue]
+    col1, col2 = st.columns(2)
+    k = col1.number_input(textes['nombre'], 1, 20, K_DEFAUT, key=f"k_alternatives_{langue}")
+    groupes_possibles = [None] + (list(groupes) if is_real else [])
+    groupe = col2.selectbox(textes['groupe'], groupes_possibles, key=f"groupe_alternatives_{langue}",
+                            format_func=lambda g: textes['tous'] if g is None else libelle_groupe(g))
+    return k, groupe
+
+def afficher_alternatives(produit, grade, k, groupe, langue):
+    """Les k produits les plus proches du produit saisi avec un SuperNutri-Score strictement meilleur"""
+    textes = TEXTES_ALTERNATIVES[langue]
+    st.markdown(f"#### {textes['titre']}")
+    if not is_real:
+        st.info(textes['demo'])
+        return
+    recommandeur = get_recommandeur(empreinte, colonne_profils, colonne_groupes, catalogue, profils_electre.P)
+    positions, distances = recommandeur.alternatives(produit, grade, k, groupe)
+    if not len(positions):
+        st.info(textes['aucune'])
+        return
+    colonnes = [c for c in ('product_name', 'brand', colonne_groupes, 'supernutri_score',
+                            'nutriscore_grade', 'electre_pess_06', 'supernutri_regles') if c in catalogue.columns]
+    alternatives = catalogue.iloc[positions][colonnes].copy()
+    if 'supernutri_regles' in alternatives.columns:
+        alternatives[textes['regles']] = textes_regles(alternatives.pop('supernutri_regles'), langue)
+    alternatives[textes['distance']] = distances.round(3)
+    st.dataframe(alternatives, use_container_width=True, hide_index=True, key=f"alternatives_{langue}")
+
+jalon(f"page {page}")
+
 # ============================================================
 # PAGE 0: TRANSPARENCE DES ALGORITHMES
 # ============================================================
@@ -370,6 +864,21 @@ if page == "📖 Transparence des Algorithmes":
         Si C ≥ λ → le produit dépasse le profil
         """)
     
+    with st.expander("🧪 Variante complète: seuils q, p et veto"):
+        st.markdown("""
+        Le modèle ci-dessus est binaire. ELECTRE TRI complet ajoute par critère:
+        - **q (indifférence):** un écart inférieur à q en défaveur du produit compte encore 1
+        - **p (préférence):** au-delà de p l'écart compte 0; entre q et p, concordance linéaire
+        - **v (veto):** au-delà de v, le critère interdit à lui seul le surclassement
+        
+        Indice de crédibilité: σ = C × Π (1 − dⱼ) / (1 − C) sur les critères dont la
+        discordance dⱼ dépasse C. Le produit dépasse le profil si σ ≥ λ.
+        Avec q = p = 0 et sans veto, σ = C: c'est le modèle binaire.
+        """)
+        st.dataframe(pd.DataFrame(
+            [(crit, q, p, v if v is not None else "—") for crit, (q, p, v) in SEUILS_NUTRITION.items()],
+            columns=['Critère', 'q', 'p', 'v (veto)']).astype(str), use_container_width=True, hide_index=True)
+    
     # ========== SUPERNUTRI-SCORE ==========
     st.markdown("---")
     st.subheader("3️⃣ SuperNutri-Score (Modèle Innovant)")
@@ -645,6 +1154,11 @@ elif page == "🧮 Calculateur Complet":
     """)
 
     
+    # ========== SECTION 5: ALTERNATIVES ==========
+    st.markdown("---")
+    st.subheader("🔁 5. Alternatives plus saines")
+    k_alternatives, groupe_alternatives = choisir_alternatives('fr')
+    
     # ========== BOUTON CALCUL ==========
     st.markdown("---")
     
@@ -662,64 +1176,26 @@ elif page == "🧮 Calculateur Complet":
         
         st.subheader("1️⃣ Nutri-Score 2025 (ANSES)")
         
-        # Calcul points négatifs
-        def score_energie(kj):
-            seuils = [335,670,1005,1340,1675,2010,2345,2680,3015,3350]
-            return int(np.searchsorted(seuils, kj, side="right"))
+        # Calcul des points (module nutriscore, identique au calcul catalogue)
+        pts = points_nutriscore(energy_kj, saturated_fat, sugar, sel_g,
+                                fiber, protein, fruits_veg_nuts_pct)
         
-        def score_satures(g):
-            seuils = [1,2,3,4,5,6,7,8,9,10]
-            return int(np.searchsorted(seuils, g, side="right"))
+        pts_energie = int(pts['energie'])
+        pts_sat_fat = int(pts['satures'])
+        pts_sugar = int(pts['sucres'])
+        pts_sel = int(pts['sel'])
+        negative_pts = int(pts['negatifs'])
         
-        def score_sucres(g):
-            seuils = [3.4,6.8,10,14,17,20,24,27,31,34,37,41,44,48,51]
-            return int(np.searchsorted(seuils, g, side="right"))
-        
-        def score_sel(g):
-            seuils = [0.2,0.4,0.6,0.8,1.0,1.2,1.4,1.6,1.8,2.0,2.2,2.4,2.6,2.8,3.0,3.2,3.4,3.6,3.8,4.0]
-            return int(np.searchsorted(seuils, g, side="right"))
-        
-        pts_energie = score_energie(energy_kj)
-        pts_sat_fat = score_satures(saturated_fat)
-        pts_sugar = score_sucres(sugar)
-        pts_sel = score_sel(sel_g)
-        
-        negative_pts = pts_energie + pts_sat_fat + pts_sugar + pts_sel
-        
-        # Calcul points positifs
-        if fruits_veg_nuts_pct > 80:
-            pts_fruits = 5
-        elif fruits_veg_nuts_pct > 60:
-            pts_fruits = 2
-        elif fruits_veg_nuts_pct > 40:
-            pts_fruits = 1
-        else:
-            pts_fruits = 0
-        
-        pts_fiber = int(np.searchsorted([0.9,1.9,2.8,3.7,4.7], fiber, side="right"))
-        pts_protein = int(np.searchsorted([1.6,3.2,4.8,6.4,8.0], protein, side="right"))
-        
-        positive_pts = pts_fruits + pts_fiber + pts_protein
+        pts_fruits = int(pts['fruits'])
+        pts_fiber = int(pts['fibres'])
+        pts_protein = int(pts['proteines'])
+        positive_pts = int(pts['positifs'])
         
         # Règle 2025
-        if negative_pts >= 11 and fruits_veg_nuts_pct < 80:
-            positive_pts_final = positive_pts - pts_protein
-        else:
-            positive_pts_final = positive_pts
-        
-        nutriscore_score = negative_pts - positive_pts_final
-        
-        # Grade Nutri-Score
-        if nutriscore_score <= -1:
-            nutriscore_grade = "A"
-        elif nutriscore_score <= 2:
-            nutriscore_grade = "B"
-        elif nutriscore_score <= 10:
-            nutriscore_grade = "C"
-        elif nutriscore_score <= 18:
-            nutriscore_grade = "D"
-        else:
-            nutriscore_grade = "E"
+        positive_pts_final = int(pts['positifs_final'])
+        
+        nutriscore_score = int(pts['score'])
+        nutriscore_grade = NUTRI_GRADES[grade_nutriscore(nutriscore_score)]
         
         # Affichage Nutri-Score
         col1, col2, col3 = st.columns([1,2,1])
@@ -746,7 +1222,7 @@ elif page == "🧮 Calculateur Complet":
             st.caption(f"• Fruits/Légumes: {pts_fruits} pts")
             st.caption(f"• Fibres: {pts_fiber} pts")
             st.caption(f"• Protéines: {pts_protein if positive_pts_final == positive_pts else 0} pts")
-            if negative_pts >= 11 and fruits_veg_nuts_pct < 80:
+            if pts['proteines_exclues']:
                 st.warning("⚠️ Protéines non comptées (règle 2025)")
         
         with col3:
@@ -771,108 +1247,11 @@ elif page == "🧮 Calculateur Complet":
             'additives_count': additives_count
         }
         
-        # Poids fixes selon tableau
-        poids = {
-            'energy_kj': 2,
-            'saturated_fat': 2,
-            'sugar': 2,
-            'sodium_g': 1,
-            'protein': 1,
-            'fiber': 1,
-            'fruits_veg_nuts_pct': 1,
-            'additives_count': 1
-        }
-        
-        # Sens d'optimisation
-        sens = {
-            'energy_kj': 'min',
-            'saturated_fat': 'min',
-            'sugar': 'min',
-            'sodium_g': 'min',
-            'protein': 'max',
-            'fiber': 'max',
-            'fruits_veg_nuts_pct': 'max',
-            'additives_count': 'min'
-        }
-        
-        # Calcul des profils (quantiles)
-        criteres = list(poids.keys())
-        quantiles = [0.05, 0.2, 0.4, 0.6, 0.8, 0.95]
-        
-        profils = {}
-        for i, q in enumerate(quantiles, start=1):
-            profils[f"pi{i}"] = {}
-            for crit in criteres:
-                if crit in df_pain.columns:
-                    data = pd.concat([df_pain[crit], df_yaourt[crit]]).dropna()
-                    if sens[crit] == 'max':
-                        profils[f"pi{i}"][crit] = float(data.quantile(q))
-                    else:
-                        profils[f"pi{i}"][crit] = float(data.quantile(1-q))
-                else:
-                    # Valeurs par défaut
-                    defaults = {
-                        'energy_kj': [2000, 1500, 1200, 1100, 1050, 1000],
-                        'saturated_fat': [10, 5, 2, 1, 0.5, 0.3],
-                        'sugar': [18, 8, 4, 3, 2.5, 2],
-                        'sodium_g': [1.0, 0.7, 0.5, 0.4, 0.4, 0.35],
-                        'protein': [7, 8, 9, 10, 11, 12],
-                        'fiber': [0, 2.5, 4, 5.5, 8.5, 9.5],
-                        'fruits_veg_nuts_pct': [0, 0, 0, 0, 5, 12],
-                        'additives_count': [12, 7, 4, 1, 0, 0]
-                    }
-                    if sens[crit] == 'max':
-                        profils[f"pi{i}"][crit] = defaults[crit][i-1]
-                    else:
-                        profils[f"pi{i}"][crit] = defaults[crit][i-1]
-        
-        # Fonctions ELECTRE
-        def concordance_partielle(H, b, crit, sens):
-            if sens[crit] == 'max':
-                return 1 if H[crit] >= b[crit] else 0
-            else:
-                return 1 if H[crit] <= b[crit] else 0
-        
-        def concordance_globale(H, b, poids, sens):
-            num = sum(poids[c] * concordance_partielle(H, b, c, sens) for c in poids)
-            denom = sum(poids.values())
-            return num / denom
-        
-        # PESSIMISTE λ=0.6
-        classe_pess_06 = "E'"
-        for i in reversed(range(1, 6)):
-            c = concordance_globale(produit, profils[f"pi{i}"], poids, sens)
-            if c >= 0.6:
-                classe_pess_06 = ["E'", "D'", "C'", "B'", "A'"][i-1]
-                break
-        
-        # OPTIMISTE λ=0.6
-        classe_opt_06 = "A'"
-        for i in range(2, 7):
-            b = profils[f"pi{i-1}"]
-            c_biH = concordance_globale(b, produit, poids, sens)
-            c_Hbi = concordance_globale(produit, b, poids, sens)
-            if c_biH >= 0.6 and c_Hbi < 0.6:
-                classe_opt_06 = ["E'", "D'", "C'", "B'", "A'"][i-2]
-                break
-        
-        # PESSIMISTE λ=0.7
-        classe_pess_07 = "E'"
-        for i in reversed(range(1, 6)):
-            c = concordance_globale(produit, profils[f"pi{i}"], poids, sens)
-            if c >= 0.7:
-                classe_pess_07 = ["E'", "D'", "C'", "B'", "A'"][i-1]
-                break
-        
-        # OPTIMISTE λ=0.7
-        classe_opt_07 = "A'"
-        for i in range(2, 7):
-            b = profils[f"pi{i-1}"]
-            c_biH = concordance_globale(b, produit, poids, sens)
-            c_Hbi = concordance_globale(produit, b, poids, sens)
-            if c_biH >= 0.7 and c_Hbi < 0.7:
-                classe_opt_07 = ["E'", "D'", "C'", "B'", "A'"][i-2]
-                break
+        # Classification par les profils précalculés (partagés entre sessions)
+        with etape("classement ELECTRE du produit"):
+            resultats_electre = profils_electre.classer_produit(produit)
+        classe_pess_06, classe_opt_06 = resultats_electre[0.6]
+        classe_pess_07, classe_opt_07 = resultats_electre[0.7]
         
         # Affichage ELECTRE TRI - 4 résultats
         st.markdown("**λ = 0.6**")
@@ -925,37 +1304,9 @@ elif page == "🧮 Calculateur Complet":
         Combinaison des 3 dimensions: Nutrition (ELECTRE) + Environnement (Eco) + Agriculture (Bio)
         """)
         
-        # Calcul SuperNutri-Score (basé sur pessimiste λ=0.6)
-        map_in = {"A'":1, "B'":2, "C'":3, "D'":4, "E'":5}
-        map_out = {1:"A", 2:"B", 3:"C", 4:"D", 5:"E"}
-        
-        score_super = map_in[classe_pess_06]
-        
-        # Règles
-        regles_appliquees = []
-        
-        # Eco-Score A
-        if ecoscore_grade == "A" and score_super > 1:
-            score_super -= 1
-            regles_appliquees.append("✅ Bonus Eco-Score A: +1 grade")
-        
-        # Eco-Score D/E
-        if ecoscore_grade in ["D", "E"] and score_super < 5:
-            score_super += 1
-            regles_appliquees.append("⚠️ Malus Eco-Score D/E: -1 grade")
-        
-        # Bio
-        if is_organic and ecoscore_grade != "E" and score_super > 1:
-            score_super -= 1
-            regles_appliquees.append("✅ Bonus Bio: +1 grade")
-        
-        # Limitation Eco E
-        if ecoscore_grade == "E":
-            score_super = max(score_super, 3)
-            regles_appliquees.append("⚠️ Limitation Eco-Score E: grade max = C")
-        
-        score_super = max(1, min(5, score_super))
-        supernutri_grade = map_out[score_super]
+        # Calcul SuperNutri-Score (basé sur pessimiste λ=0.6), lu dans la table des règles
+        supernutri_grade, regles = supernutri_produit(classe_pess_06, ecoscore_grade, is_organic)
+        regles_appliquees = [TEXTES_REGLES['fr'][r] for r in regles]
         
         # Affichage SuperNutri-Score
         st.markdown(f"""
@@ -1007,6 +1358,7 @@ elif page == "🧮 Calculateur Complet":
         })
         
         st.dataframe(recap_df[['Algorithme', 'Grade', 'Info']], use_container_width=True, hide_index=True)
+        afficher_alternatives(produit, supernutri_grade, k_alternatives, groupe_alternatives, 'fr')
         
         # Visualisation comparative
         st.markdown("---")
@@ -1037,7 +1389,8 @@ elif page == "🧮 Calculateur Complet":
             yaxis=dict(range=[0, 6], tickmode='array', tickvals=[1,2,3,4,5], ticktext=['E','D','C','B','A'])
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        with etape("figure comparaison des méthodes"):
+            st.plotly_chart(fig, use_container_width=True)
 
 # ============================================================
 # PAGE: CALCULATOR (ENGLISH VERSION)
@@ -1129,6 +1482,11 @@ elif page == "🧮 Calculator (English)":
     *All rules are fixed and transparent for the consumer.*
     """)
     
+    # ========== SECTION 5: ALTERNATIVES ==========
+    st.markdown("---")
+    st.subheader("🔁 5. Healthier Alternatives")
+    k_alternatives_en, groupe_alternatives_en = choisir_alternatives('en')
+    
     # ========== CALCULATE BUTTON ==========
     st.markdown("---")
     
@@ -1146,64 +1504,26 @@ elif page == "🧮 Calculator (English)":
         
         st.subheader("1️⃣ Nutri-Score 2025 (ANSES)")
         
-        # Calculate negative points
-        def score_energie(kj):
-            seuils = [335,670,1005,1340,1675,2010,2345,2680,3015,3350]
-            return int(np.searchsorted(seuils, kj, side="right"))
-        
-        def score_satures(g):
-            seuils = [1,2,3,4,5,6,7,8,9,10]
-            return int(np.searchsorted(seuils, g, side="right"))
-        
-        def score_sucres(g):
-            seuils = [3.4,6.8,10,14,17,20,24,27,31,34,37,41,44,48,51]
-            return int(np.searchsorted(seuils, g, side="right"))
-        
-        def score_sel(g):
-            seuils = [0.2,0.4,0.6,0.8,1.0,1.2,1.4,1.6,1.8,2.0,2.2,2.4,2.6,2.8,3.0,3.2,3.4,3.6,3.8,4.0]
-            return int(np.searchsorted(seuils, g, side="right"))
+        # Compute points (nutriscore module, same as the catalog computation)
+        pts_en = points_nutriscore(energy_kj_en, saturated_fat_en, sugar_en, sel_g_en,
+                                   fiber_en, protein_en, fruits_veg_nuts_pct_en)
         
-        pts_energie_en = score_energie(energy_kj_en)
-        pts_sat_fat_en = score_satures(saturated_fat_en)
-        pts_sugar_en = score_sucres(sugar_en)
-        pts_sel_en = score_sel(sel_g_en)
+        pts_energie_en = int(pts_en['energie'])
+        pts_sat_fat_en = int(pts_en['satures'])
+        pts_sugar_en = int(pts_en['sucres'])
+        pts_sel_en = int(pts_en['sel'])
+        negative_pts_en = int(pts_en['negatifs'])
         
-        negative_pts_en = pts_energie_en + pts_sat_fat_en + pts_sugar_en + pts_sel_en
-        
-        # Calculate positive points
-        if fruits_veg_nuts_pct_en > 80:
-            pts_fruits_en = 5
-        elif fruits_veg_nuts_pct_en > 60:
-            pts_fruits_en = 2
-        elif fruits_veg_nuts_pct_en > 40:
-            pts_fruits_en = 1
-        else:
-            pts_fruits_en = 0
-        
-        pts_fiber_en = int(np.searchsorted([0.9,1.9,2.8,3.7,4.7], fiber_en, side="right"))
-        pts_protein_en = int(np.searchsorted([1.6,3.2,4.8,6.4,8.0], protein_en, side="right"))
-        
-        positive_pts_en = pts_fruits_en + pts_fiber_en + pts_protein_en
+        pts_fruits_en = int(pts_en['fruits'])
+        pts_fiber_en = int(pts_en['fibres'])
+        pts_protein_en = int(pts_en['proteines'])
+        positive_pts_en = int(pts_en['positifs'])
         
         # 2025 rule
-        if negative_pts_en >= 11 and fruits_veg_nuts_pct_en < 80:
-            positive_pts_final_en = positive_pts_en - pts_protein_en
-        else:
-            positive_pts_final_en = positive_pts_en
-        
-        nutriscore_score_en = negative_pts_en - positive_pts_final_en
-        
-        # Nutri-Score grade
-        if nutriscore_score_en <= -1:
-            nutriscore_grade_en = "A"
-        elif nutriscore_score_en <= 2:
-            nutriscore_grade_en = "B"
-        elif nutriscore_score_en <= 10:
-            nutriscore_grade_en = "C"
-        elif nutriscore_score_en <= 18:
-            nutriscore_grade_en = "D"
-        else:
-            nutriscore_grade_en = "E"
+        positive_pts_final_en = int(pts_en['positifs_final'])
+        
+        nutriscore_score_en = int(pts_en['score'])
+        nutriscore_grade_en = NUTRI_GRADES[grade_nutriscore(nutriscore_score_en)]
         
         # Display Nutri-Score
         col1, col2, col3 = st.columns([1,2,1])
@@ -1230,7 +1550,7 @@ elif page == "🧮 Calculator (English)":
             st.caption(f"• Fruits/Vegetables: {pts_fruits_en} pts")
             st.caption(f"• Fiber: {pts_fiber_en} pts")
             st.caption(f"• Proteins: {pts_protein_en if positive_pts_final_en == positive_pts_en else 0} pts")
-            if negative_pts_en >= 11 and fruits_veg_nuts_pct_en < 80:
+            if pts_en['proteines_exclues']:
                 st.warning("⚠️ Proteins not counted (2025 rule)")
         
         with col3:
@@ -1255,107 +1575,11 @@ elif page == "🧮 Calculator (English)":
             'additives_count': additives_count_en
         }
         
-        # Fixed weights
-        poids = {
-            'energy_kj': 2,
-            'saturated_fat': 2,
-            'sugar': 2,
-            'sodium_g': 1,
-            'protein': 1,
-            'fiber': 1,
-            'fruits_veg_nuts_pct': 1,
-            'additives_count': 1
-        }
-        
-        # Optimization direction
-        sens = {
-            'energy_kj': 'min',
-            'saturated_fat': 'min',
-            'sugar': 'min',
-            'sodium_g': 'min',
-            'protein': 'max',
-            'fiber': 'max',
-            'fruits_veg_nuts_pct': 'max',
-            'additives_count': 'min'
-        }
-        
-        # Calculate profiles (quantiles)
-        criteres = list(poids.keys())
-        quantiles = [0.05, 0.2, 0.4, 0.6, 0.8, 0.95]
-        
-        profils = {}
-        for i, q in enumerate(quantiles, start=1):
-            profils[f"pi{i}"] = {}
-            for crit in criteres:
-                if crit in df_pain.columns:
-                    data = pd.concat([df_pain[crit], df_yaourt[crit]]).dropna()
-                    if sens[crit] == 'max':
-                        profils[f"pi{i}"][crit] = float(data.quantile(q))
-                    else:
-                        profils[f"pi{i}"][crit] = float(data.quantile(1-q))
-                else:
-                    defaults = {
-                        'energy_kj': [2000, 1500, 1200, 1100, 1050, 1000],
-                        'saturated_fat': [10, 5, 2, 1, 0.5, 0.3],
-                        'sugar': [18, 8, 4, 3, 2.5, 2],
-                        'sodium_g': [1.0, 0.7, 0.5, 0.4, 0.4, 0.35],
-                        'protein': [7, 8, 9, 10, 11, 12],
-                        'fiber': [0, 2.5, 4, 5.5, 8.5, 9.5],
-                        'fruits_veg_nuts_pct': [0, 0, 0, 0, 5, 12],
-                        'additives_count': [12, 7, 4, 1, 0, 0]
-                    }
-                    if sens[crit] == 'max':
-                        profils[f"pi{i}"][crit] = defaults[crit][i-1]
-                    else:
-                        profils[f"pi{i}"][crit] = defaults[crit][i-1]
-        
-        # ELECTRE functions
-        def concordance_partielle_en(H, b, crit, sens):
-            if sens[crit] == 'max':
-                return 1 if H[crit] >= b[crit] else 0
-            else:
-                return 1 if H[crit] <= b[crit] else 0
-        
-        def concordance_globale_en(H, b, poids, sens):
-            num = sum(poids[c] * concordance_partielle_en(H, b, c, sens) for c in poids)
-            denom = sum(poids.values())
-            return num / denom
-        
-        # PESSIMISTIC λ=0.6
-        classe_pess_06_en = "E'"
-        for i in reversed(range(1, 6)):
-            c = concordance_globale_en(produit_en, profils[f"pi{i}"], poids, sens)
-            if c >= 0.6:
-                classe_pess_06_en = ["E'", "D'", "C'", "B'", "A'"][i-1]
-                break
-        
-        # OPTIMISTIC λ=0.6
-        classe_opt_06_en = "A'"
-        for i in range(2, 7):
-            b = profils[f"pi{i-1}"]
-            c_biH = concordance_globale_en(b, produit_en, poids, sens)
-            c_Hbi = concordance_globale_en(produit_en, b, poids, sens)
-            if c_biH >= 0.6 and c_Hbi < 0.6:
-                classe_opt_06_en = ["E'", "D'", "C'", "B'", "A'"][i-2]
-                break
-        
-        # PESSIMISTIC λ=0.7
-        classe_pess_07_en = "E'"
-        for i in reversed(range(1, 6)):
-            c = concordance_globale_en(produit_en, profils[f"pi{i}"], poids, sens)
-            if c >= 0.7:
-                classe_pess_07_en = ["E'", "D'", "C'", "B'", "A'"][i-1]
-                break
-        
-        # OPTIMISTIC λ=0.7
-        classe_opt_07_en = "A'"
-        for i in range(2, 7):
-            b = profils[f"pi{i-1}"]
-            c_biH = concordance_globale_en(b, produit_en, poids, sens)
-            c_Hbi = concordance_globale_en(produit_en, b, poids, sens)
-            if c_biH >= 0.7 and c_Hbi < 0.7:
-                classe_opt_07_en = ["E'", "D'", "C'", "B'", "A'"][i-2]
-                break
+        # Classification with the precomputed profiles (shared across sessions)
+        with etape("classement ELECTRE du produit"):
+            resultats_electre_en = profils_electre.classer_produit(produit_en)
+        classe_pess_06_en, classe_opt_06_en = resultats_electre_en[0.6]
+        classe_pess_07_en, classe_opt_07_en = resultats_electre_en[0.7]
         
         # Display ELECTRE TRI - 4 results
         st.markdown("**λ = 0.6**")
@@ -1409,37 +1633,9 @@ elif page == "🧮 Calculator (English)":
         Combination of 3 dimensions: Nutrition (ELECTRE) + Environment (Eco) + Agriculture (Bio)
         """)
         
-        # Calculate SuperNutri-Score (based on pessimistic λ=0.6)
-        map_in = {"A'":1, "B'":2, "C'":3, "D'":4, "E'":5}
-        map_out = {1:"A", 2:"B", 3:"C", 4:"D", 5:"E"}
-        
-        score_super_en = map_in[classe_pess_06_en]
-        
-        # Rules
-        regles_appliquees_en = []
-        
-        # Eco-Score A
-        if ecoscore_grade_en == "A" and score_super_en > 1:
-            score_super_en -= 1
-            regles_appliquees_en.append("✅ Eco-Score A Bonus: +1 grade")
-        
-        # Eco-Score D/E
-        if ecoscore_grade_en in ["D", "E"] and score_super_en < 5:
-            score_super_en += 1
-            regles_appliquees_en.append("⚠️ Eco-Score D/E Penalty: -1 grade")
-        
-        # Bio
-        if is_organic_en and ecoscore_grade_en != "E" and score_super_en > 1:
-            score_super_en -= 1
-            regles_appliquees_en.append("✅ Organic Bonus: +1 grade")
-        
-        # Eco E limitation
-        if ecoscore_grade_en == "E":
-            score_super_en = max(score_super_en, 3)
-            regles_appliquees_en.append("⚠️ Eco-Score E Limitation: max grade = C")
-        
-        score_super_en = max(1, min(5, score_super_en))
-        supernutri_grade_en = map_out[score_super_en]
+        # Calculate SuperNutri-Score (based on pessimistic λ=0.6), read from the rules table
+        supernutri_grade_en, regles_en = supernutri_produit(classe_pess_06_en, ecoscore_grade_en, is_organic_en)
+        regles_appliquees_en = [TEXTES_REGLES['en'][r] for r in regles_en]
         
         # Display SuperNutri-Score
         st.markdown(f"""
@@ -1491,6 +1687,7 @@ elif page == "🧮 Calculator (English)":
         })
         
         st.dataframe(recap_df_en[['Algorithm', 'Grade', 'Info']], use_container_width=True, hide_index=True)
+        afficher_alternatives(produit_en, supernutri_grade_en, k_alternatives_en, groupe_alternatives_en, 'en')
         
         # Comparative visualization
         st.markdown("---")
@@ -1521,351 +1718,126 @@ elif page == "🧮 Calculator (English)":
             yaxis=dict(range=[0, 6], tickmode='array', tickvals=[1,2,3,4,5], ticktext=['E','D','C','B','A'])
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        with etape("figure comparaison des méthodes"):
+            st.plotly_chart(fig, use_container_width=True)
 
 # ============================================================
 # PAGE 2: ANALYSE DE DONNÉES
 # ============================================================
 elif page == "📊 Analyse de Données":
     st.header("📊 Analyse des Données")
+    afficher_recherche()
+    if is_real:
+        afficher_grille()
     
-    tab1, tab2 = st.tabs(["🥖 Pains", "🥛 Yaourts"])
-    
-    with tab1:
-        st.subheader(f"Analyse des Pains ({len(df_pain)} produits)")
-        
-        if is_real:
-            # Nutri-Score
-            st.markdown("#### Nutri-Score")
-            if 'nutriscore_grade' in df_pain.columns:
-                pc = df_pain['nutriscore_grade'].value_counts().sort_index()
-                fig = go.Figure(go.Bar(
-                    x=pc.index, y=pc.values,
-                    marker_color=[COLORS.get(x, '#999') for x in pc.index],
-                    text=pc.values, textposition='outside'
-                ))
-                fig.update_layout(title="Distribution Nutri-Score", height=300, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
-            
-            # ELECTRE TRI
-            st.markdown("#### ELECTRE TRI")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**λ = 0.6**")
-                # Pessimiste 0.6
-                if 'electre_pess_06' in df_pain.columns:
-                    p06 = df_pain['electre_pess_06'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=p06.index, y=p06.values, marker_color='#3498db',
-                                          text=p06.values, textposition='outside', name='Pess. 0.6'))
-                    fig.update_layout(title="Pessimiste λ=0.6", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Optimiste 0.6
-                if 'electre_opt_06' in df_pain.columns:
-                    o06 = df_pain['electre_opt_06'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=o06.index, y=o06.values, marker_color='#2ecc71',
-                                          text=o06.values, textposition='outside', name='Opt. 0.6'))
-                    fig.update_layout(title="Optimiste λ=0.6", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                st.markdown("**λ = 0.7**")
-                # Pessimiste 0.7
-                if 'electre_pess_07' in df_pain.columns:
-                    p07 = df_pain['electre_pess_07'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=p07.index, y=p07.values, marker_color='#e67e22',
-                                          text=p07.values, textposition='outside', name='Pess. 0.7'))
-                    fig.update_layout(title="Pessimiste λ=0.7", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Optimiste 0.7
-                if 'electre_opt_07' in df_pain.columns:
-                    o07 = df_pain['electre_opt_07'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=o07.index, y=o07.values, marker_color='#9b59b6',
-                                          text=o07.values, textposition='outside', name='Opt. 0.7'))
-                    fig.update_layout(title="Optimiste λ=0.7", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+    for tab, groupe in zip(st.tabs([libelle_groupe(g) for g in groupes]), groupes):
+        with tab:
+            df, conc, P, cle = vue_groupe(groupe)
+            st.subheader(f"Analyse: {groupe} ({len(df)} produits)")
             
-            # SuperNutri-Score
-            st.markdown("#### SuperNutri-Score")
-            if 'supernutri_score' in df_pain.columns:
-                sn = df_pain['supernutri_score'].value_counts().sort_index()
-                fig = go.Figure(go.Bar(
-                    x=sn.index, y=sn.values,
-                    marker_color=[COLORS.get(x, '#999') for x in sn.index],
-                    text=sn.values, textposition='outside'
-                ))
-                fig.update_layout(title="Distribution SuperNutri-Score", height=300, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+            if not is_real:
+                st.info("Chargez les vraies données pour voir les analyses complètes.")
+                continue
             
-            # Tableau de données
-            st.markdown("#### Aperçu des données")
-            display_cols = ['product_name', 'nutriscore_grade', 'electre_pess_06', 'electre_opt_06',
-                           'electre_pess_07', 'electre_opt_07', 'supernutri_score']
-            display_cols = [c for c in display_cols if c in df_pain.columns]
-            st.dataframe(df_pain[display_cols].head(10), use_container_width=True)
-        else:
-            st.info("Chargez les vraies données pour voir les analyses complètes.")
-    
-    with tab2:
-        st.subheader(f"Analyse des Yaourts ({len(df_yaourt)} produits)")
-        
-        if is_real:
             # Nutri-Score
             st.markdown("#### Nutri-Score")
-            if 'nutriscore_grade' in df_yaourt.columns:
-                yc = df_yaourt['nutriscore_grade'].value_counts().sort_index()
-                fig = go.Figure(go.Bar(
-                    x=yc.index, y=yc.values,
-                    marker_color=[COLORS.get(x, '#999') for x in yc.index],
-                    text=yc.values, textposition='outside'
-                ))
-                fig.update_layout(title="Distribution Nutri-Score", height=300, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+            if 'nutriscore_grade' in df.columns:
+                afficher_figure(lambda: figure_barres(
+                    NUTRI_GRADES, comptes_grades(groupe, 'nutriscore_grade'),
+                    [COLORS.get(x, '#999') for x in NUTRI_GRADES], "Distribution Nutri-Score", 300),
+                    f"nutri_{cle}")
             
-            # ELECTRE TRI
-            st.markdown("#### ELECTRE TRI")
-            col1, col2 = st.columns(2)
+            # Audit: Nutri-Score 2025 recalculé vs grade stocké
+            if 'nutriscore_mismatch' in df.columns:
+                n_ecart = int(df['nutriscore_mismatch'].sum())
+                st.caption(f"🔎 Nutri-Score 2025 recalculé: {n_ecart} produit(s) avec un grade stocké différent")
             
-            with col1:
-                st.markdown("**λ = 0.6**")
-                # Pessimiste 0.6
-                if 'electre_pess_06' in df_yaourt.columns:
-                    p06 = df_yaourt['electre_pess_06'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=p06.index, y=p06.values, marker_color='#3498db',
-                                          text=p06.values, textposition='outside'))
-                    fig.update_layout(title="Pessimiste λ=0.6", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Optimiste 0.6
-                if 'electre_opt_06' in df_yaourt.columns:
-                    o06 = df_yaourt['electre_opt_06'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=o06.index, y=o06.values, marker_color='#2ecc71',
-                                          text=o06.values, textposition='outside'))
-                    fig.update_layout(title="Optimiste λ=0.6", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+            # ELECTRE TRI: une colonne par λ, pessimiste puis optimiste
+            st.markdown("#### ELECTRE TRI")
+            for col, suffixe, couleurs in zip(st.columns(2), ('06', '07'),
+                                              (('#3498db', '#2ecc71'), ('#e67e22', '#9b59b6'))):
+                with col:
+                    st.markdown(f"**λ = 0.{suffixe[1]}**")
+                    for procedure, nom, couleur in zip(('pess', 'opt'), ("Pessimiste", "Optimiste"), couleurs):
+                        colonne = f'electre_{procedure}_{suffixe}'
+                        if colonne in df.columns:
+                            afficher_figure(lambda: figure_barres(
+                                CLASSES, comptes_grades(groupe, colonne), couleur,
+                                f"{nom} λ=0.{suffixe[1]}", 250), f"{colonne}_{cle}")
             
-            with col2:
-                st.markdown("**λ = 0.7**")
-                # Pessimiste 0.7
-                if 'electre_pess_07' in df_yaourt.columns:
-                    p07 = df_yaourt['electre_pess_07'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=p07.index, y=p07.values, marker_color='#e67e22',
-                                          text=p07.values, textposition='outside'))
-                    fig.update_layout(title="Pessimiste λ=0.7", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Optimiste 0.7
-                if 'electre_opt_07' in df_yaourt.columns:
-                    o07 = df_yaourt['electre_opt_07'].value_counts().sort_index()
-                    fig = go.Figure(go.Bar(x=o07.index, y=o07.values, marker_color='#9b59b6',
-                                          text=o07.values, textposition='outside'))
-                    fig.update_layout(title="Optimiste λ=0.7", height=250, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
+            # λ libre et stabilité
+            afficher_lambda_libre(conc, cle)
+            with st.expander("📉 Stabilité en λ"):
+                afficher_stabilite_lambda(df, conc, cle)
+            with st.expander("🎲 Robustesse aux poids"):
+                afficher_robustesse_poids(df, conc, cle, P)
+            with st.expander("🧪 ELECTRE TRI complet (seuils q, p, veto)"):
+                afficher_electre_complet(conc, df, cle, P)
             
             # SuperNutri-Score
             st.markdown("#### SuperNutri-Score")
-            if 'supernutri_score' in df_yaourt.columns:
-                sn = df_yaourt['supernutri_score'].value_counts().sort_index()
-                fig = go.Figure(go.Bar(
-                    x=sn.index, y=sn.values,
-                    marker_color=[COLORS.get(x, '#999') for x in sn.index],
-                    text=sn.values, textposition='outside'
-                ))
-                fig.update_layout(title="Distribution SuperNutri-Score", height=300, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+            if 'supernutri_score' in df.columns:
+                afficher_figure(lambda: figure_barres(
+                    NUTRI_GRADES, comptes_grades(groupe, 'supernutri_score'),
+                    [COLORS.get(x, '#999') for x in NUTRI_GRADES], "Distribution SuperNutri-Score", 300),
+                    f"supernutri_{cle}")
             
             # Tableau de données
             st.markdown("#### Aperçu des données")
-            display_cols = ['product_name', 'nutriscore_grade', 'electre_pess_06', 'electre_opt_06',
+            display_cols = ['product_name', 'nutriscore_grade', 'nutriscore_grade_recalc',
+                           'electre_pess_06', 'electre_opt_06',
                            'electre_pess_07', 'electre_opt_07', 'supernutri_score']
-            display_cols = [c for c in display_cols if c in df_yaourt.columns]
-            st.dataframe(df_yaourt[display_cols].head(10), use_container_width=True)
-        else:
-            st.info("Chargez les vraies données pour voir les analyses complètes.")
+            display_cols = [c for c in display_cols if c in df.columns]
+            st.dataframe(df[display_cols].head(10), use_container_width=True, key=f"apercu_{cle}")
 
 # ============================================================
 # PAGE 3: COMPARAISON GROUPES
 # ============================================================
 elif page == "⚖️ Comparaison Groupes":
-    st.header("⚖️ Comparaison Pains vs Yaourts")
+    st.header(f"⚖️ Comparaison des groupes: {' vs '.join(str(g) for g in groupes)}")
     
     if is_real:
         # Nutri-Score
         st.subheader("1️⃣ Nutri-Score")
-        if 'nutriscore_grade' in df_pain.columns and 'nutriscore_grade' in df_yaourt.columns:
-            grades = ['A','B','C','D','E']
-            pc = df_pain['nutriscore_grade'].value_counts().reindex(grades, fill_value=0)
-            yc = df_yaourt['nutriscore_grade'].value_counts().reindex(grades, fill_value=0)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                marker_color='#3498db', text=pc.values, textposition='outside'))
-            fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                marker_color='#e74c3c', text=yc.values, textposition='outside'))
-            fig.update_layout(barmode='group', height=400, xaxis_title="Grade", yaxis_title="Nombre")
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # 显示每个grade的百分比
-            st.markdown("#### Répartition en pourcentage")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**🥖 Pains**")
-                for grade in grades:
-                    pct = (pc[grade] / len(df_pain) * 100)
-                    st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-            
-            with col2:
-                st.markdown("**🥛 Yaourts**")
-                for grade in grades:
-                    pct = (yc[grade] / len(df_yaourt) * 100)
-                    st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
+        if 'nutriscore_grade' in catalogue.columns:
+            afficher_comparaison('nutriscore_grade', ['A','B','C','D','E'], None, "nutri")
         
         # ELECTRE TRI
         st.markdown("---")
         st.subheader("2️⃣ ELECTRE TRI")
         
-        tab1, tab2, tab3, tab4 = st.tabs(["Pessimiste λ=0.6", "Optimiste λ=0.6", 
-                                          "Pessimiste λ=0.7", "Optimiste λ=0.7"])
-        
-        with tab1:
-            if 'electre_pess_06' in df_pain.columns and 'electre_pess_06' in df_yaourt.columns:
-                grades = ["A'","B'","C'","D'","E'"]
-                pc = df_pain['electre_pess_06'].value_counts().reindex(grades, fill_value=0)
-                yc = df_yaourt['electre_pess_06'].value_counts().reindex(grades, fill_value=0)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                    marker_color='#3498db', text=pc.values, textposition='outside'))
-                fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                    marker_color='#e74c3c', text=yc.values, textposition='outside'))
-                fig.update_layout(barmode='group', height=400, title="ELECTRE Pessimiste λ=0.6")
-                st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("#### Répartition en pourcentage")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**🥖 Pains**")
-                    for grade in grades:
-                        pct = (pc[grade] / len(df_pain) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-                with col2:
-                    st.markdown("**🥛 Yaourts**")
-                    for grade in grades:
-                        pct = (yc[grade] / len(df_yaourt) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-        
-        with tab2:
-            if 'electre_opt_06' in df_pain.columns and 'electre_opt_06' in df_yaourt.columns:
-                grades = ["A'","B'","C'","D'","E'"]
-                pc = df_pain['electre_opt_06'].value_counts().reindex(grades, fill_value=0)
-                yc = df_yaourt['electre_opt_06'].value_counts().reindex(grades, fill_value=0)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                    marker_color='#2ecc71', text=pc.values, textposition='outside'))
-                fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                    marker_color='#e74c3c', text=yc.values, textposition='outside'))
-                fig.update_layout(barmode='group', height=400, title="ELECTRE Optimiste λ=0.6")
-                st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("#### Répartition en pourcentage")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**🥖 Pains**")
-                    for grade in grades:
-                        pct = (pc[grade] / len(df_pain) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-                with col2:
-                    st.markdown("**🥛 Yaourts**")
-                    for grade in grades:
-                        pct = (yc[grade] / len(df_yaourt) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-        
-        with tab3:
-            if 'electre_pess_07' in df_pain.columns and 'electre_pess_07' in df_yaourt.columns:
-                grades = ["A'","B'","C'","D'","E'"]
-                pc = df_pain['electre_pess_07'].value_counts().reindex(grades, fill_value=0)
-                yc = df_yaourt['electre_pess_07'].value_counts().reindex(grades, fill_value=0)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                    marker_color='#e67e22', text=pc.values, textposition='outside'))
-                fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                    marker_color='#e74c3c', text=yc.values, textposition='outside'))
-                fig.update_layout(barmode='group', height=400, title="ELECTRE Pessimiste λ=0.7")
-                st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("#### Répartition en pourcentage")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**🥖 Pains**")
-                    for grade in grades:
-                        pct = (pc[grade] / len(df_pain) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-                with col2:
-                    st.markdown("**🥛 Yaourts**")
-                    for grade in grades:
-                        pct = (yc[grade] / len(df_yaourt) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-        
-        with tab4:
-            if 'electre_opt_07' in df_pain.columns and 'electre_opt_07' in df_yaourt.columns:
-                grades = ["A'","B'","C'","D'","E'"]
-                pc = df_pain['electre_opt_07'].value_counts().reindex(grades, fill_value=0)
-                yc = df_yaourt['electre_opt_07'].value_counts().reindex(grades, fill_value=0)
-                
+        variantes = [(f'electre_{procedure}_{suffixe_lambda(l)}', f"{nom} λ={l}")
+                     for l in LAMBDAS for procedure, nom in (('pess', "Pessimiste"), ('opt', "Optimiste"))]
+        onglets = st.tabs([nom for _, nom in variantes] + ["🎚️ λ libre"])
+        for onglet, (colonne, nom) in zip(onglets, variantes):
+            with onglet:
+                if colonne in catalogue.columns:
+                    afficher_comparaison(colonne, CLASSES, f"ELECTRE {nom}", colonne)
+        
+        with onglets[-1]:
+            # Reclassement instantané: seuil sur les concordances précalculées
+            lambda_val = st.slider("λ", LAMBDA_MIN, LAMBDA_MAX, 0.6, 0.01, key="lambda_comparaison")
+            
+            def figure_lambda(k, nom):
                 fig = go.Figure()
-                fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                    marker_color='#9b59b6', text=pc.values, textposition='outside'))
-                fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                    marker_color='#e74c3c', text=yc.values, textposition='outside'))
-                fig.update_layout(barmode='group', height=400, title="ELECTRE Optimiste λ=0.7")
-                st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("#### Répartition en pourcentage")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**🥖 Pains**")
-                    for grade in grades:
-                        pct = (pc[grade] / len(df_pain) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-                with col2:
-                    st.markdown("**🥛 Yaourts**")
-                    for grade in grades:
-                        pct = (yc[grade] / len(df_yaourt) * 100)
-                        st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
+                for i, groupe in enumerate(groupes):
+                    codes = classes_depuis_concordances(vue_groupe(groupe)[1], lambda_val)[k]
+                    comptes = np.bincount(codes, minlength=len(CLASSES))
+                    fig.add_trace(go.Bar(name=libelle_groupe(groupe), x=CLASSES, y=comptes,
+                                         marker_color=COULEURS_GROUPES[i % len(COULEURS_GROUPES)],
+                                         text=comptes, textposition='outside'))
+                fig.update_layout(barmode='group', height=400, title=f"ELECTRE {nom} λ={lambda_val:.2f}")
+                return fig
+            
+            for col, k, nom in zip(st.columns(2), (0, 1), ("Pessimiste", "Optimiste")):
+                with col:
+                    afficher_figure(lambda: figure_lambda(k, nom), f"comparaison_lambda_{nom}", lambda_val)
         
         # SuperNutri-Score
         st.markdown("---")
         st.subheader("3️⃣ SuperNutri-Score")
-        if 'supernutri_score' in df_pain.columns and 'supernutri_score' in df_yaourt.columns:
-            grades = ['A','B','C','D','E']
-            pc = df_pain['supernutri_score'].value_counts().reindex(grades, fill_value=0)
-            yc = df_yaourt['supernutri_score'].value_counts().reindex(grades, fill_value=0)
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='🥖 Pains', x=grades, y=pc.values,
-                                marker_color='#3498db', text=pc.values, textposition='outside'))
-            fig.add_trace(go.Bar(name='🥛 Yaourts', x=grades, y=yc.values,
-                                marker_color='#e74c3c', text=yc.values, textposition='outside'))
-            fig.update_layout(barmode='group', height=400, xaxis_title="Grade", yaxis_title="Nombre")
-            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown("#### Répartition en pourcentage")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("**🥖 Pains**")
-                for grade in grades:
-                    pct = (pc[grade] / len(df_pain) * 100)
-                    st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
-            with col2:
-                st.markdown("**🥛 Yaourts**")
-                for grade in grades:
-                    pct = (yc[grade] / len(df_yaourt) * 100)
-                    st.metric(f"Grade {grade}", f"{pct:.1f}%", label_visibility="visible")
+        if 'supernutri_score' in catalogue.columns:
+            afficher_comparaison('supernutri_score', ['A','B','C','D','E'], None, "supernutri")
     else:
         st.info("Chargez les vraies données pour voir les comparaisons complètes.")
 
@@ -1876,4 +1848,28 @@ st.markdown("""
     <p><strong>SuperNutri-Score</strong> - Projet ELECTRE TRI</p>
     <p style='font-size:0.9rem;'>3 algorithmes: Nutri-Score + ELECTRE TRI + SuperNutri-Score</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Mesures du rafraîchissement: journal commun (trace JSONL si SUPERNUTRI_TRACE), panneau optionnel
+def afficher_mesures(rerun, resume):
+    """Détail des étapes du rafraîchissement, comptes de cache et p50 / p95 de la page"""
+    st.caption(f"Total: {rerun['duree_ms']:.0f} ms")
+    st.dataframe(pd.DataFrame({
+        "Étape": ["\u2003" * e['profondeur'] + e['nom'] for e in rerun['etapes']],
+        "ms": [round(e['duree_ms'], 1) for e in rerun['etapes']],
+        "%": [round(100 * e['duree_ms'] / rerun['duree_ms'], 1) for e in rerun['etapes']],
+    }), hide_index=True, use_container_width=True, key="mesures_etapes")
+    if rerun['caches']:
+        st.dataframe(pd.DataFrame.from_dict(resume['caches'], orient='index'),
+                     use_container_width=True, key="mesures_caches")
+    page_resume = resume['pages'].get(rerun['page'])
+    if page_resume:
+        st.caption(f"Page sur {page_resume['n']} rafraîchissements: "
+                   f"p50 {page_resume['p50_ms']:.0f} ms, p95 {page_resume['p95_ms']:.0f} ms")
+
+journal_mesures = get_journal_mesures()
+rerun_mesure = mesures_rerun.terminer(page)
+journal_mesures.enregistrer(rerun_mesure)
+if st.sidebar.checkbox("⏱️ Mesures du rafraîchissement", key="mesures_panneau"):
+    with st.sidebar:
+        afficher_mesures(rerun_mesure, journal_mesures.resume())
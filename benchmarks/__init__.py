@@ -0,0 +1 @@
+"""Benchmarks, lancés depuis la racine du dépôt: python -m benchmarks.<script>"""
@@ -0,0 +1,80 @@
+"""Cube des distributions de grades (cube.py) contre des value_counts par rafraîchissement.
+
+Mesure, sur un grand catalogue synthétique scoré:
+- ce que coûtaient les pages Analyse et Comparaison à chaque rafraîchissement
+  (value_counts().reindex par méthode × groupe);
+- la construction du cube (une fois, au calcul des scores) et sa lecture;
+- la mise à jour incrémentale après modification de quelques lignes, vérifiée
+  contre une reconstruction complète.
+
+    python -m benchmarks.bench_cube
+    python -m benchmarks.bench_cube --produits 5000000 --categories 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_electre import dataframe_synthetique
+from chargement import typer_morceau
+from cube import METHODES, construire_cube, cube_incremental, distribution
+from electre import construire_profils, profils_en_tableau
+from scoring import score_incremental
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--modifications', type=int, nargs='+', default=[10, 1_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    brut = dataframe_synthetique(args.produits)
+    brut['category'] = rng.integers(args.categories, size=len(brut)).astype(str)
+    df = typer_morceau(brut.astype({c: 'string' for c in ('nutriscore_grade', 'ecoscore_grade', 'is_organic')}))
+    P = profils_en_tableau(construire_profils(df))
+    precedent = score_incremental(df, P)
+    df_calc = precedent[0]
+    methodes = [m for m in METHODES if m in df_calc.columns]
+
+    t0 = time.perf_counter()
+    indices = df_calc.groupby('category', observed=True).indices
+    for positions in indices.values():
+        vue = df_calc.iloc[positions]
+        for m in methodes:
+            vue[m].astype('string').value_counts()
+    par_rafraichissement = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cube = construire_cube(df_calc, 'category')
+    construction = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for groupe in cube[1]:
+        for m in methodes:
+            distribution(cube, groupe, m)
+    lecture = time.perf_counter() - t0
+    print(f"{args.produits:,} produits, {len(cube[1])} catégories × {len(methodes)} méthodes")
+    print(f"value_counts à chaque rafraîchissement: {par_rafraichissement:.2f} s")
+    print(f"Cube: construction {construction:.2f} s (une fois), lecture {lecture * 1000:.1f} ms\n")
+
+    print(f"{'lignes modifiées':>18} {'mise à jour (s)':>16} {'reconstruction (s)':>19}")
+    for n in args.modifications:
+        modifie = df.copy()
+        lignes = rng.choice(len(df), n, replace=False)
+        modifie.loc[lignes, 'sugar'] = (modifie.loc[lignes, 'sugar'] * 3 + 5).astype('float32')
+        nouveau, _, _, rapport = score_incremental(modifie, P, precedent[:3])
+
+        t0 = time.perf_counter()
+        incremental = cube_incremental(cube, df_calc, nouveau, rapport['sources'], 'category')
+        mise_a_jour = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        complet = construire_cube(nouveau, 'category')
+        reconstruction = time.perf_counter() - t0
+        np.testing.assert_array_equal(incremental[0], complet[0])
+        assert list(incremental[1]) == list(complet[1])
+        print(f"{n:>18,} {mise_a_jour:>16.3f} {reconstruction:>19.3f}")
+
+
+if __name__ == '__main__':
+    main()
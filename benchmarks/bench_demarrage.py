@@ -0,0 +1,76 @@
+"""Démarrage à froid avec et sans le cache disque des scores (cache_scores).
+
+Reproduit le chemin de app.py (lecture du CSV, profils, concordances, scores)
+sur un grand catalogue synthétique, puis le même démarrage quand l'entrée du
+cache existe déjà: les scores sont relus en mémoire mappée au lieu d'être
+recalculés.
+
+    python -m benchmarks.bench_demarrage
+    python -m benchmarks.bench_demarrage --produits 5000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from cache_scores import cle_cache, ecrire_scores, lire_scores
+from chargement import lire_catalogue
+from electre import concordances_catalogue, construire_profils, matrice_criteres, profils_en_tableau
+from scoring import score_dataframe
+
+
+def demarrer(chemin, repertoire):
+    """Chemin de démarrage de app.py; retourne les durées par étape"""
+    durees = {}
+    t0 = time.perf_counter()
+    df, rapport = lire_catalogue(chemin)
+    durees['lecture CSV + empreinte'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    P = profils_en_tableau(construire_profils(df))
+    durees['profils'] = time.perf_counter() - t0
+
+    cle = cle_cache(rapport['empreinte'], P)
+    t0 = time.perf_counter()
+    en_cache = lire_scores(cle, repertoire)
+    if en_cache is not None:
+        tables, tableaux = en_cache
+        durees['lecture du cache'] = time.perf_counter() - t0
+        return durees, tables['catalogue']
+
+    t0 = time.perf_counter()
+    conc = concordances_catalogue(matrice_criteres(df), P)
+    df_calc = score_dataframe(df, P, conc=conc)
+    durees['scores'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ecrire_scores(cle, {'catalogue': df_calc}, {'conc': conc}, repertoire)
+    durees['écriture du cache'] = time.perf_counter() - t0
+    return durees, df_calc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'Products.csv')
+        dataframe_synthetique(args.produits).to_csv(chemin, index=False)
+        repertoire = os.path.join(dossier, 'cache')
+
+        froid, calcule = demarrer(chemin, repertoire)
+        chaud, relu = demarrer(chemin, repertoire)
+        pd.testing.assert_frame_equal(calcule, relu)
+
+    print(f"{args.produits:,} produits")
+    for titre, durees in (("Sans cache", froid), ("Avec cache", chaud)):
+        detail = ", ".join(f"{etape} {d:.2f} s" for etape, d in durees.items())
+        print(f"{titre:>12}: {sum(durees.values()):7.2f} s  ({detail})")
+
+
+if __name__ == '__main__':
+    main()
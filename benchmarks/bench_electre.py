@@ -0,0 +1,121 @@
+"""Benchmark du moteur ELECTRE TRI vectorisé.
+
+Vérifie d'abord que les classes sont identiques à la version ligne par ligne
+(sur Products.csv + data_yaourt.csv et sur un échantillon synthétique), puis
+mesure le temps de classification à 10k, 1M et 10M produits.
+
+    python -m benchmarks.bench_electre
+    python -m benchmarks.bench_electre --tailles 10000 1000000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from electre import (CRITERES, LAMBDAS, classer, classes_depuis_concordances,
+                     classify_product, concordances_catalogue, construire_profils, libelles,
+                     matrice_criteres, profils_en_tableau)
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def catalogue_synthetique(n, seed=0):
+    """Matrice (n × 8) de critères aux distributions proches des vraies données"""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, len(CRITERES)), dtype=np.float64)
+    X[:, 0] = rng.normal(1100, 350, n).clip(100, 3500)          # energy_kj
+    X[:, 1] = rng.gamma(1.5, 1.5, n)                             # saturated_fat
+    X[:, 2] = rng.gamma(1.2, 4.0, n)                             # sugar
+    X[:, 3] = rng.gamma(2.0, 0.2, n)                             # sodium_g
+    X[:, 4] = rng.normal(7, 2.5, n).clip(0, 30)                  # protein
+    X[:, 5] = rng.gamma(1.5, 2.0, n)                             # fiber
+    X[:, 6] = np.where(rng.random(n) < 0.8, 0, rng.uniform(0, 100, n))  # fruits_veg_nuts_pct
+    X[:, 7] = rng.poisson(2.5, n)                                # additives_count
+    # Quelques valeurs manquantes, comme dans data_yaourt.csv
+    X[rng.random(n) < 0.01, 0] = np.nan
+    return X
+
+
+def dataframe_synthetique(n, seed=0):
+    """Catalogue synthétique au format de Products.csv (identifiants, nutriments, grades, bio)"""
+    rng = np.random.default_rng(seed)
+    X = catalogue_synthetique(n, seed)
+    df = pd.DataFrame({
+        'product_id': [f"S{i:08d}" for i in range(n)],
+        'product_name': [f"Produit {i}" for i in range(n)],
+        'brand': rng.choice(['Marque A', 'Marque B', 'Marque C', 'Marque D'], n),
+        'category': 'Pains',
+    })
+    for j, crit in enumerate(CRITERES):
+        df[crit] = X[:, j].round(2)
+    df['energy_kcal'] = (df['energy_kj'] / 4.184).round()
+    df['sodium_mg'] = (df['sodium_g'] * 1000).round()
+    df['is_organic'] = rng.choice(['Yes', 'No'], n, p=[0.2, 0.8])
+    df['nutriscore_grade'] = rng.choice(list('ABCDE'), n)
+    df['ecoscore_grade'] = rng.choice(list('ABCDE'), n)
+    return df
+
+
+def verifier_equivalence(X, P, profils):
+    """Compare la version vectorisée à la version ligne par ligne"""
+    resultats = classer(X, P, LAMBDAS)
+    for ligne, x in enumerate(X):
+        produit = dict(zip(CRITERES, x))
+        for l in LAMBDAS:
+            attendu = classify_product(produit, profils, l)
+            obtenu = (libelles(resultats[l][0][ligne]), libelles(resultats[l][1][ligne]))
+            if attendu != obtenu:
+                raise AssertionError(f"ligne {ligne}, λ={l}: {obtenu} != {attendu}")
+    return len(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tailles', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    pain = pd.read_csv(os.path.join(RACINE, "Products.csv"), encoding='utf-8-sig')
+    yaourt = pd.read_csv(os.path.join(RACINE, "data_yaourt.csv"), encoding='utf-8-sig')
+    profils = construire_profils(pain, yaourt)
+    P = profils_en_tableau(profils)
+
+    n = verifier_equivalence(matrice_criteres(pd.concat([pain, yaourt])), P, profils)
+    n += verifier_equivalence(catalogue_synthetique(10_000, seed=1), P, profils)
+    print(f"Équivalence ligne par ligne vérifiée sur {n} produits")
+
+    # Référence ligne par ligne sur 10k produits, extrapolée
+    X = catalogue_synthetique(10_000)
+    t0 = time.perf_counter()
+    for x in X:
+        produit = dict(zip(CRITERES, x))
+        for l in LAMBDAS:
+            classify_product(produit, profils, l)
+    ligne_par_ligne = (time.perf_counter() - t0) / len(X)
+
+    print(f"{'produits':>12} {'vectorisé (s)':>14} {'produits/s':>14} {'ligne/ligne estimé (s)':>24}"
+          f" {'nouveau λ (ms)':>16}")
+    for taille in args.tailles:
+        X = catalogue_synthetique(taille)
+        temps = []
+        for _ in range(args.repetitions):
+            t0 = time.perf_counter()
+            classer(X, P, LAMBDAS)
+            temps.append(time.perf_counter() - t0)
+        meilleur = min(temps)
+
+        # Reclassement pour un nouveau λ à partir des concordances gardées en cache
+        conc = concordances_catalogue(X, P)
+        t0 = time.perf_counter()
+        classes_depuis_concordances(conc, 0.63)
+        nouveau_lambda = time.perf_counter() - t0
+
+        print(f"{taille:>12,} {meilleur:>14.3f} {taille / meilleur:>14,.0f} {ligne_par_ligne * taille:>24.1f}"
+              f" {nouveau_lambda * 1000:>16.1f}")
+        del X, conc
+
+
+if __name__ == '__main__':
+    main()
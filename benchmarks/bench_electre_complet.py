@@ -0,0 +1,86 @@
+"""Benchmark d'ELECTRE TRI complet (seuils q, p et veto).
+
+Vérifie que le cas q = p = 0 sans veto redonne exactement le modèle binaire
+(pour tous les paliers de λ), que le noyau vectorisé concorde avec la version
+ligne par ligne (indice_credibilite) avec SEUILS_NUTRITION, puis mesure le
+temps de calcul des indices de crédibilité par blocs.
+
+    python -m benchmarks.bench_electre_complet
+    python -m benchmarks.bench_electre_complet --tailles 1000000 10000000
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.bench_electre import catalogue_synthetique
+from electre import (CRITERES, LAMBDAS, POIDS, SEUILS_BINAIRES, SEUILS_NUTRITION,
+                     classes_depuis_concordances, classes_depuis_credibilites, classify_product,
+                     concordances_catalogue, construire_profils, credibilites_catalogue, libelles,
+                     matrice_criteres, profils_en_tableau)
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def verifier_cas_binaire(X, P):
+    """q = p = 0 sans veto: mêmes classes que le modèle binaire, à chaque palier k / Σ(poids)"""
+    conc = concordances_catalogue(X, P)
+    sigma = credibilites_catalogue(X, P, SEUILS_BINAIRES)
+    denom = sum(POIDS.values())
+    for l in list(LAMBDAS) + [k / denom for k in range(denom + 1)]:
+        for attendu, obtenu in zip(classes_depuis_concordances(conc, l), classes_depuis_credibilites(sigma, l)):
+            if not (attendu == obtenu).all():
+                raise AssertionError(f"λ={l}: le cas binaire diffère du modèle binaire")
+
+
+def verifier_ligne_par_ligne(X, P, profils, pas=1):
+    """Noyau vectorisé contre indice_credibilite, avec SEUILS_NUTRITION"""
+    sigma = credibilites_catalogue(X, P, SEUILS_NUTRITION)
+    for l in LAMBDAS:
+        pess, opt = classes_depuis_credibilites(sigma, l)
+        for ligne in range(0, len(X), pas):
+            attendu = classify_product(dict(zip(CRITERES, X[ligne])), profils, l, SEUILS_NUTRITION)
+            obtenu = (libelles(pess[ligne]), libelles(opt[ligne]))
+            if attendu != obtenu:
+                raise AssertionError(f"ligne {ligne}, λ={l}: {obtenu} != {attendu}")
+    return len(range(0, len(X), pas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tailles', type=int, nargs='+', default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    pain = pd.read_csv(os.path.join(RACINE, "Products.csv"), encoding='utf-8-sig')
+    yaourt = pd.read_csv(os.path.join(RACINE, "data_yaourt.csv"), encoding='utf-8-sig')
+    profils = construire_profils(pain, yaourt)
+    P = profils_en_tableau(profils)
+
+    reel = matrice_criteres(pd.concat([pain, yaourt]))
+    synthetique = catalogue_synthetique(20_000, seed=1)
+    verifier_cas_binaire(reel, P)
+    verifier_cas_binaire(synthetique, P)
+    print("Cas q = p = 0 sans veto identique au modèle binaire")
+    n = verifier_ligne_par_ligne(reel, P, profils) + verifier_ligne_par_ligne(synthetique, P, profils, pas=4)
+    print(f"Version vectorisée identique à la version ligne par ligne sur {n} produits")
+
+    binaires = classes_depuis_concordances(concordances_catalogue(reel, P), 0.6)[0]
+    complets = classes_depuis_credibilites(credibilites_catalogue(reel, P, SEUILS_NUTRITION), 0.6)[0]
+    print(f"Pains + Yaourts: {(binaires != complets).mean():.1%} des produits changent de classe pessimiste λ=0.6\n")
+
+    print(f"{'produits':>12} {'binaire (s)':>12} {'complet (s)':>12} {'produits/s':>12}")
+    for taille in args.tailles:
+        X = catalogue_synthetique(taille)
+        t0 = time.perf_counter()
+        concordances_catalogue(X, P)
+        binaire = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        credibilites_catalogue(X, P, SEUILS_NUTRITION)
+        complet = time.perf_counter() - t0
+        print(f"{taille:>12,} {binaire:>12.3f} {complet:>12.3f} {taille / complet:>12,.0f}")
+        del X
+
+
+if __name__ == '__main__':
+    main()
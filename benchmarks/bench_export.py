@@ -0,0 +1,135 @@
+"""Export des produits scorés (export.py): durée, taille du fichier et pic de mémoire par format.
+
+Le catalogue synthétique (generer_catalogues.py) est scoré une fois puis
+enregistré; chaque mesure tourne dans un processus neuf qui le relit et
+exporte ses n premières lignes, dans l'ordre du SuperNutri-Score:
+
+- morceaux: exporter(), morceaux de TAILLE_MORCEAU lignes (XLSX en mode
+  write_only d'openpyxl, CSV en ajout, Parquet par groupes de lignes);
+- bloc: sélection copiée en entier puis to_csv / to_parquet / to_excel
+  (XLSX limité à --max-bloc-xlsx lignes).
+
+Le pic est l'écart entre la mémoire résidente la plus haute pendant l'export
+(relevée toutes les 10 ms) et celle d'avant l'export.
+
+    python -m benchmarks.bench_export
+    python -m benchmarks.bench_export --tailles 100000 1000000 --formats xlsx
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.suite import charger, preparer
+from export import EXTENSIONS, exporter
+from profils import ProfilsELECTRE, profils_communs
+from scoring import score_incremental
+
+MO = 2 ** 20
+PAGE = os.sysconf('SC_PAGE_SIZE')
+
+
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * PAGE
+
+
+class Pic:
+    """Mémoire résidente la plus haute relevée pendant le bloc with"""
+
+    def __init__(self, intervalle=0.01):
+        self.intervalle = intervalle
+        self.max = 0
+        self._fin = threading.Event()
+
+    def _relever(self):
+        while not self._fin.wait(self.intervalle):
+            self.max = max(self.max, rss())
+
+    def __enter__(self):
+        self.max = rss()
+        self._fil = threading.Thread(target=self._relever, daemon=True)
+        self._fil.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._fin.set()
+        self._fil.join()
+        self.max = max(self.max, rss())
+
+
+def en_bloc(df, chemin, fmt):
+    if fmt == 'csv':
+        df.to_csv(chemin, index=False)
+    elif fmt == 'parquet':
+        df.to_parquet(chemin, index=False)
+    else:
+        df.to_excel(chemin, index=False)
+
+
+def mesurer(scores, fmt, n, mode):
+    """Durée (s), taille du fichier (Mo) et pic de mémoire (Mo) d'un export, dans ce processus"""
+    df = pd.read_pickle(scores)
+    positions = np.argsort(df['supernutri_score'].cat.codes.to_numpy(), kind='stable')[:n]
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, f"export{EXTENSIONS[fmt]}")
+        avant = rss()
+        t0 = time.perf_counter()
+        with Pic() as pic:
+            if mode == 'morceaux':
+                exporter(df, chemin, fmt, positions)
+            else:
+                en_bloc(df.iloc[positions], chemin, fmt)
+        duree = time.perf_counter() - t0
+        return {'duree': duree, 'fichier': os.path.getsize(chemin) / MO, 'pic': (pic.max - avant) / MO}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--donnees', default=os.path.join(tempfile.gettempdir(), 'supernutri_bench'))
+    parser.add_argument('--tailles', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help="nombres de lignes exportées")
+    parser.add_argument('--formats', nargs='+', default=['csv', 'parquet', 'xlsx'], choices=sorted(EXTENSIONS))
+    parser.add_argument('--max-bloc-xlsx', type=int, default=100_000,
+                        help="au-delà, to_excel n'est pas mesuré (trop lent)")
+    parser.add_argument('--mesure', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesure:
+        scores, fmt, n, mode = args.mesure
+        print(json.dumps(mesurer(scores, fmt, int(n), mode)))
+        return
+
+    chemins = preparer(args.donnees, args.produits, args.seed)
+    catalogue = charger(chemins)
+    scores = score_incremental(catalogue, ProfilsELECTRE(profils_communs(catalogue), 'export').P)[0]
+    print(f"{len(scores):,} produits, {scores.shape[1]} colonnes")
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_scores = os.path.join(dossier, 'scores.pkl')
+        scores.to_pickle(chemin_scores)
+        del catalogue, scores
+        print(f"{'format':<8} {'lignes':>10} {'mode':<9} {'durée (s)':>10} {'fichier (Mo)':>13} {'pic (Mo)':>9}")
+        for fmt in args.formats:
+            for n in args.tailles:
+                for mode in ('morceaux', 'bloc'):
+                    if mode == 'bloc' and fmt == 'xlsx' and n > args.max_bloc_xlsx:
+                        continue
+                    sortie = subprocess.run([sys.executable, '-m', __spec__.name, '--mesure',
+                                             chemin_scores, fmt, str(n), mode],
+                                            capture_output=True, text=True, check=True).stdout
+                    r = json.loads(sortie.strip().splitlines()[-1])
+                    print(f"{fmt:<8} {n:>10,} {mode:<9} {r['duree']:>10.2f} {r['fichier']:>13.1f} {r['pic']:>9.1f}",
+                          flush=True)
+
+
+if __name__ == '__main__':
+    main()
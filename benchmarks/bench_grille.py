@@ -0,0 +1,81 @@
+"""Grille paginée côté serveur (grille.py): filtres, comptes par grade et page triée.
+
+Sur un grand catalogue synthétique scoré, compare chaque filtre au même
+filtre écrit en pandas, puis mesure la durée d'une requête de la grille
+(masque + nombre total + comptes de toutes les colonnes de grades + page
+triée), avec l'ordre de tri déjà calculé et au premier tri.
+
+    python -m benchmarks.bench_grille
+    python -m benchmarks.bench_grille --produits 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from chargement import typer_morceau
+from electre import construire_profils, profils_en_tableau
+from grille import GrilleProduits
+from scoring import score_dataframe
+
+FILTRES = {
+    'sans filtre': {},
+    'SuperNutri A/B': {'modalites': {'supernutri_score': ['A', 'B']}},
+    'bio, Eco-Score A': {'modalites': {'ecoscore_grade': ['A']}, 'bio': True},
+    'catégorie + sucres ≤ 5 g + ELECTRE': {'modalites': {'category': ['3', '7'], 'electre_pess_06': ["A'", "B'"]},
+                                           'plages': {'sugar': (0, 5)}},
+}
+
+
+def filtre_pandas(df, modalites=None, bio=None, plages=None):
+    masque = pd.Series(True, index=df.index)
+    for c, valeurs in (modalites or {}).items():
+        masque &= df[c].astype('string').isin(valeurs).fillna(False)
+    if bio is not None:
+        masque &= df['is_organic'] == bio
+    for c, (bas, haut) in (plages or {}).items():
+        masque &= df[c].between(bas, haut).fillna(False)
+    return masque.to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    brut = dataframe_synthetique(args.produits)
+    df = typer_morceau(brut.astype({c: 'string' for c in ('nutriscore_grade', 'ecoscore_grade', 'is_organic')}))
+    df = score_dataframe(df, profils_en_tableau(construire_profils(df)))
+    df['category'] = pd.Categorical(rng.integers(args.categories, size=len(df)).astype(str))
+
+    t0 = time.perf_counter()
+    grille = GrilleProduits(df, 'category')
+    print(f"{args.produits:,} produits: grille construite en {time.perf_counter() - t0:.2f} s\n")
+
+    print(f"{'filtre':>36} {'retenus':>10} {'1er tri (s)':>12} {'requête (ms)':>13}")
+    for nom, filtre in FILTRES.items():
+        masque = grille.filtrer(**filtre)
+        np.testing.assert_array_equal(masque, filtre_pandas(df, **filtre))
+        grille._ordres.clear()
+        t0 = time.perf_counter()
+        grille.page(masque, tri='sugar', croissant=False)
+        premier = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        masque = grille.filtrer(**filtre)
+        total = int(masque.sum())
+        grille.comptes(masque)
+        page = grille.page(masque, 3, tri='sugar', croissant=False)
+        duree = (time.perf_counter() - t0) * 1000
+
+        attendu = df[masque].sort_values('sugar', ascending=False, kind='stable').iloc[150:200]
+        pd.testing.assert_frame_equal(page, attendu)
+        print(f"{nom:>36} {total:>10,} {premier:>12.2f} {duree:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Profils par catégorie en une passe groupby et classement parallèle par catégorie.
+
+Compare construire_profils_groupes (une seule passe de quantiles groupée) à
+une boucle construire_profils par catégorie, vérifie que les profils sont
+identiques, puis mesure score_groupes avec 1 et N processus.
+
+    python -m benchmarks.bench_groupes
+    python -m benchmarks.bench_groupes --produits 5000000 --categories 50 --jobs 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from electre import construire_profils, construire_profils_groupes, profils_en_tableau
+from scoring import score_groupes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=30)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = dataframe_synthetique(args.produits)
+    df['category'] = pd.Categorical(rng.integers(args.categories, size=len(df)).astype(str))
+
+    t0 = time.perf_counter()
+    boucle = {g: construire_profils(df[df['category'] == g]) for g in df['category'].cat.categories}
+    duree_boucle = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    groupes = construire_profils_groupes(df, 'category')
+    duree_groupby = time.perf_counter() - t0
+
+    for g, profils in boucle.items():
+        if not np.array_equal(profils_en_tableau(profils), profils_en_tableau(groupes[g])):
+            raise AssertionError(f"catégorie {g}: profils différents")
+    print(f"{args.produits:,} produits, {args.categories} catégories: profils identiques")
+    print(f"Profils: boucle par catégorie {duree_boucle:.2f} s | une passe groupby {duree_groupby:.2f} s")
+
+    profils = {g: profils_en_tableau(p) for g, p in groupes.items()}
+    durees = {}
+    for jobs in sorted({1, args.jobs}):
+        t0 = time.perf_counter()
+        score_groupes(df, profils, 'category', jobs=jobs)
+        durees[jobs] = time.perf_counter() - t0
+    print("Classement par catégorie: " + " | ".join(f"{j} processus {d:.2f} s" for j, d in durees.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Recalcul incrémental après modification de quelques lignes du catalogue.
+
+Un catalogue synthétique est scoré une fois, puis on modifie 10, 1 000 et
+100 000 lignes: seules ces lignes doivent être reclassées, et le résultat doit
+être identique à un recalcul complet avec les mêmes profils. Chaque résultat
+est aussi écrit dans un cache disque temporaire (cache_scores), élagué à
+--entrees entrées: l'entrée désignée par « dernier » doit toujours survivre,
+même quand elle est la plus ancienne.
+
+    python -m benchmarks.bench_incremental
+    python -m benchmarks.bench_incremental --produits 5000000 --modifications 100 10000
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from cache_scores import _cle_dernier, _est_entree, ecrire_scores, elaguer, lire_dernier
+from chargement import typer_morceau
+from electre import construire_profils, profils_en_tableau, profils_proches
+from scoring import score_incremental
+
+
+def entrees(repertoire):
+    return [nom for nom in os.listdir(repertoire) if _est_entree(nom)]
+
+
+def verifier_cache(repertoire, cle, df_calc, garder):
+    """Après l'écriture de `cle`: elle est « dernier », relisible, et le répertoire reste borné"""
+    if _cle_dernier(repertoire) != cle:
+        raise AssertionError("« dernier » ne désigne pas la dernière entrée écrite")
+    pd.testing.assert_frame_equal(lire_dernier(repertoire)[0]['catalogue'], df_calc)
+    if len(entrees(repertoire)) > garder + 1:
+        raise AssertionError(f"{len(entrees(repertoire))} entrées gardées (limite {garder} + « dernier »)")
+
+
+def verifier_elagage(repertoire):
+    """L'entrée « dernier », rendue la plus ancienne, survit à un élagage qui ne garde rien"""
+    protegee = _cle_dernier(repertoire)
+    os.utime(os.path.join(repertoire, protegee), (0, 0))
+    elaguer(repertoire, garder=0)
+    if entrees(repertoire) != [protegee]:
+        raise AssertionError(f"élagage: {entrees(repertoire)} au lieu de [{protegee}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--modifications', type=int, nargs='+', default=[10, 1_000, 100_000])
+    parser.add_argument('--entrees', type=int, default=2, help="entrées gardées par l'élagage du cache disque")
+    args = parser.parse_args()
+
+    brut = dataframe_synthetique(args.produits)
+    df = typer_morceau(brut.astype({c: 'string' for c in ('nutriscore_grade', 'ecoscore_grade', 'is_organic')}))
+    P = profils_en_tableau(construire_profils(df))
+
+    t0 = time.perf_counter()
+    precedent = score_incremental(df, P)
+    complet = time.perf_counter() - t0
+    print(f"{args.produits:,} produits, calcul complet: {complet:.2f} s")
+
+    repertoire = tempfile.mkdtemp(prefix='cache_incremental_')
+
+    rng = np.random.default_rng(0)
+    print(f"{'lignes modifiées':>18} {'réutilisées':>12} {'recalculées':>12} {'durée (s)':>10} {'profils stables':>16}")
+    for n in args.modifications:
+        modifie = df.copy()
+        lignes = rng.choice(len(df), n, replace=False)
+        modifie.loc[lignes, 'sugar'] = (modifie.loc[lignes, 'sugar'] * 1.5 + 1).astype('float32')
+
+        t0 = time.perf_counter()
+        df_calc, conc, empreintes, rapport = score_incremental(modifie, P, precedent[:3])
+        duree = time.perf_counter() - t0
+
+        attendu = score_incremental(modifie, P)
+        pd.testing.assert_frame_equal(df_calc, attendu[0])
+        np.testing.assert_array_equal(conc, attendu[1])
+
+        cle = f"{n:064x}"
+        ecrire_scores(cle, {'catalogue': df_calc}, {'conc': conc, 'empreintes': empreintes}, repertoire)
+        elaguer(repertoire, garder=args.entrees)
+        verifier_cache(repertoire, cle, df_calc, args.entrees)
+
+        stables = profils_proches(P, profils_en_tableau(construire_profils(modifie)))
+        print(f"{n:>18,} {rapport['reutilisees']:>12,} {rapport['recalculees']:>12,} {duree:>10.2f}"
+              f" {'oui' if stables else 'non':>16}")
+
+    verifier_elagage(repertoire)
+    shutil.rmtree(repertoire)
+    print(f"Cache disque: au plus {args.entrees} entrées en plus de « dernier », qui n'est jamais élaguée")
+
+
+if __name__ == '__main__':
+    main()
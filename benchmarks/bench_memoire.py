@@ -0,0 +1,68 @@
+"""Mémoire par colonne du catalogue, lu tel quel et normalisé (chargement.py).
+
+Les deux fichiers synthétiques (generer_catalogues.py) sont lus une fois avec
+les types par défaut de pandas (textes en object, nombres en float64 / int64,
+`brand` et `marque` côte à côte) et une fois par lire_catalogue et
+assembler_catalogue (schéma canonique typé). Les colonnes de scores (classes
+ELECTRE, SuperNutri) sont comparées en chaînes object et en catégories.
+Chaque colonne brute est comptée sous son nom canonique.
+
+    python -m benchmarks.bench_memoire
+    python -m benchmarks.bench_memoire --produits 10000000
+"""
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.suite import preparer
+from chargement import assembler_catalogue, lire_catalogue, nom_canonique
+from profils import ProfilsELECTRE, profils_communs
+from scoring import score_dataframe
+
+MO = 2 ** 20
+
+
+def memoire(df):
+    """Mo par colonne, sous le nom canonique (les synonymes sont additionnés)"""
+    octets = df.memory_usage(deep=True, index=False)
+    return octets.groupby(octets.index.map(nom_canonique), sort=False).sum() / MO
+
+
+def brut(chemins):
+    """Les fichiers lus sans types ni renommage, réunis comme le fait assembler_catalogue"""
+    return pd.concat([pd.read_csv(chemin, encoding='utf-8-sig').assign(groupe=groupe)
+                      for groupe, chemin in chemins.items()], ignore_index=True)
+
+
+def afficher(titre, avant, apres, noms=("brut", "normalisé")):
+    rapport = pd.DataFrame({noms[0]: avant, noms[1]: apres})
+    rapport['gain'] = rapport[noms[0]] / rapport[noms[1]]
+    rapport.loc['total'] = [rapport[noms[0]].sum(), rapport[noms[1]].sum(),
+                            rapport[noms[0]].sum() / rapport[noms[1]].sum()]
+    print(f"\n{titre} (Mo)")
+    print(rapport.to_string(float_format=lambda x: f"{x:,.1f}", na_rep="non lue"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--donnees', default=os.path.join(tempfile.gettempdir(), 'supernutri_bench'))
+    args = parser.parse_args()
+
+    chemins = preparer(args.donnees, args.produits, args.seed)
+    avant = memoire(brut(chemins))
+    catalogue = assembler_catalogue({groupe: lire_catalogue(chemin)[0] for groupe, chemin in chemins.items()})
+    afficher(f"Catalogue de {len(catalogue):,} produits", avant, memoire(catalogue))
+
+    scores = score_dataframe(catalogue, ProfilsELECTRE(profils_communs(catalogue), 'memoire').P)
+    colonnes = [c for c in scores.columns if c.startswith(('electre_', 'supernutri_'))]
+    categories = scores[colonnes]
+    chaines = categories.astype({c: object for c in colonnes if isinstance(categories[c].dtype, pd.CategoricalDtype)})
+    afficher("Colonnes de scores", memoire(chaines), memoire(categories), ("object", "catégories"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Classement multi-processus en mémoire partagée (partage.py): montée en charge de 1 à 32 processus.
+
+Compare, sur un grand catalogue synthétique, le classement dans le processus
+courant (concordances, classes pour chaque λ, SuperNutri par la table) à
+classer_partage avec 1, 2, 4… processus, après avoir vérifié que les
+résultats sont identiques. L'accélération est rapportée au calcul en un seul
+processus; au-delà du nombre de cœurs (os.cpu_count()), elle ne peut plus
+croître.
+
+    python -m benchmarks.bench_partage
+    python -m benchmarks.bench_partage --produits 10000000 --processus 1 2 4 8 16 32
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import catalogue_synthetique
+from electre import (CRITERES, LAMBDAS, classes_depuis_concordances, concordances_catalogue,
+                     construire_profils, profils_en_tableau)
+from partage import classer_partage
+from scoring import ECO_SUPERNUTRI, table_supernutri
+
+
+def classer_serie(X, P, eco, bio):
+    """Même calcul que classer_partage, dans le processus courant"""
+    conc = concordances_catalogue(X, P)
+    classes = {l: classes_depuis_concordances(conc, l) for l in LAMBDAS}
+    grades, regles = table_supernutri()
+    cle = (classes[0.6][0], eco, bio)
+    return conc, classes, (grades[cle], regles[cle])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=4_000_000)
+    parser.add_argument('--processus', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--repetitions', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Critères passés par float32, comme le catalogue chargé
+    X = catalogue_synthetique(args.produits).astype(np.float32).astype(np.float64)
+    P = profils_en_tableau(construire_profils(pd.DataFrame(X[:100_000], columns=CRITERES)))
+    eco = rng.integers(len(ECO_SUPERNUTRI), size=len(X))
+    bio = rng.integers(2, size=len(X))
+    supernutri = (*table_supernutri(), eco, bio)
+
+    def mesurer(fonction):
+        durees = []
+        for _ in range(args.repetitions):
+            t0 = time.perf_counter()
+            resultat = fonction()
+            durees.append(time.perf_counter() - t0)
+        return min(durees), resultat
+
+    serie, attendu = mesurer(lambda: classer_serie(X, P, eco, bio))
+    print(f"{args.produits:,} produits, {os.cpu_count()} cœur(s) disponible(s)")
+    print(f"{'processus':>10}  {'durée':>8}  {'accélération':>12}  {'efficacité':>10}")
+    print(f"{'série':>10}  {serie:>7.2f}s  {1:>11.2f}×  {'':>10}")
+    for jobs in args.processus:
+        duree, obtenu = mesurer(lambda: classer_partage(X, P, LAMBDAS, jobs, supernutri=supernutri))
+        if not (np.array_equal(obtenu[0], attendu[0])
+                and all(np.array_equal(obtenu[1][l][k], attendu[1][l][k]) for l in LAMBDAS for k in (0, 1))
+                and all(np.array_equal(o, a) for o, a in zip(obtenu[2], attendu[2]))):
+            raise AssertionError(f"{jobs} processus: résultats différents du calcul en série")
+        print(f"{jobs:>10}  {duree:>7.2f}s  {serie / duree:>11.2f}×  {serie / duree / jobs:>9.0%}")
+
+
+if __name__ == '__main__':
+    main()
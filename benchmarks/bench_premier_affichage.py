@@ -0,0 +1,94 @@
+"""Temps jusqu'au premier affichage d'une nouvelle session, sur un grand catalogue.
+
+Chaque mesure tourne dans un processus neuf (imports compris), lancé dans un
+répertoire où Products.csv et data_yaourt.csv sont des fichiers synthétiques
+(generer_catalogues.py). La session s'ouvre sur la page par défaut
+(Transparence des Algorithmes), y reste --lecture secondes, puis passe à la
+page Analyse:
+
+- premier affichage: première exécution complète du script;
+- page Analyse: passage à la page Analyse de Données (attente de ce que le
+  préchauffage n'a pas encore chargé ou calculé);
+- rafraîchissement: réexécution de la page Analyse une fois prête.
+
+Deux cas: cache disque des scores vide (démarrage à froid), puis rempli par
+le premier (redémarrage du serveur).
+
+    python -m benchmarks.bench_premier_affichage
+    python -m benchmarks.bench_premier_affichage --lecture 15
+    python -m benchmarks.bench_premier_affichage --produits 5000000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.suite import preparer
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FICHIERS = {"Pains": "Products.csv", "Yaourts": "data_yaourt.csv"}
+PAGE_ANALYSE = "📊 Analyse de Données"
+
+
+def mesurer(dossier, lecture):
+    """Durées (s) d'une nouvelle session, dans ce processus lancé sur `dossier`"""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(dossier)
+    at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=1800)
+    resultats = {}
+    t0 = time.perf_counter()
+    at.run()
+    resultats['premier affichage'] = time.perf_counter() - t0
+    time.sleep(lecture)
+    t0 = time.perf_counter()
+    at.sidebar.radio[0].set_value(PAGE_ANALYSE).run()
+    resultats['page Analyse'] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    at.run()
+    resultats['rafraîchissement'] = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(at.exception)
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--donnees', default=os.path.join(tempfile.gettempdir(), 'supernutri_bench'))
+    parser.add_argument('--lecture', type=float, default=0.0,
+                        help="secondes passées sur la première page avant d'ouvrir la page Analyse")
+    parser.add_argument('--mesure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesure:
+        print(json.dumps(mesurer(args.mesure, args.lecture)))
+        return
+
+    chemins = preparer(args.donnees, args.produits, args.seed)
+    with tempfile.TemporaryDirectory() as dossier:
+        for groupe, nom in FICHIERS.items():
+            os.symlink(chemins[groupe], os.path.join(dossier, nom))
+        cache = os.path.join(dossier, 'cache_scores')
+        env = dict(os.environ, SUPERNUTRI_CACHE=cache)
+        print(f"{args.produits:,} produits")
+        for cas in ("cache disque vide", "cache disque rempli"):
+            if cas == "cache disque vide":
+                shutil.rmtree(cache, ignore_errors=True)
+            sortie = subprocess.run([sys.executable, '-m', __spec__.name, '--mesure', dossier,
+                                     '--lecture', str(args.lecture)],
+                                    env=env, capture_output=True, text=True, check=True).stdout
+            resultats = json.loads(sortie.strip().splitlines()[-1])
+            print(f"  {cas}")
+            for etape, duree in resultats.items():
+                print(f"    {etape:<20} {duree:>8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Latence de rafraîchissement des pages avec et sans le cache des figures (figures.py).
+
+Lance app.py avec streamlit.testing (AppTest), ouvre chaque page puis mesure
+la durée des réexécutions provoquées par une interaction qui ne change pas
+les données (comme un clic sur un autre widget). Chaque mode tourne dans son
+propre processus: SUPERNUTRI_CACHE_FIGURES=0 désactive le cache (avant),
+la valeur par défaut l'active (après).
+
+    python -m benchmarks.bench_rafraichissement
+    python -m benchmarks.bench_rafraichissement --reexecutions 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["📊 Analyse de Données", "⚖️ Comparaison Groupes"]
+
+
+def mesurer(reexecutions):
+    """Durées médianes de réexécution par page, dans ce processus"""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(RACINE)
+    at = AppTest.from_file(os.path.join(RACINE, 'app.py'), default_timeout=600).run()
+    resultats = {}
+    for page in PAGES:
+        at.sidebar.radio[0].set_value(page).run()
+        durees = []
+        for _ in range(reexecutions):
+            t0 = time.perf_counter()
+            at.run()
+            durees.append(time.perf_counter() - t0)
+            if at.exception:
+                raise RuntimeError(at.exception)
+        resultats[page] = float(np.median(durees))
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reexecutions', type=int, default=10)
+    parser.add_argument('--mesure', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mesure:
+        print(json.dumps(mesurer(args.reexecutions)))
+        return
+
+    modes = {"Sans cache": '0', "Avec cache": str(32 * 2 ** 20)}
+    resultats = {}
+    for nom, taille in modes.items():
+        env = dict(os.environ, SUPERNUTRI_CACHE_FIGURES=taille)
+        sortie = subprocess.run([sys.executable, '-m', __spec__.name, '--mesure',
+                                 '--reexecutions', str(args.reexecutions)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        resultats[nom] = json.loads(sortie.strip().splitlines()[-1])
+
+    print(f"{'page':>26} " + " ".join(f"{nom + ' (ms)':>17}" for nom in modes))
+    for page in PAGES:
+        print(f"{page:>26} " + " ".join(f"{resultats[nom][page] * 1000:>17.0f}" for nom in modes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Index de recherche par nom, marque et code-barres (recherche.py).
+
+Construit l'index sur un grand catalogue synthétique, vérifie les résultats
+contre un filtrage pandas complet (str.contains sur le texte normalisé), puis
+mesure la durée des requêtes: code-barres exact, mot entier, préfixe et
+plusieurs mots.
+
+    python -m benchmarks.bench_recherche
+    python -m benchmarks.bench_recherche --produits 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from recherche import IndexRecherche, normaliser
+
+NOMS = ['Pain complet', 'Pain de mie', 'Yaourt nature', 'Yaourt à la fraise', 'Baguette tradition',
+        'Fromage blanc', 'Crème dessert vanille', 'Müesli croustillant', 'Brioche tranchée']
+MARQUES = ['Harrys', 'Jacquet', 'Danone', 'Nestlé', 'Migros', 'Coop', 'Émmi', 'Yoplait']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--repetitions', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = dataframe_synthetique(args.produits)
+    df['product_name'] = (np.array(NOMS, dtype=object)[rng.integers(len(NOMS), size=len(df))]
+                          + ' ' + df.index.astype(str))
+    df['brand'] = np.array(MARQUES, dtype=object)[rng.integers(len(MARQUES), size=len(df))]
+    df['code_barre'] = (7_610_000_000_000 + rng.permutation(len(df))).astype(str)
+
+    t0 = time.perf_counter()
+    index = IndexRecherche(df)
+    print(f"{args.produits:,} produits, {len(index.mots):,} mots distincts: "
+          f"index construit en {time.perf_counter() - t0:.2f} s")
+
+    texte = (' ' + normaliser(df['product_name']) + ' ' + normaliser(df['brand']) + ' ').to_numpy(dtype=str)
+    code = df['code_barre'].iloc[len(df) // 2]
+    requetes = {
+        'code-barres': (code, np.flatnonzero(df['code_barre'].to_numpy() == code)),
+        'mot entier': ('emmi', None),
+        'préfixe': ('yaou', None),
+        'plusieurs mots': ('Yaourt fraise danone', None),
+    }
+    print(f"{'requête':>16} {'résultats':>10} {'durée (ms)':>11}")
+    for nom, (requete, attendu) in requetes.items():
+        if attendu is None:
+            masque = np.ones(len(df), dtype=bool)
+            for mot in normaliser(pd.Series([requete])).iloc[0].split():
+                masque &= np.char.find(texte, ' ' + mot) >= 0
+            attendu = np.flatnonzero(masque)
+        positions, total = index.rechercher(requete, limite=len(df))
+        if not np.array_equal(np.sort(positions), attendu):
+            raise AssertionError(f"{nom}: résultats différents du filtrage complet")
+        t0 = time.perf_counter()
+        for _ in range(args.repetitions):
+            index.rechercher(requete)
+        duree = (time.perf_counter() - t0) / args.repetitions * 1000
+        print(f"{nom:>16} {total:>10,} {duree:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Alternatives plus saines par k plus proches voisins (recommandation.py).
+
+Construit les arbres k-d d'un grand catalogue synthétique scoré, vérifie les
+voisins contre une recherche exhaustive (distances à toutes les lignes de
+meilleur grade), puis mesure la durée d'une requête, sur tout le catalogue et
+restreinte à une catégorie.
+
+    python -m benchmarks.bench_recommandation
+    python -m benchmarks.bench_recommandation --produits 5000000 --categories 50
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import dataframe_synthetique
+from electre import CRITERES, construire_profils, matrice_criteres, profils_en_tableau
+from recommandation import GRADES, Recommandeur
+from scoring import score_dataframe
+
+
+def exhaustif(recommandeur, Z, grades, categories, produit, grade, k, categorie):
+    """Mêmes voisins par calcul de toutes les distances"""
+    z = recommandeur._normaliser(np.array([[produit[c] for c in CRITERES]]))[0]
+    candidats = grades < GRADES.index(grade)
+    if categorie is not None:
+        candidats &= categories == categorie
+    lignes = np.flatnonzero(candidats)
+    distances = np.sqrt(((Z[lignes] - z) ** 2).sum(axis=1))
+    return np.sort(distances)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=1_000_000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--requetes', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = dataframe_synthetique(args.produits)
+    P = profils_en_tableau(construire_profils(df))
+    df = score_dataframe(df, P)
+    df['category'] = rng.integers(args.categories, size=len(df)).astype(str)
+
+    t0 = time.perf_counter()
+    recommandeur = Recommandeur(df, P, 'category')
+    print(f"{args.produits:,} produits: {len(recommandeur.arbres)} arbres construits en "
+          f"{time.perf_counter() - t0:.2f} s")
+
+    X = matrice_criteres(df)
+    Z = recommandeur._normaliser(X)
+    grades = pd.Categorical(df['supernutri_score'], categories=GRADES).codes
+    categories = df['category'].to_numpy()
+    lignes = rng.choice(len(df), args.requetes, replace=False)
+    for categorie in (None, '0'):
+        durees = []
+        for ligne in lignes:
+            produit = dict(zip(CRITERES, X[ligne]))
+            grade = df['supernutri_score'].iat[ligne]
+            t0 = time.perf_counter()
+            _, distances = recommandeur.alternatives(produit, grade, args.k, categorie)
+            durees.append(time.perf_counter() - t0)
+            if ligne in lignes[:10]:
+                attendu = exhaustif(recommandeur, Z, grades, categories, produit, grade, args.k, categorie)
+                np.testing.assert_allclose(distances, attendu)
+        durees = np.array(durees) * 1000
+        portee = "tout le catalogue" if categorie is None else "une catégorie"
+        print(f"{portee:>18}: médiane {np.median(durees):.2f} ms, p95 {np.percentile(durees, 95):.2f} ms"
+              f" (k={args.k}, voisins identiques à la recherche exhaustive)")
+
+
+if __name__ == '__main__':
+    main()
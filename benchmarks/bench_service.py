@@ -0,0 +1,127 @@
+"""Test de charge du service HTTP de scores (service_scores.py).
+
+Démarre une instance locale du service (ou vise --url), puis envoie des lots
+de produits sur des connexions persistantes depuis plusieurs processus
+clients, chacun gardant --connexions requêtes en vol. Rapporte le débit en
+requêtes/s et produits/s et les latences p50 / p95 / p99 par requête, et
+compare le p99 à l'objectif OBJECTIF_P99_MS (code de sortie 1 s'il est
+dépassé). Le service local tourne avec --workers processus; clients et
+service se partagent les cœurs de la machine.
+
+    python -m benchmarks.bench_service
+    python -m benchmarks.bench_service --produits 100 --connexions 16 --clients 4 --workers 4 --duree 20
+    python -m benchmarks.bench_service --url 127.0.0.1:8502
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.bench_electre import dataframe_synthetique
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Objectif de latence pour des lots de 100 produits
+OBJECTIF_P99_MS = 20.0
+
+
+def corps_requete(n, seed):
+    """Lot JSON de n produits synthétiques"""
+    df = dataframe_synthetique(n, seed)
+    return json.dumps(df.to_dict(orient='records')).encode()
+
+
+async def _client(hote, port, corps, connexions, duree):
+    requete = (f"POST /score HTTP/1.1\r\nHost: {hote}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(corps)}\r\n\r\n").encode() + corps
+    latences = []
+    fin = time.perf_counter() + duree
+
+    async def connexion():
+        lecteur, ecrivain = await asyncio.open_connection(hote, port)
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            ecrivain.write(requete)
+            statut = await lecteur.readline()
+            taille = 0
+            while (ligne := await lecteur.readline()) != b'\r\n':
+                if ligne.lower().startswith(b'content-length:'):
+                    taille = int(ligne.split(b':')[1])
+            await lecteur.readexactly(taille)
+            if b' 200 ' not in statut:
+                raise RuntimeError(statut.decode())
+            latences.append(time.perf_counter() - t0)
+        ecrivain.close()
+
+    await asyncio.gather(*(connexion() for _ in range(connexions)))
+    return latences
+
+
+def client(args):
+    """Processus client: latences de toutes ses requêtes"""
+    hote, port, corps, connexions, duree = args
+    return asyncio.run(_client(hote, port, corps, connexions, duree))
+
+
+def demarrer_service(workers=1):
+    """Instance locale sur un port libre; retourne (processus, port)"""
+    service = subprocess.Popen([sys.executable, os.path.join(RACINE, 'service_scores.py'), '--port', '0',
+                                '--workers', str(workers)],
+                               cwd=RACINE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    ligne = service.stdout.readline()
+    if not ligne:
+        raise RuntimeError("le service n'a pas démarré")
+    return service, int(ligne.split('http://')[1].split()[0].rsplit(':', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="hote:port d'un service déjà lancé")
+    parser.add_argument('--produits', type=int, default=100, help="produits par requête")
+    parser.add_argument('--connexions', type=int, default=8, help="requêtes en vol par client")
+    parser.add_argument('--clients', type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    parser.add_argument('--workers', type=int, default=max((os.cpu_count() or 2) // 2, 1),
+                        help="processus du service local")
+    parser.add_argument('--duree', type=float, default=10.0)
+    args = parser.parse_args()
+
+    service = None
+    if args.url:
+        hote, port = args.url.rsplit(':', 1)
+        port = int(port)
+    else:
+        service, port = demarrer_service(args.workers)
+        hote = '127.0.0.1'
+    try:
+        corps = corps_requete(args.produits, seed=1)
+        # Échauffement: premier lot, mémo des règles
+        client((hote, port, corps, 1, 0.5))
+        with ProcessPoolExecutor(args.clients) as pool:
+            parts = list(pool.map(client, [(hote, port, corps, args.connexions, args.duree)] * args.clients))
+    finally:
+        if service is not None:
+            service.terminate()
+            service.wait()
+
+    latences = np.concatenate([np.asarray(p) for p in parts]) * 1000
+    debit = len(latences) / args.duree
+    p50, p95, p99 = np.percentile(latences, [50, 95, 99])
+    print(f"{args.clients} clients × {args.connexions} connexions, {args.produits} produits par requête, "
+          f"{args.duree:.0f} s" + ("" if args.url else f", service sur {args.workers} processus"))
+    print(f"{debit:,.0f} requêtes/s ({debit * args.produits:,.0f} produits/s)")
+    print(f"latence: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms")
+    atteint = p99 < OBJECTIF_P99_MS
+    print(f"objectif p99 < {OBJECTIF_P99_MS:.0f} ms: {'atteint' if atteint else 'NON ATTEINT'}"
+          + ("" if args.produits == 100 else " (objectif fixé pour 100 produits par requête)"))
+    if not atteint:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
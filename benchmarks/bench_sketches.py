@@ -0,0 +1,100 @@
+"""Profils ELECTRE par sketches KLL comparés aux quantiles exacts.
+
+Le catalogue synthétique est découpé en partitions; chaque partition alimente
+son propre sketch, puis les sketches sont fusionnés. Pour chaque profil et
+chaque critère, l'erreur de rang par rapport au quantile exact doit rester
+sous la borne ε demandée (AssertionError sinon), ainsi que pour les bornes
+ERREURS_CONTROLE sur les TAILLE_CONTROLE premiers produits.
+
+    python -m benchmarks.bench_sketches
+    python -m benchmarks.bench_sketches --produits 10000000 --erreur 0.0005
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_electre import catalogue_synthetique
+from electre import CRITERES, QUANTILES, SENS, construire_profils
+from sketches import SketchesProfils, k_pour_erreur
+
+ERREURS_CONTROLE = (0.01, 0.005, 0.002)
+TAILLE_CONTROLE = 200_000
+
+
+def erreur_rang(tries, valeur, q):
+    """Distance entre q et l'intervalle de rangs occupé par `valeur` (ex-aequo compris)"""
+    bas = np.searchsorted(tries, valeur, side='left') / len(tries)
+    haut = np.searchsorted(tries, valeur, side='right') / len(tries)
+    return max(0.0, bas - q, q - haut)
+
+
+def profils_sketches(df, k, partitions):
+    """Profils par un sketch par partition (graines 0…), fusionnés; renvoie aussi les sketches"""
+    bornes = np.linspace(0, len(df), partitions + 1).astype(int)
+    morceaux = [SketchesProfils(k, seed=i).ajouter(df.iloc[debut:fin])
+                for i, (debut, fin) in enumerate(zip(bornes[:-1], bornes[1:]))]
+    sketches = morceaux[0]
+    for autre in morceaux[1:]:
+        sketches.fusionner(autre)
+    return sketches.profils(), sketches
+
+
+def erreurs(df, approches):
+    """Erreur de rang de chaque (profil, critère)"""
+    resultat = {}
+    for crit in CRITERES:
+        tries = np.sort(df[crit].dropna().to_numpy())
+        for i, q in enumerate(QUANTILES, start=1):
+            q_crit = q if SENS[crit] == 'max' else 1 - q
+            resultat[i, crit] = erreur_rang(tries, approches[f"pi{i}"][crit], q_crit)
+    return resultat
+
+
+def verifier(erreurs_rang, erreur):
+    for (i, crit), err in erreurs_rang.items():
+        if err > erreur:
+            raise AssertionError(f"π{i} {crit}: erreur de rang {err:.5f} > {erreur} (k={k_pour_erreur(erreur)})")
+    return max(erreurs_rang.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, default=2_000_000)
+    parser.add_argument('--partitions', type=int, default=8)
+    parser.add_argument('--erreur', type=float, default=0.001)
+    args = parser.parse_args()
+
+    k = k_pour_erreur(args.erreur)
+    df = pd.DataFrame(catalogue_synthetique(args.produits), columns=CRITERES)
+
+    t0 = time.perf_counter()
+    exacts = construire_profils(df)
+    duree_exacte = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    approches, sketches = profils_sketches(df, k, args.partitions)
+    duree_sketch = time.perf_counter() - t0
+
+    pire = verifier(erreurs(df, approches), args.erreur)
+    for crit in CRITERES:
+        print(f"{crit:>20}: exact {[round(exacts[f'pi{i}'][crit], 3) for i in range(1, 7)]}"
+              f" | sketch {[round(approches[f'pi{i}'][crit], 3) for i in range(1, 7)]}")
+
+    # Contrôle déterministe (graines fixes) de k_pour_erreur sur d'autres bornes
+    echantillon = df.iloc[:TAILLE_CONTROLE]
+    for erreur in ERREURS_CONTROLE:
+        observee = verifier(erreurs(echantillon, profils_sketches(echantillon, k_pour_erreur(erreur),
+                                                                  args.partitions)[0]), erreur)
+        print(f"Contrôle ε={erreur}: k={k_pour_erreur(erreur)}, erreur max {observee:.5f}")
+
+    taille = sum(s.taille() for s in sketches.sketches.values())
+    print(f"\n{args.produits:,} produits, {args.partitions} partitions, k={k}")
+    print(f"Erreur de rang max: {pire:.5f} (borne {args.erreur})")
+    print(f"Exact (concat + quantile): {duree_exacte:.2f} s | "
+          f"Sketches (par partition + fusion): {duree_sketch:.2f} s, {taille:,} valeurs conservées")
+
+
+if __name__ == '__main__':
+    main()
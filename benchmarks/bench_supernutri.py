@@ -0,0 +1,62 @@
+"""SuperNutri-Score: table des règles (supernutri_catalogue) contre apply ligne à ligne.
+
+Vérifie que les deux donnent les mêmes grades sur un catalogue synthétique
+(avec des valeurs d'Eco-Score et de bio hétérogènes), puis mesure chacun.
+
+    python -m benchmarks.bench_supernutri
+    python -m benchmarks.bench_supernutri --produits 1000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from electre import CLASSES, libelles
+from scoring import calculate_supernutri, regles_depuis_masque, supernutri_catalogue
+
+
+def catalogue_classe(n, seed=0):
+    """Classes ELECTRE, Eco-Scores et mentions bio tirés au hasard (y compris valeurs atypiques)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'electre_pess_06': libelles(rng.integers(len(CLASSES), size=n)),
+        'ecoscore_grade': rng.choice(['A', 'b', 'C', 'D', 'e', 'unknown', ''], n),
+        'is_organic': rng.choice(['Yes', 'No', 'oui', 'TRUE', '0', ''], n),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--produits', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--apply-max', type=int, default=200_000,
+                        help="au-delà, apply est extrapolé depuis cette taille")
+    args = parser.parse_args()
+
+    print(f"{'produits':>10}  {'apply':>10}  {'table':>10}  gain")
+    for n in args.produits:
+        df = catalogue_classe(n)
+
+        t0 = time.perf_counter()
+        grades, masques = supernutri_catalogue(df)
+        table = time.perf_counter() - t0
+
+        m = min(n, args.apply_max)
+        t0 = time.perf_counter()
+        attendu = df.iloc[:m].apply(lambda row: calculate_supernutri(row, row['electre_pess_06']), axis=1)
+        ligne_a_ligne = (time.perf_counter() - t0) * n / m
+        if not (attendu.to_numpy() == grades[:m]).all():
+            raise AssertionError("grades différents de calculate_supernutri")
+        for i in range(min(m, 1000)):
+            regles = []
+            calculate_supernutri(df.iloc[i], df['electre_pess_06'].iat[i], regles)
+            if regles != regles_depuis_masque(masques[i]):
+                raise AssertionError(f"ligne {i}: règles {regles_depuis_masque(masques[i])} != {regles}")
+
+        estime = "*" if m < n else " "
+        print(f"{n:>10,}  {ligne_a_ligne:>9.3f}s{estime} {table:>9.3f}s  ×{ligne_a_ligne / table:,.0f}")
+    print("* extrapolé")
+
+
+if __name__ == '__main__':
+    main()
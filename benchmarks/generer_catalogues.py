@@ -0,0 +1,144 @@
+"""Catalogues synthétiques au format de Products.csv et data_yaourt.csv.
+
+Les n produits sont répartis entre les deux fichiers dans la proportion des
+vraies données (121 pains pour 208 yaourts), avec les mêmes colonnes, dans le
+même ordre et avec les mêmes conventions (Yes/No et Oui/Non pour le bio,
+codes-barres, longs champs texte de data_yaourt.csv). Le Nutri-Score stocké
+est celui du module nutriscore, l'Eco-Score suit ses seuils habituels.
+L'écriture se fait par morceaux: 10M de lignes ne passent jamais en mémoire.
+
+    python -m benchmarks.generer_catalogues 1000000 --sortie /tmp/catalogue_1M
+    python -m benchmarks.generer_catalogues 10000000 --sortie /tmp/catalogue_10M --seed 3
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from nutriscore import GRADES, nutriscore_colonnes
+
+FICHIERS = {"Pains": "Products.csv", "Yaourts": "data_yaourt.csv"}
+PROPORTION_PAINS = 121 / (121 + 208)
+TAILLE_MORCEAU = 500_000
+
+COLONNES_PAINS = ['product_id', 'product_name', 'brand', 'category', 'energy_kj', 'energy_kcal',
+                  'saturated_fat', 'sugar', 'sodium_mg', 'sodium_g', 'protein', 'fiber',
+                  'fruits_veg_nuts_pct', 'additives_count', 'is_organic', 'nutriscore_score',
+                  'nutriscore_grade', 'ecoscore_score', 'ecoscore_grade']
+COLONNES_YAOURTS = ['product_id', 'product_name', 'category', 'marque', 'code_barre', 'nutriscore_grade',
+                    'nutriscore_score', 'energie_en_kcal', 'energy_kj', 'saturated_fat', 'sugar',
+                    'sodium_mg', 'sodium_g', 'protein', 'fiber', 'fruits_veg_nuts_pct', 'ecoscore_grade',
+                    'ecoscore_score', 'is_organic', 'additives_count', 'liste_additifs', 'categories', 'url']
+
+MARQUES_PAINS = ['Biocoop', 'Pasquier', "Harry's", 'Carrefour Bio', 'Jacquet', 'Poilâne', 'Leclerc']
+MARQUES_YAOURTS = ['Danone', 'Coop Naturaplan', 'Naturalia', 'Yoplait', 'Les 2 Vaches', 'Lactalis']
+NOMS_PAINS = ['Pain complet', 'Baguette', 'Pain de mie', 'Brioche', 'Pain au levain', 'Pain aux céréales']
+NOMS_YAOURTS = ['Yaourt nature', 'Yaourt à la grecque', 'Fromage blanc', 'Yaourt aux fruits', 'Skyr']
+ADDITIFS = ['Aucun', 'E330', 'E440 - Pectines', 'E412, E415', 'E202 - Sorbate de potassium']
+CATEGORIES_OFF = ("Produits laitiers, Produits fermentés, Desserts, Produits laitiers fermentés, "
+                  "Desserts lactés, Yaourts")
+# Eco-Score: score minimal de chaque grade A…D
+SEUILS_ECOSCORE = [80, 60, 40, 20]
+
+# Lois des nutriments par fichier: (loi, paramètres, bornes)
+NUTRIMENTS = {
+    "Pains": {
+        'energy_kj': ('normal', (1100, 250), (400, 2200)),
+        'saturated_fat': ('gamma', (1.5, 2.0), None),
+        'sugar': ('gamma', (1.2, 5.3), None),
+        'sodium_g': ('gamma', (4.0, 0.15), None),
+        'protein': ('normal', (8.5, 2.0), (1, 20)),
+        'fiber': ('gamma', (2.0, 2.5), None),
+    },
+    "Yaourts": {
+        'energy_kj': ('normal', (580, 250), (150, 1800)),
+        'saturated_fat': ('gamma', (2.0, 2.8), None),
+        'sugar': ('gamma', (2.0, 4.1), None),
+        'sodium_g': ('gamma', (4.0, 0.012), None),
+        'protein': ('normal', (6.9, 2.5), (1, 15)),
+        'fiber': ('gamma', (0.5, 0.5), None),
+    },
+}
+
+
+def _tirer(rng, loi, parametres, bornes, n):
+    valeurs = getattr(rng, loi)(*parametres, n)
+    return valeurs.clip(*bornes) if bornes else valeurs
+
+
+def morceau(groupe, debut, n, seed=0):
+    """Lignes debut…debut+n du fichier de `groupe`, reproductibles pour un même seed"""
+    rng = np.random.default_rng([seed, debut, list(FICHIERS).index(groupe)])
+    ids = np.arange(debut, debut + n)
+    df = pd.DataFrame({c: _tirer(rng, *loi, n).round(2) for c, loi in NUTRIMENTS[groupe].items()})
+    df['sodium_mg'] = (df['sodium_g'] * 1000).round()
+    df['fruits_veg_nuts_pct'] = np.where(rng.random(n) < 0.8, 0, rng.integers(0, 101, n))
+    df['additives_count'] = rng.poisson(3.6 if groupe == "Pains" else 0.9, n)
+    # Quelques valeurs manquantes, comme dans data_yaourt.csv
+    df.loc[rng.random(n) < 0.01, 'energy_kj'] = np.nan
+    kcal = (df['energy_kj'] / 4.184).round()
+
+    score, grades, valide = nutriscore_colonnes(
+        lambda nom: df[nom].to_numpy(dtype=np.float64) if nom in df.columns else np.full(n, np.nan))
+    df['nutriscore_score'] = pd.Series(score, dtype='Int64').where(valide)
+    df['nutriscore_grade'] = grades
+    df['ecoscore_score'] = rng.integers(10, 96, n)
+    df['ecoscore_grade'] = np.array(GRADES, dtype=object)[
+        np.searchsorted(-np.array(SEUILS_ECOSCORE), -df['ecoscore_score'].to_numpy(), side='right')]
+
+    if groupe == "Pains":
+        df['product_id'] = np.char.add('P', ids.astype(str))
+        df['product_name'] = np.char.add(np.char.add(rng.choice(NOMS_PAINS, n), ' '), ids.astype(str))
+        df['brand'] = rng.choice(MARQUES_PAINS, n)
+        df['category'] = "Pains"
+        df['energy_kcal'] = kcal
+        df['is_organic'] = rng.choice(['Yes', 'No'], n, p=[0.25, 0.75])
+        return df[COLONNES_PAINS]
+
+    df['product_id'] = np.char.add('Y', ids.astype(str))
+    df['product_name'] = np.char.add(np.char.add(rng.choice(NOMS_YAOURTS, n), ' '), ids.astype(str))
+    df['category'] = "yaourt"
+    df['marque'] = rng.choice(MARQUES_YAOURTS, n)
+    df['code_barre'] = rng.integers(10 ** 12, 10 ** 13, n)
+    df['energie_en_kcal'] = kcal
+    df['is_organic'] = rng.choice(['Oui', 'Non'], n, p=[0.3, 0.7])
+    df['liste_additifs'] = rng.choice(ADDITIFS, n)
+    df['categories'] = CATEGORIES_OFF
+    df['url'] = np.char.add('https://fr.openfoodfacts.org/produit/', df['code_barre'].to_numpy().astype(str))
+    return df[COLONNES_YAOURTS]
+
+
+def generer(repertoire, n, seed=0, taille_morceau=TAILLE_MORCEAU):
+    """Écrit les deux fichiers (n produits au total) dans `repertoire`; retourne {groupe: chemin}"""
+    os.makedirs(repertoire, exist_ok=True)
+    n_pains = int(round(n * PROPORTION_PAINS))
+    chemins = {}
+    for groupe, total in (("Pains", n_pains), ("Yaourts", n - n_pains)):
+        chemins[groupe] = os.path.join(repertoire, FICHIERS[groupe])
+        temporaire = f"{chemins[groupe]}.{os.getpid()}"
+        with open(temporaire, 'w', encoding='utf-8-sig', newline='') as f:
+            for debut in range(0, max(total, 1), taille_morceau):
+                morceau(groupe, debut, min(taille_morceau, total - debut), seed).to_csv(
+                    f, index=False, header=debut == 0, lineterminator='\n')
+        os.replace(temporaire, chemins[groupe])
+    return chemins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('produits', type=int, help="nombre total de produits (pains + yaourts)")
+    parser.add_argument('--sortie', required=True, help="répertoire des deux fichiers CSV")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    chemins = generer(args.sortie, args.produits, args.seed)
+    for groupe, chemin in chemins.items():
+        print(f"{chemin}: {os.path.getsize(chemin) / 2 ** 20:,.1f} Mo")
+    print(f"{args.produits:,} produits en {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Suite de benchmarks de référence, résultats en JSON pour suivre les régressions.
+
+Pour chaque taille, un catalogue synthétique au format des deux fichiers de
+l'application est généré (generer_catalogues.py, gardé dans --donnees pour
+les exécutions suivantes), puis chaque étape du chemin de l'application est
+mesurée --repetitions fois:
+
+- chargement: lecture typée des deux CSV et assemblage (load_data);
+- profils: profils π1…π6 communs (profils_communs);
+- electre: concordances et classes pessimiste / optimiste pour chaque λ;
+- supernutri: table des règles sur tout le catalogue;
+- scores: Nutri-Score, ELECTRE TRI et SuperNutri complets (score_incremental
+  sans précédent, le cœur de calculate_all_scores);
+- calculateur: latence d'un produit saisi (Nutri-Score, ELECTRE TRI,
+  SuperNutri), moyenne sur --saisies produits.
+
+Le fichier JSON contient le commit, la machine, et pour chaque (étape,
+taille) les durées min / médiane / max. Avec --reference, chaque médiane est
+comparée à celle d'un fichier précédent et les régressions au-delà de
+--tolerance sont signalées (code de sortie 1).
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --tailles 1000 100000 1000000 10000000 --sortie resultats.json
+    python -m benchmarks.suite --reference resultats_v1.json --tolerance 0.1
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generer_catalogues import generer
+from chargement import assembler_catalogue, lire_catalogue
+from electre import (CRITERES, LAMBDAS, classes_depuis_concordances, concordances_catalogue, libelles,
+                     matrice_criteres)
+from nutriscore import GRADES, grade_nutriscore, points_nutriscore
+from profils import ProfilsELECTRE, profils_communs
+from scoring import score_incremental, supernutri_catalogue, supernutri_produit
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAILLES = [1_000, 100_000, 1_000_000]
+SAISIES = 1_000
+
+
+def preparer(repertoire, n, seed):
+    """Chemins des deux fichiers synthétiques de n produits, générés s'ils n'existent pas"""
+    dossier = os.path.join(repertoire, f'catalogue_{n}_{seed}')
+    chemins = {groupe: os.path.join(dossier, nom)
+               for groupe, nom in (("Pains", "Products.csv"), ("Yaourts", "data_yaourt.csv"))}
+    if not all(os.path.exists(c) for c in chemins.values()):
+        t0 = time.perf_counter()
+        generer(dossier, n, seed)
+        print(f"  catalogue de {n:,} produits généré en {time.perf_counter() - t0:.1f} s")
+    return chemins
+
+
+def charger(chemins):
+    return assembler_catalogue({groupe: lire_catalogue(chemin)[0] for groupe, chemin in chemins.items()})
+
+
+def classer_catalogue(catalogue, P):
+    conc = concordances_catalogue(matrice_criteres(catalogue), P)
+    return {l: classes_depuis_concordances(conc, l) for l in LAMBDAS}
+
+
+def saisies(catalogue, n, seed):
+    """n produits du catalogue, sous la forme saisie dans un calculateur"""
+    lignes = catalogue.sample(min(n, len(catalogue)), replace=len(catalogue) < n, random_state=seed)
+    # Un calculateur n'a jamais de valeur manquante
+    lignes = lignes.fillna({**{c: 0.0 for c in CRITERES}, 'is_organic': False})
+    return [dict(produit, ecoscore_grade=str(produit['ecoscore_grade']), is_organic=bool(produit['is_organic']))
+            for produit in lignes.to_dict(orient='records')]
+
+
+def calculer_produit(produit, profils):
+    """Ce que fait un calculateur pour un produit saisi"""
+    pts = points_nutriscore(produit['energy_kj'], produit['saturated_fat'], produit['sugar'],
+                            produit['sodium_g'] * 2.5, produit['fiber'], produit['protein'],
+                            produit['fruits_veg_nuts_pct'])
+    nutriscore = GRADES[grade_nutriscore(int(pts['score']))]
+    classes = profils.classer_produit(produit)
+    return nutriscore, classes, supernutri_produit(classes[0.6][0], produit['ecoscore_grade'], produit['is_organic'])
+
+
+def mesurer(fonction, repetitions):
+    """(durées en secondes, dernier résultat)"""
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        resultat = fonction()
+        durees.append(time.perf_counter() - t0)
+    return durees, resultat
+
+
+def executer(n, args):
+    """Mesures de toutes les étapes pour un catalogue de n produits"""
+    chemins = preparer(args.donnees, n, args.seed)
+    resultats = []
+
+    def noter(etape, durees, unite=1):
+        durees = np.asarray(durees) / unite
+        resultats.append({'etape': etape, 'produits': n, 'repetitions': len(durees),
+                          'min_s': float(durees.min()), 'mediane_s': float(np.median(durees)),
+                          'max_s': float(durees.max())})
+        print(f"  {etape:<12} {np.median(durees) * (1e6 if unite > 1 else 1):>12,.3f}"
+              f" {'µs' if unite > 1 else 's'}")
+
+    durees, catalogue = mesurer(lambda: charger(chemins), args.repetitions)
+    noter('chargement', durees)
+    durees, profils = mesurer(lambda: profils_communs(catalogue), args.repetitions)
+    noter('profils', durees)
+    profils = ProfilsELECTRE(profils, f'suite-{n}')
+    durees, classes = mesurer(lambda: classer_catalogue(catalogue, profils.P), args.repetitions)
+    noter('electre', durees)
+
+    classe = catalogue[['ecoscore_grade', 'is_organic']].assign(electre_pess_06=libelles(classes[0.6][0]))
+    durees, _ = mesurer(lambda: supernutri_catalogue(classe), args.repetitions)
+    noter('supernutri', durees)
+    durees, _ = mesurer(lambda: score_incremental(catalogue, profils.P), args.repetitions)
+    noter('scores', durees)
+
+    produits = saisies(catalogue, args.saisies, args.seed)
+    durees = []
+    for _ in range(args.repetitions):
+        t0 = time.perf_counter()
+        for produit in produits:
+            calculer_produit(produit, profils)
+        durees.append(time.perf_counter() - t0)
+    noter('calculateur', durees, unite=len(produits))
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"  mémoire résidente max {rss:,.0f} Mo")
+    return resultats
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=RACINE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(resultats, chemin_reference, tolerance):
+    """Affiche le rapport médiane / médiane de référence; retourne les régressions"""
+    with open(chemin_reference, encoding='utf-8') as f:
+        reference = {(r['etape'], r['produits']): r for r in json.load(f)['resultats']}
+    regressions = []
+    print(f"\nComparaison avec {chemin_reference}")
+    for r in resultats:
+        ancien = reference.get((r['etape'], r['produits']))
+        if ancien is None:
+            continue
+        rapport = r['mediane_s'] / ancien['mediane_s']
+        signal = ""
+        if rapport > 1 + tolerance:
+            regressions.append(r)
+            signal = "  ← régression"
+        print(f"  {r['etape']:<12} {r['produits']:>12,}  ×{rapport:.2f}{signal}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tailles', type=int, nargs='+', default=TAILLES)
+    parser.add_argument('--repetitions', type=int, default=3)
+    parser.add_argument('--saisies', type=int, default=SAISIES, help="produits saisis pour le calculateur")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--donnees', default=os.path.join(tempfile.gettempdir(), 'supernutri_bench'),
+                        help="répertoire des catalogues générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument('--sortie', default='resultats_suite.json')
+    parser.add_argument('--reference', help="fichier JSON d'une exécution précédente")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="ralentissement toléré (0.10 = +10 %%)")
+    args = parser.parse_args()
+
+    resultats = []
+    for n in args.tailles:
+        print(f"{n:,} produits")
+        resultats += executer(n, args)
+
+    rapport = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit(),
+        'machine': {'plateforme': platform.platform(), 'processeur': platform.processor(),
+                    'cpus': os.cpu_count(), 'python': platform.python_version(),
+                    'numpy': np.__version__, 'pandas': pd.__version__},
+        'parametres': {'repetitions': args.repetitions, 'saisies': args.saisies, 'seed': args.seed},
+        'resultats': resultats,
+    }
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats écrits dans {args.sortie}")
+
+    if args.reference and comparer(resultats, args.reference, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Cache disque des catalogues scorés, adressé par contenu.
+
+La clé combine l'empreinte des fichiers d'entrée, les profils utilisés et les
+paramètres du modèle (poids, sens, quantiles, λ, règles Nutri-Score et
+SuperNutri): tant qu'elle ne change pas, un redémarrage ou un autre réplica
+relit les scores au lieu de les recalculer. La dernière entrée écrite sert de
+base au recalcul incrémental (scoring.score_incremental) quand les données
+changent. Les DataFrames sont stockés au format Arrow IPC (non compressé) et
+les concordances en .npy. Les .npy sont lus en mémoire mappée; les fichiers
+Arrow sont mappés eux aussi, mais leur conversion en DataFrame copie en
+mémoire les colonnes numériques et catégorielles (seules les colonnes de
+texte restent sur les tampons Arrow).
+
+Répertoire: REPERTOIRE_CACHE, ou la variable d'environnement SUPERNUTRI_CACHE
+(un volume partagé entre réplicas par exemple). Sans pyarrow, le cache est
+simplement désactivé. Chaque écriture élague le répertoire: seules les
+ENTREES_MAX entrées les plus récemment écrites ou relues sont gardées, plus
+celle que désigne « dernier » (SUPERNUTRI_CACHE_ENTREES pour changer la limite).
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import chargement
+import cube
+import electre
+import nutriscore
+import scoring
+from electre import CRITERES, DEFAUTS_PROFILS, LAMBDAS, POIDS, QUANTILES, SENS
+
+# À incrémenter si le format des fichiers du cache change, ou si une fonction
+# qui influe sur les scores change sans figurer dans parametres_modele
+VERSION_CACHE = 4
+
+# Code source faisant partie de la clé: lecture, typage et assemblage des données, classement ELECTRE TRI,
+# SuperNutri, cubes des grades
+FONCTIONS_MODELE = (
+    chargement.renommer_morceau, chargement.typer_morceau, chargement.normaliser_morceau,
+    chargement.unifier_categories, chargement.assembler_catalogue,
+    electre.matrice_criteres, electre.numerateurs_concordance, electre.seuil_entier,
+    electre.concordances_catalogue, electre.classes_depuis_surclassement, electre.classes_pessimistes,
+    electre.classes_depuis_concordances,
+    scoring._scores, scoring.codes_supernutri, scoring._codes_supernutri,
+    cube._codes_tries, cube.codes_grades, cube.construire_cube, cube.additionner_cubes, cube.cube_incremental,
+)
+REPERTOIRE_CACHE = os.environ.get(
+    'SUPERNUTRI_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache_scores'))
+ENTREES_MAX = int(os.environ.get('SUPERNUTRI_CACHE_ENTREES', 4))
+
+
+def parametres_modele():
+    """Tout ce qui, en plus des données, détermine les scores"""
+    return {
+        'version': VERSION_CACHE,
+        'criteres': CRITERES,
+        'poids': POIDS,
+        'sens': SENS,
+        'quantiles': QUANTILES,
+        'defauts_profils': DEFAUTS_PROFILS,
+        'lambdas': list(LAMBDAS),
+        # Les règles sont du code: leur source fait partie de la clé
+        'nutriscore': inspect.getsource(nutriscore),
+        'supernutri': inspect.getsource(scoring.calculate_supernutri),
+        'table_supernutri': [inspect.getsource(f) for f in (scoring.table_supernutri, scoring.supernutri_catalogue,
+                                                             scoring._codes_distincts, scoring._code_eco,
+                                                             scoring._code_bio)],
+        'synonymes': chargement.SYNONYMES,
+        'colonnes_utiles': chargement.COLONNES_UTILES,
+        'conversions': chargement.CONVERSIONS,
+        'methodes_cube': cube.METHODES,
+        'fonctions': [inspect.getsource(f) for f in FONCTIONS_MODELE],
+    }
+
+
+def cle_modele():
+    """Empreinte SHA-256 des paramètres du modèle"""
+    return hashlib.sha256(json.dumps(parametres_modele(), sort_keys=True).encode()).hexdigest()
+
+
+def cle_cache(empreinte, P):
+    """Clé SHA-256: empreinte des données + profils P utilisés + paramètres du modèle"""
+    h = hashlib.sha256(empreinte.encode())
+    h.update(np.ascontiguousarray(P, dtype=np.float64).tobytes())
+    h.update(cle_modele().encode())
+    return h.hexdigest()
+
+
+def lire_scores(cle, repertoire=REPERTOIRE_CACHE):
+    """Relit une entrée du cache: (tables, tableaux) ou None si absente.
+
+    tables: {nom: DataFrame}, tableaux: {nom: ndarray en lecture seule (mmap)}.
+    """
+    dossier = os.path.join(repertoire, cle)
+    if not os.path.isdir(dossier):
+        return None
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    try:
+        with open(os.path.join(dossier, 'contenu.json'), encoding='utf-8') as f:
+            contenu = json.load(f)
+        tables = {}
+        for nom in contenu['tables']:
+            with pa.memory_map(os.path.join(dossier, f'{nom}.arrow')) as source:
+                tables[nom] = pa.ipc.open_file(source).read_all().to_pandas()
+        tableaux = {nom: np.load(os.path.join(dossier, f'{nom}.npy'), mmap_mode='r')
+                    for nom in contenu['tableaux']}
+    except FileNotFoundError:
+        # Entrée élaguée par un autre processus pendant la lecture
+        return None
+    try:
+        # Entrée utilisée: elle passe en tête pour l'élagage
+        os.utime(dossier)
+    except OSError:
+        pass
+    return tables, tableaux
+
+
+def ecrire_scores(cle, tables, tableaux, repertoire=REPERTOIRE_CACHE):
+    """Écrit une entrée du cache (atomique: dossier temporaire puis renommage).
+
+    Retourne False si pyarrow est absent ou si l'entrée existe déjà.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+
+    dossier = os.path.join(repertoire, cle)
+    if os.path.isdir(dossier):
+        return False
+    os.makedirs(repertoire, exist_ok=True)
+    temporaire = tempfile.mkdtemp(prefix=f'.{cle[:12]}-', dir=repertoire)
+    try:
+        for nom, df in tables.items():
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(os.path.join(temporaire, f'{nom}.arrow'), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as ecrivain:
+                    ecrivain.write_table(table)
+        for nom, tableau in tableaux.items():
+            np.save(os.path.join(temporaire, f'{nom}.npy'), tableau)
+        with open(os.path.join(temporaire, 'contenu.json'), 'w', encoding='utf-8') as f:
+            json.dump({'tables': list(tables), 'tableaux': list(tableaux)}, f)
+        os.rename(temporaire, dossier)
+    except OSError:
+        # Un autre processus a écrit la même entrée entre-temps
+        shutil.rmtree(temporaire, ignore_errors=True)
+        if not os.path.isdir(dossier):
+            raise
+        return False
+    _marquer_dernier(cle, repertoire)
+    elaguer(repertoire)
+    return True
+
+
+def _est_entree(nom):
+    return len(nom) == 64 and all(c in '0123456789abcdef' for c in nom)
+
+
+def elaguer(repertoire=REPERTOIRE_CACHE, garder=ENTREES_MAX):
+    """Supprime les entrées au-delà des `garder` plus récentes, sauf celle que désigne « dernier ».
+
+    Retourne les clés supprimées.
+    """
+    try:
+        noms = [nom for nom in os.listdir(repertoire) if _est_entree(nom)]
+    except FileNotFoundError:
+        return []
+    protegee = _cle_dernier(repertoire)
+
+    def date(nom):
+        try:
+            return os.stat(os.path.join(repertoire, nom)).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    supprimees = []
+    for nom in sorted(noms, key=date, reverse=True)[garder:]:
+        if nom == protegee:
+            continue
+        # Renommage atomique d'abord: un lecteur ne voit jamais d'entrée à moitié supprimée
+        corbeille = os.path.join(repertoire, f'.suppr-{nom[:12]}-{os.getpid()}')
+        try:
+            os.rename(os.path.join(repertoire, nom), corbeille)
+        except OSError:
+            # Déjà supprimée par un autre processus
+            continue
+        shutil.rmtree(corbeille, ignore_errors=True)
+        supprimees.append(nom)
+    return supprimees
+
+
+def _chemin_dernier(repertoire):
+    return os.path.join(repertoire, f'dernier-{cle_modele()[:16]}')
+
+
+def _marquer_dernier(cle, repertoire):
+    temporaire = f'{_chemin_dernier(repertoire)}.{os.getpid()}'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        f.write(cle)
+    os.replace(temporaire, _chemin_dernier(repertoire))
+
+
+def _cle_dernier(repertoire):
+    try:
+        with open(_chemin_dernier(repertoire), encoding='utf-8') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def lire_dernier(repertoire=REPERTOIRE_CACHE):
+    """Dernière entrée écrite avec les paramètres actuels du modèle (base du recalcul incrémental)"""
+    cle = _cle_dernier(repertoire)
+    return lire_scores(cle, repertoire) if cle is not None else None
@@ -0,0 +1,216 @@
+"""Chargement typé et par morceaux des catalogues produits, dans un schéma canonique.
+
+Les deux fichiers de l'application ne nomment pas leurs colonnes de la même
+façon (`marque` / `brand`, `energie_en_kcal` / `energy_kcal`, bio en
+Oui/Non ou Yes/No), pas plus que les exports OpenFoodFacts (séparés par des
+tabulations, nutriments `*_100g`, bio dans `labels_tags`). À la lecture,
+chaque colonne est renommée selon SYNONYMES puis typée de façon compacte:
+float32 pour les nutriments, catégories (codes sur 1 octet) pour les grades,
+catégories aussi pour la catégorie et la marque, booléen pour le bio. Les
+longs champs texte de data_yaourt.csv (`categories`, `liste_additifs`, `url`)
+ne sont pas chargés.
+"""
+import gzip
+import hashlib
+import time
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+TAILLE_MORCEAU = 200_000
+
+GRADES = pd.CategoricalDtype(['A', 'B', 'C', 'D', 'E'], ordered=True)
+
+# Nutriments et scores numériques (NaN possibles → float32)
+COLONNES_NUMERIQUES = [
+    'energy_kj', 'energy_kcal', 'saturated_fat', 'sugar',
+    'sodium_mg', 'sodium_g', 'protein', 'fiber', 'fruits_veg_nuts_pct',
+    'additives_count', 'nutriscore_score', 'ecoscore_score'
+]
+COLONNES_GRADES = ['nutriscore_grade', 'ecoscore_grade']
+COLONNES_TEXTE = ['product_id', 'product_name', 'code_barre']
+# Peu de valeurs distinctes, beaucoup de lignes → catégories
+COLONNES_CATEGORIES = ['category', 'brand']
+COLONNE_CATEGORIE = 'category'
+COLONNE_BIO = 'is_organic'
+# Groupe de scoring d'un produit dans le catalogue unique (un par fichier source)
+COLONNE_GROUPE = 'groupe'
+SANS_CATEGORIE = "(sans catégorie)"
+
+# Nom source → nom canonique
+SYNONYMES = {
+    # data_yaourt.csv
+    'marque': 'brand',
+    'energie_en_kcal': 'energy_kcal',
+    # Exports OpenFoodFacts (valeurs pour 100 g, sodium en g)
+    'code': 'code_barre',
+    'brands': 'brand',
+    'main_category': 'category',
+    'energy-kj_100g': 'energy_kj',
+    'energy-kcal_100g': 'energy_kcal',
+    'saturated-fat_100g': 'saturated_fat',
+    'sugars_100g': 'sugar',
+    'sodium_100g': 'sodium_g',
+    'proteins_100g': 'protein',
+    'fiber_100g': 'fiber',
+    'fruits-vegetables-nuts-estimate-from-ingredients_100g': 'fruits_veg_nuts_pct',
+    'additives_n': 'additives_count',
+    'environmental_score_score': 'ecoscore_score',
+    'environmental_score_grade': 'ecoscore_grade',
+}
+# Étiquettes OpenFoodFacts: le bio s'y lit quand la colonne COLONNE_BIO manque
+COLONNE_LABELS = 'labels_tags'
+LABEL_BIO = 'en:organic'
+
+COLONNES_UTILES = (COLONNES_TEXTE + COLONNES_CATEGORIES + COLONNES_NUMERIQUES
+                   + COLONNES_GRADES + [COLONNE_BIO, COLONNE_LABELS])
+
+VALEURS_BIO = ['yes', 'oui', '1', 'true']
+# (colonne, colonne dont elle est déduite si elle manque, facteur)
+CONVERSIONS = [('energy_kj', 'energy_kcal', 4.184), ('sodium_g', 'sodium_mg', 0.001)]
+
+_DTYPES = {
+    **{c: 'float32' for c in COLONNES_NUMERIQUES},
+    **{c: 'string' for c in COLONNES_TEXTE + COLONNES_GRADES + [COLONNE_BIO, COLONNE_LABELS]},
+    **{c: 'category' for c in COLONNES_CATEGORIES},
+}
+# Types de lecture, pour les noms canoniques comme pour leurs synonymes
+DTYPES_LECTURE = {**_DTYPES, **{source: _DTYPES[c] for source, c in SYNONYMES.items()}}
+
+
+def nom_canonique(colonne):
+    return SYNONYMES.get(colonne, colonne)
+
+
+def separateur(chemin):
+    """',' ou '\\t' (exports OpenFoodFacts), d'après la ligne d'en-tête"""
+    ouvrir = gzip.open if chemin.endswith('.gz') else open
+    with ouvrir(chemin, 'rt', encoding='utf-8-sig') as f:
+        entete = f.readline()
+    return '\t' if entete.count('\t') > entete.count(',') else ','
+
+
+def empreinte_fichiers(chemins, taille_bloc=1 << 20):
+    """Empreinte SHA-256 du contenu d'une liste de fichiers"""
+    h = hashlib.sha256()
+    for chemin in chemins:
+        with open(chemin, 'rb') as f:
+            for bloc in iter(lambda: f.read(taille_bloc), b''):
+                h.update(bloc)
+    return h.hexdigest()
+
+
+def empreinte_donnees(*dfs):
+    """Empreinte SHA-256 de DataFrames en mémoire (données sans fichier source)"""
+    h = hashlib.sha256()
+    for df in dfs:
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def renommer_morceau(df):
+    """Colonnes sous leur nom canonique; un synonyme est ignoré si le nom canonique est déjà pris"""
+    noms, vus = {}, set(df.columns) - set(SYNONYMES)
+    for c in df.columns:
+        canonique = nom_canonique(c)
+        if c in SYNONYMES and canonique in vus:
+            continue
+        noms[c] = canonique
+        vus.add(canonique)
+    df = df[list(noms)] if len(noms) < len(df.columns) else df
+    return df.rename(columns=noms) if any(c != n for c, n in noms.items()) else df
+
+
+def typer_morceau(df):
+    """Grades en catégories A…E, bio en booléen (lu dans labels_tags à défaut), catégorie et marque en catégories.
+
+    energy_kj et sodium_g manquants sont déduits de energy_kcal et sodium_mg (CONVERSIONS).
+    """
+    for col in COLONNES_GRADES:
+        if col in df.columns and df[col].dtype != GRADES:
+            df[col] = df[col].astype('string').str.strip().str.upper().astype(GRADES)
+    if COLONNE_BIO not in df.columns and COLONNE_LABELS in df.columns:
+        df[COLONNE_BIO] = df[COLONNE_LABELS].astype('string').str.contains(LABEL_BIO, regex=False).fillna(False)
+    if COLONNE_LABELS in df.columns:
+        df = df.drop(columns=COLONNE_LABELS)
+    if COLONNE_BIO in df.columns:
+        bio = df[COLONNE_BIO]
+        df[COLONNE_BIO] = (bio.fillna(False).astype(bool) if pd.api.types.is_bool_dtype(bio)
+                           else bio.astype('string').str.strip().str.lower().isin(VALEURS_BIO).astype(bool))
+    for col in COLONNES_CATEGORIES:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    # Critère ELECTRE renseigné dans une autre unité seulement: converti, comme dans les calculateurs
+    for col, source, facteur in CONVERSIONS:
+        if source in df.columns:
+            converti = df[source] * facteur
+            df[col] = converti if col not in df.columns else df[col].fillna(converti)
+    return df
+
+
+def normaliser_morceau(df):
+    """Morceau lu (fichier de l'application, export OpenFoodFacts…) → schéma canonique typé"""
+    return typer_morceau(renommer_morceau(df))
+
+
+def lire_morceaux_csv(chemin, taille=TAILLE_MORCEAU, colonnes=COLONNES_UTILES):
+    """Itère sur un CSV par morceaux normalisés.
+
+    `colonnes` (noms canoniques) filtre les colonnes lues; `colonnes=None`
+    les garde toutes (les colonnes connues restent renommées et typées).
+    """
+    usecols = (lambda c: nom_canonique(c) in colonnes) if colonnes is not None else None
+    lecteur = pd.read_csv(chemin, sep=separateur(chemin), encoding='utf-8-sig', usecols=usecols,
+                          dtype=DTYPES_LECTURE, chunksize=taille)
+    with lecteur:
+        for morceau in lecteur:
+            yield normaliser_morceau(morceau)
+
+
+def unifier_categories(frames):
+    """Mêmes catégories dans tous les DataFrames, pour que pd.concat garde les colonnes catégorielles"""
+    for col in COLONNES_CATEGORIES:
+        series = [df[col] for df in frames if col in df.columns]
+        if len(series) > 1 and all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            categories = union_categoricals(series, ignore_order=True).categories
+            for df in frames:
+                if col in df.columns:
+                    df[col] = df[col].cat.set_categories(categories)
+    return frames
+
+
+def lire_catalogue(chemin, taille=TAILLE_MORCEAU, colonnes=COLONNES_UTILES):
+    """Charge un CSV complet. Retourne (DataFrame, rapport de chargement)"""
+    debut = time.perf_counter()
+    morceaux = list(lire_morceaux_csv(chemin, taille, colonnes))
+    if not morceaux:
+        raise ValueError(f"{chemin}: aucune ligne lue")
+    # Les catégories diffèrent d'un morceau à l'autre
+    df = pd.concat(unifier_categories(morceaux), ignore_index=True) if len(morceaux) > 1 else morceaux[0]
+
+    rapport = {
+        'fichier': chemin,
+        'empreinte': empreinte_fichiers([chemin]),
+        'lignes': len(df),
+        'colonnes': len(df.columns),
+        'memoire_mo': df.memory_usage(deep=True).sum() / 1024**2,
+        'duree_s': time.perf_counter() - debut,
+    }
+    return df, rapport
+
+
+def assembler_catalogue(catalogues):
+    """Réunit {groupe: DataFrame} en un seul catalogue avec une colonne COLONNE_GROUPE"""
+    df = pd.concat(unifier_categories([morceau.assign(**{COLONNE_GROUPE: groupe})
+                                       for groupe, morceau in catalogues.items()]), ignore_index=True)
+    df[COLONNE_GROUPE] = pd.Categorical(df[COLONNE_GROUPE], categories=list(catalogues))
+    for col in COLONNES_CATEGORIES:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    # Les catégories servent aussi de groupes: pas de valeur manquante
+    if COLONNE_CATEGORIE in df.columns:
+        categorie = df[COLONNE_CATEGORIE]
+        if categorie.isna().any():
+            categorie = categorie.cat.add_categories([SANS_CATEGORIE]).fillna(SANS_CATEGORIE)
+        df[COLONNE_CATEGORIE] = categorie
+    return df
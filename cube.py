@@ -0,0 +1,101 @@
+"""Cube des distributions de grades: groupe × méthode × grade → nombre de produits.
+
+Construit une fois au calcul des scores (np.bincount sur des codes entiers)
+et gardé avec le catalogue scoré: les pages Analyse et Comparaison lisent
+leurs histogrammes dans le cube au lieu de refaire des value_counts à chaque
+rafraîchissement. Après un recalcul incrémental, le cube est mis à jour par
+différence: on retire les lignes disparues, on ajoute les lignes recalculées.
+
+Un cube est un couple (comptes int64 G × M × 5, libellés des G groupes).
+"""
+import numpy as np
+import pandas as pd
+
+# Méthodes du cube, dans l'ordre de la deuxième dimension
+METHODES = ['nutriscore_grade', 'nutriscore_grade_recalc', 'ecoscore_grade',
+            'electre_pess_06', 'electre_opt_06', 'electre_pess_07', 'electre_opt_07',
+            'supernutri_score']
+N_GRADES = 5
+
+
+def _codes_tries(colonne):
+    """(codes des lignes, libellés distincts triés): -1 pour les valeurs manquantes"""
+    codes, valeurs = pd.factorize(colonne)
+    libelles = pd.Series(valeurs).astype('string').to_numpy(dtype=object, na_value="")
+    ordre = np.argsort(libelles, kind='stable')
+    rangs = np.empty(len(ordre) + 1, dtype=np.int64)
+    rangs[ordre] = np.arange(len(ordre))
+    rangs[-1] = -1
+    return rangs[codes], libelles[ordre]
+
+
+def codes_grades(df):
+    """(N × M) int8: 0…4 pour A/A'…E/E', -1 si manquant ou méthode absente.
+
+    Les lettres ne sont lues que sur les valeurs distinctes de chaque colonne.
+    """
+    codes = np.full((len(df), len(METHODES)), -1, dtype=np.int8)
+    for m, c in enumerate(METHODES):
+        if c in df.columns:
+            codes_valeurs, valeurs = _codes_tries(df[c])
+            lettres = pd.Series(valeurs, dtype='string').str.upper().str[0]
+            table = np.append(pd.Categorical(lettres, categories=list('ABCDE')).codes, -1)
+            codes[:, m] = table[codes_valeurs]
+    return codes
+
+
+def construire_cube(df, colonne=None, poids=None):
+    """Cube de `df` groupé par `colonne` (un seul groupe "" si None), lignes pondérées par `poids`"""
+    if colonne is None:
+        codes_groupes, groupes = np.zeros(len(df), dtype=np.int64), np.array([""], dtype=object)
+    else:
+        codes_groupes, groupes = _codes_tries(df[colonne])
+        # Groupe manquant: libellé ""
+        if (codes_groupes < 0).any():
+            groupes = np.append(groupes, "")
+            codes_groupes = np.where(codes_groupes < 0, len(groupes) - 1, codes_groupes)
+            ordre = np.argsort(groupes, kind='stable')
+            rangs = np.argsort(ordre)
+            codes_groupes, groupes = rangs[codes_groupes], groupes[ordre]
+    codes = codes_grades(df)
+    valides = codes >= 0
+    # Indice à plat (groupe, méthode, grade) de chaque couple ligne × méthode renseigné
+    indices = (codes_groupes[:, None] * len(METHODES) + np.arange(len(METHODES))) * N_GRADES + codes
+    ponderation = None if poids is None else np.broadcast_to(np.asarray(poids)[:, None], codes.shape)[valides]
+    comptes = np.bincount(indices[valides], weights=ponderation, minlength=len(groupes) * len(METHODES) * N_GRADES)
+    return comptes.astype(np.int64).reshape(len(groupes), len(METHODES), N_GRADES), groupes
+
+
+def additionner_cubes(*cubes):
+    """Somme de cubes aux groupes éventuellement différents; les groupes vides sont retirés"""
+    groupes = np.array(sorted(set().union(*(set(g) for _, g in cubes))), dtype=object)
+    total = np.zeros((len(groupes), len(METHODES), N_GRADES), dtype=np.int64)
+    for comptes, g in cubes:
+        total[np.searchsorted(groupes, g)] += comptes
+    garder = total.any(axis=(1, 2))
+    return total[garder], groupes[garder]
+
+
+def cube_incremental(cube, ancien_calc, df_calc, sources, colonne=None):
+    """Cube de df_calc déduit du cube de ancien_calc.
+
+    `sources[i]` est la ligne de ancien_calc reprise pour la ligne i de df_calc
+    (-1 si la ligne a été recalculée). Seules les lignes disparues, dupliquées
+    ou recalculées sont comptées: le coût suit le nombre de modifications.
+    """
+    # Une ligne ancienne reprise k fois compte k fois: différence k − 1
+    ecarts = np.bincount(sources[sources >= 0], minlength=len(ancien_calc)) - 1
+    anciennes = np.flatnonzero(ecarts)
+    nouvelles = np.flatnonzero(sources < 0)
+    return additionner_cubes(cube,
+                             construire_cube(ancien_calc.iloc[anciennes], colonne, ecarts[anciennes]),
+                             construire_cube(df_calc.iloc[nouvelles], colonne))
+
+
+def distribution(cube, groupe, methode):
+    """Comptes des 5 grades de `methode` dans `groupe` (zéros si absent)"""
+    comptes, groupes = cube
+    position = np.flatnonzero(groupes == str(groupe))
+    if methode not in METHODES or not len(position):
+        return np.zeros(N_GRADES, dtype=np.int64)
+    return comptes[position[0], METHODES.index(methode)]
@@ -0,0 +1,479 @@
+"""Moteur ELECTRE TRI vectorisé (NumPy).
+
+Les produits sont représentés par une matrice (N × 8) de critères et les
+6 profils π1…π6 par une matrice (6 × 8). Toutes les comparaisons produit /
+profil sont calculées en une fois par diffusion (broadcasting), par blocs
+de lignes pour borner la mémoire.
+
+Les classes sont codées en entiers: 0 = A', 1 = B', 2 = C', 3 = D', 4 = E'.
+
+Deux modèles: binaire (concordance 0/1 par critère, numerateurs_concordance)
+et complet (seuils q, p et veto par critère, indices_credibilite), dont le
+binaire est le cas q = p = 0 sans veto.
+"""
+import numpy as np
+import pandas as pd
+
+# Paramètres fixes du modèle
+POIDS = {
+    'energy_kj': 2, 'saturated_fat': 2, 'sugar': 2, 'sodium_g': 1,
+    'protein': 1, 'fiber': 1, 'fruits_veg_nuts_pct': 1, 'additives_count': 1
+}
+
+SENS = {
+    'energy_kj': 'min', 'saturated_fat': 'min', 'sugar': 'min', 'sodium_g': 'min',
+    'protein': 'max', 'fiber': 'max', 'fruits_veg_nuts_pct': 'max', 'additives_count': 'min'
+}
+
+CRITERES = list(POIDS.keys())
+QUANTILES = [0.05, 0.2, 0.4, 0.6, 0.8, 0.95]
+LAMBDAS = (0.6, 0.7)
+
+# Profils utilisés quand un critère est absent des données
+DEFAUTS_PROFILS = {
+    'energy_kj': [2000, 1500, 1200, 1100, 1050, 1000],
+    'saturated_fat': [10, 5, 2, 1, 0.5, 0.3],
+    'sugar': [18, 8, 4, 3, 2.5, 2],
+    'sodium_g': [1.0, 0.7, 0.5, 0.4, 0.4, 0.35],
+    'protein': [7, 8, 9, 10, 11, 12],
+    'fiber': [0, 2.5, 4, 5.5, 8.5, 9.5],
+    'fruits_veg_nuts_pct': [0, 0, 0, 0, 5, 12],
+    'additives_count': [12, 7, 4, 1, 0, 0]
+}
+
+CLASSES = ["A'", "B'", "C'", "D'", "E'"]
+# Colonnes de classes d'un catalogue: codes 0…4 sur 1 octet
+CATEGORIES_CLASSES = pd.CategoricalDtype(CLASSES, ordered=True)
+
+# Seuils ELECTRE TRI par critère: (indifférence q, préférence p, veto v), en unités
+# du critère; v = None: pas de veto. Le modèle binaire est le cas q = p = 0 sans veto.
+SEUILS_BINAIRES = {crit: (0, 0, None) for crit in CRITERES}
+SEUILS_NUTRITION = {
+    'energy_kj': (20, 60, 1500),
+    'saturated_fat': (0.2, 0.5, 8),
+    'sugar': (0.5, 1.5, 20),
+    'sodium_g': (0.02, 0.05, 0.8),
+    'protein': (0.2, 0.5, None),
+    'fiber': (0.2, 0.5, None),
+    'fruits_veg_nuts_pct': (2, 5, None),
+    'additives_count': (0, 1, 6),
+}
+
+# Nombre de lignes traitées par bloc (≈ 25 Mo de tenseur booléen par bloc)
+TAILLE_BLOC = 262144
+# Idem pour l'indice de crédibilité (tenseurs float64: ≈ 12 Mo par bloc)
+TAILLE_BLOC_CREDIBILITE = 32768
+# Déplacement maximal des profils (en part de l'étendue π1…π6 du critère) toléré
+# avant de tout reclasser avec les nouveaux profils
+TOLERANCE_PROFILS = 0.02
+
+
+def suffixe_lambda(lambda_val):
+    """0.6 → '06', 0.7 → '07' (suffixe des colonnes electre_*)"""
+    return str(lambda_val).replace('.', '')
+
+
+# ============================================================
+# PROFILS
+# ============================================================
+def construire_profils(*dfs):
+    """Calcule les profils π1…π6 (quantiles) sur la concaténation des jeux de données"""
+    profils = {}
+    for i, q in enumerate(QUANTILES, start=1):
+        profils[f"pi{i}"] = {}
+        for crit in CRITERES:
+            if all(crit in df.columns for df in dfs):
+                data = pd.concat([df[crit] for df in dfs]).dropna()
+                if SENS[crit] == 'max':
+                    profils[f"pi{i}"][crit] = float(data.quantile(q))
+                else:
+                    profils[f"pi{i}"][crit] = float(data.quantile(1-q))
+            else:
+                profils[f"pi{i}"][crit] = DEFAUTS_PROFILS[crit][i-1]
+    return profils
+
+
+def construire_profils_groupes(df, colonne=None):
+    """Profils π1…π6 par groupe en une seule passe de quantiles (groupby).
+
+    colonne=None: profils communs à tout le catalogue, retournés sous la clé None.
+    Retourne {groupe: profils} au format de construire_profils; un critère
+    absent ou vide dans un groupe prend les valeurs par défaut.
+    """
+    presents = [crit for crit in CRITERES if crit in df.columns]
+    niveaux = sorted(set(QUANTILES) | {1 - q for q in QUANTILES})
+    if colonne is None:
+        quantiles = {None: df[presents].quantile(niveaux)}
+    else:
+        table = df.groupby(colonne, observed=True)[presents].quantile(niveaux)
+        quantiles = {groupe: table.xs(groupe, level=0) for groupe in table.index.unique(level=0)}
+
+    profils_groupes = {}
+    for groupe, q_groupe in quantiles.items():
+        profils = {}
+        for i, q in enumerate(QUANTILES, start=1):
+            profils[f"pi{i}"] = {}
+            for crit in CRITERES:
+                valeur = q_groupe.at[q if SENS[crit] == 'max' else 1-q, crit] if crit in presents else np.nan
+                profils[f"pi{i}"][crit] = float(valeur) if not np.isnan(valeur) else DEFAUTS_PROFILS[crit][i-1]
+        profils_groupes[groupe] = profils
+    return profils_groupes
+
+
+def profils_en_tableau(profils):
+    """Dictionnaire {pi1: {crit: valeur}} → matrice (6 × 8)"""
+    return np.array([[profils[f"pi{i}"][crit] for crit in CRITERES]
+                     for i in range(1, len(QUANTILES) + 1)], dtype=np.float64)
+
+
+def profils_depuis_tableau(P):
+    """Matrice (6 × 8) → dictionnaire {pi1: {crit: valeur}}"""
+    return {f"pi{i}": {crit: float(P[i-1, j]) for j, crit in enumerate(CRITERES)}
+            for i in range(1, len(P) + 1)}
+
+
+def profils_proches(P_ancien, P_nouveau, tolerance=TOLERANCE_PROFILS):
+    """Vrai si aucun profil n'a bougé de plus de `tolerance` × étendue du critère"""
+    etendue = P_ancien.max(axis=0) - P_ancien.min(axis=0)
+    etendue = np.where(etendue > 0, etendue, 1.0)
+    return bool((np.abs(P_nouveau - P_ancien) <= tolerance * etendue).all())
+
+
+def matrice_criteres(df):
+    """Extrait la matrice (N × 8) des critères (0 si la colonne est absente)"""
+    X = np.zeros((len(df), len(CRITERES)), dtype=np.float64)
+    for j, crit in enumerate(CRITERES):
+        if crit in df.columns:
+            X[:, j] = pd.to_numeric(df[crit], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return X
+
+
+# ============================================================
+# VERSION LIGNE PAR LIGNE (référence)
+# ============================================================
+def concordance_partielle(H, b, crit, sens_dict):
+    if sens_dict[crit] == 'max':
+        return 1 if H[crit] >= b[crit] else 0
+    else:
+        return 1 if H[crit] <= b[crit] else 0
+
+
+def concordance_globale(H, b, poids_dict, sens_dict):
+    num = sum(poids_dict[c] * concordance_partielle(H, b, c, sens_dict) for c in poids_dict)
+    denom = sum(poids_dict.values())
+    return num / denom
+
+
+def ecart_critere(H, b, crit, sens_dict):
+    """Avance de H sur b pour le critère (> 0: H meilleur)"""
+    if sens_dict[crit] == 'max':
+        return H[crit] - b[crit]
+    return b[crit] - H[crit]
+
+
+def indice_credibilite(H, b, seuils, poids_dict=POIDS, sens_dict=SENS):
+    """σ(H, b): concordance linéaire entre q et p, affaiblie par la discordance"""
+    concordances, discordances = {}, {}
+    for crit in poids_dict:
+        q, p, v = seuils[crit]
+        ecart = ecart_critere(H, b, crit, sens_dict)
+        if np.isnan(ecart):
+            # Valeur manquante: critère non satisfait, sans veto
+            concordances[crit], discordances[crit] = 0, 0
+            continue
+        if ecart >= -q:
+            concordances[crit] = 1
+        elif ecart <= -p:
+            concordances[crit] = 0
+        else:
+            concordances[crit] = (ecart + p) / (p - q)
+        if v is None or ecart >= -p:
+            discordances[crit] = 0
+        elif ecart <= -v:
+            discordances[crit] = 1
+        else:
+            discordances[crit] = (-ecart - p) / (v - p)
+
+    c = sum(poids_dict[crit] * concordances[crit] for crit in poids_dict) / sum(poids_dict.values())
+    sigma = c
+    for d in discordances.values():
+        if d > c:
+            sigma *= (1 - d) / (1 - c)
+    return sigma
+
+
+def classify_product(produit, profils, lambda_val, seuils=None):
+    """Classifie un produit (dict critère → valeur) avec ELECTRE TRI
+
+    Sans `seuils`, modèle binaire (concordance_globale); sinon indice de
+    crédibilité avec seuils q, p et veto (indice_credibilite).
+    """
+    classes = ["E'", "D'", "C'", "B'", "A'"]
+    if seuils is None:
+        def surclasse(a, b):
+            return concordance_globale(a, b, POIDS, SENS)
+    else:
+        def surclasse(a, b):
+            return indice_credibilite(a, b, seuils)
+
+    # Pessimiste
+    classe_pess = "E'"
+    for i in reversed(range(1, 6)):
+        c = surclasse(produit, profils[f"pi{i}"])
+        if c >= lambda_val:
+            classe_pess = classes[i-1]
+            break
+
+    # Optimiste
+    classe_opt = "A'"
+    for i in range(2, 7):
+        b = profils[f"pi{i-1}"]
+        c_biH = surclasse(b, produit)
+        c_Hbi = surclasse(produit, b)
+        if c_biH >= lambda_val and c_Hbi < lambda_val:
+            classe_opt = classes[i-2]
+            break
+
+    return classe_pess, classe_opt
+
+
+# ============================================================
+# VERSION VECTORISÉE
+# ============================================================
+def numerateurs_concordance(X, P):
+    """Numérateurs des concordances Σ(poids) de C(H, πi) et C(πi, H).
+
+    Retourne un tableau uint8 (N × 6 × 2): [..., 0] pour H ≥ πi, [..., 1] pour
+    πi ≥ H. Il ne dépend pas de λ: la classification pour n'importe quel λ
+    n'est plus qu'un seuil sur ce tableau (voir classes_depuis_concordances).
+    """
+    w = np.array([POIDS[c] for c in CRITERES], dtype=np.uint8)
+    # Critères à minimiser: changement de signe pour ne comparer qu'avec >=
+    signe = np.array([1.0 if SENS[c] == 'max' else -1.0 for c in CRITERES])
+
+    Xs = (X * signe)[:, None, :]
+    Ps = (P * signe)[None, :, :]
+    # Tenseurs de comparaison (N × 6 × 8); NaN → critère non satisfait
+    conc = np.empty((len(X), P.shape[0], 2), dtype=np.uint8)
+    conc[..., 0] = np.einsum('nkc,c->nk', Xs >= Ps, w)
+    conc[..., 1] = np.einsum('nkc,c->nk', Xs <= Ps, w)
+    return conc
+
+
+def masques_comparaison(X, P):
+    """Comparaisons critère par critère codées en bits (uint8, N × 6 × 2).
+
+    Le bit j de [..., 0] vaut 1 si le critère j de H est au moins aussi bon que
+    celui de πi, et [..., 1] l'inverse. Ces masques ne dépendent ni des poids ni
+    de λ: la concordance pour des poids w est table_w[masque] (voir table_poids).
+    """
+    signe = np.array([1.0 if SENS[c] == 'max' else -1.0 for c in CRITERES])
+    bits = (1 << np.arange(len(CRITERES))).astype(np.uint8)
+
+    Xs = (X * signe)[:, None, :]
+    Ps = (P * signe)[None, :, :]
+    masques = np.empty((len(X), P.shape[0], 2), dtype=np.uint8)
+    masques[..., 0] = ((Xs >= Ps) * bits).sum(axis=2, dtype=np.uint8)
+    masques[..., 1] = ((Xs <= Ps) * bits).sum(axis=2, dtype=np.uint8)
+    return masques
+
+
+def table_poids(poids):
+    """Concordance Σ(poids des critères satisfaits) / Σ(poids) pour les 256 masques possibles"""
+    poids = np.asarray(poids, dtype=np.float64)
+    masques = np.arange(1 << len(poids))
+    bits = (masques[:, None] >> np.arange(len(poids))) & 1
+    return bits @ poids / poids.sum()
+
+
+def seuil_entier(lambda_val):
+    """Plus petit numérateur k tel que k / Σ(poids) ≥ λ.
+
+    Même division que concordance_globale, donc C ≥ λ ⇔ numérateur ≥ k exactement.
+    """
+    denom = sum(POIDS.values())
+    for k in range(denom + 1):
+        if k / denom >= lambda_val:
+            return k
+    return denom + 1
+
+
+def classes_depuis_surclassement(h_sur_b, b_sur_h):
+    """Procédures pessimiste et optimiste (codes 0…4) à partir des tests C ≥ λ.
+
+    h_sur_b[n, i] vaut C(H, πi) ≥ λ et b_sur_h[n, i] vaut C(πi, H) ≥ λ (N × 6 booléens;
+    seuls π1…π5 sont lus).
+    """
+    n_classes = len(CLASSES)
+
+    # Optimiste: premier profil πi strictement préféré au produit → E' pour π1 … A' pour π5
+    opt = np.zeros(len(h_sur_b), dtype=np.int8)
+    for i in range(n_classes - 1, -1, -1):
+        opt[b_sur_h[:, i] & ~h_sur_b[:, i]] = n_classes - 1 - i
+
+    return classes_pessimistes(h_sur_b), opt
+
+
+def classes_pessimistes(h_sur_b):
+    """Procédure pessimiste seule (codes 0…4): elle ne lit que C(H, πi) ≥ λ"""
+    n_classes = len(CLASSES)
+    # Plus haut profil πi (i ≤ 5) surclassé → A' pour π5 … E' pour π1.
+    # Le OU cumulé depuis π5 est vrai pour tous les profils jusqu'à ce πi.
+    cumul = h_sur_b[:, n_classes - 1].copy()
+    nb_surclasses = cumul.astype(np.int8)
+    for i in range(n_classes - 2, -1, -1):
+        cumul |= h_sur_b[:, i]
+        nb_surclasses += cumul
+    return np.minimum(n_classes - 1, n_classes - nb_surclasses).astype(np.int8)
+
+
+def classes_depuis_concordances(conc, lambda_val):
+    """Procédures pessimiste et optimiste pour un λ (codes 0…4)"""
+    k = seuil_entier(lambda_val)
+    return classes_depuis_surclassement(conc[:, :, 0] >= k, conc[:, :, 1] >= k)
+
+
+def concordances_catalogue(X, P, taille_bloc=TAILLE_BLOC):
+    """numerateurs_concordance par blocs de lignes (mémoire bornée)"""
+    X = np.asarray(X, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    conc = np.empty((len(X), P.shape[0], 2), dtype=np.uint8)
+    for debut in range(0, len(X), taille_bloc):
+        fin = min(debut + taille_bloc, len(X))
+        conc[debut:fin] = numerateurs_concordance(X[debut:fin], P)
+    return conc
+
+
+def masques_catalogue(X, P, taille_bloc=TAILLE_BLOC):
+    """masques_comparaison par blocs de lignes (mémoire bornée)"""
+    X = np.asarray(X, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    masques = np.empty((len(X), P.shape[0], 2), dtype=np.uint8)
+    for debut in range(0, len(X), taille_bloc):
+        fin = min(debut + taille_bloc, len(X))
+        masques[debut:fin] = masques_comparaison(X[debut:fin], P)
+    return masques
+
+
+def seuils_en_tableaux(seuils):
+    """Dictionnaire {crit: (q, p, v)} → vecteurs q, p, v (v = inf sans veto)"""
+    q = np.array([seuils[c][0] for c in CRITERES], dtype=np.float64)
+    p = np.array([seuils[c][1] for c in CRITERES], dtype=np.float64)
+    v = np.array([np.inf if seuils[c][2] is None else seuils[c][2] for c in CRITERES], dtype=np.float64)
+    if (q < 0).any() or (p < q).any() or (v < p).any():
+        raise ValueError("Seuils incohérents: il faut 0 ≤ q ≤ p ≤ v pour chaque critère")
+    return q, p, v
+
+
+def indices_credibilite(X, P, seuils=SEUILS_BINAIRES):
+    """Indices de crédibilité σ(H, πi) et σ(πi, H) (float32, N × 6 × 2).
+
+    Noyau (N × 6 × 8) vectorisé: concordance partielle linéaire entre q et p,
+    discordance linéaire entre p et v. Avec q = p = 0 et sans veto, σ est la
+    concordance binaire numerateurs_concordance / Σ(poids).
+    """
+    w = np.array([POIDS[c] for c in CRITERES], dtype=np.float64)
+    signe = np.array([1.0 if SENS[c] == 'max' else -1.0 for c in CRITERES])
+    q, p, v = seuils_en_tableaux(seuils)
+    # Critères à concordance linéaire (p > q), en marche (p = q) et avec veto
+    lineaires = np.flatnonzero(p > q)
+    marches = np.flatnonzero(p == q)
+    vetos = np.flatnonzero(np.isfinite(v))
+
+    Xs = (X * signe)[:, None, :]
+    Ps = (P * signe)[None, :, :]
+    sigma = np.empty((len(X), P.shape[0], 2), dtype=np.float32)
+    # ecart > 0: le premier terme est meilleur; NaN → concordance 0, discordance 0 (fmax/fmin)
+    for k, ecart in enumerate((Xs - Ps, Ps - Xs)):
+        concordance = np.zeros(ecart.shape[:2])
+        if len(lineaires):
+            # 1 si ecart ≥ -q, 0 si ecart ≤ -p, linéaire entre les deux
+            c = ecart[..., lineaires]
+            c += p[lineaires]
+            c *= 1 / (p[lineaires] - q[lineaires])
+            np.fmin(np.fmax(c, 0, out=c), 1, out=c)
+            concordance += c @ w[lineaires]
+        if len(marches):
+            concordance += (ecart[..., marches] >= -q[marches]) @ w[marches]
+        # Division en dernier: σ = k / Σ(poids) exactement dans le cas binaire
+        concordance /= w.sum()
+
+        if len(vetos):
+            # Discordance: 0 si ecart ≥ -p, 1 si ecart ≤ -v, linéaire entre les deux
+            d = np.negative(ecart[..., vetos])
+            d -= p[vetos]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                d *= np.where(v[vetos] > p[vetos], 1 / (v[vetos] - p[vetos]), np.inf)
+            np.fmin(np.fmax(d, 0, out=d), 1, out=d)
+            affaiblit = d > concordance[..., None]
+            if affaiblit.any():
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    facteurs = np.where(affaiblit, (1 - d) / (1 - concordance[..., None]), 1.0)
+                concordance *= facteurs.prod(axis=-1)
+        sigma[..., k] = concordance
+    return sigma
+
+
+def credibilites_catalogue(X, P, seuils=SEUILS_BINAIRES, taille_bloc=TAILLE_BLOC_CREDIBILITE):
+    """indices_credibilite par blocs de lignes (mémoire bornée)"""
+    X = np.asarray(X, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    sigma = np.empty((len(X), P.shape[0], 2), dtype=np.float32)
+    for debut in range(0, len(X), taille_bloc):
+        fin = min(debut + taille_bloc, len(X))
+        sigma[debut:fin] = indices_credibilite(X[debut:fin], P, seuils)
+    return sigma
+
+
+def classes_depuis_credibilites(sigma, lambda_val):
+    """Procédures pessimiste et optimiste sur les indices de crédibilité (codes 0…4)"""
+    # σ est stocké en float32: λ aussi, pour que σ = k / Σ(poids) ≥ λ = k / Σ(poids) reste vrai
+    l = np.float32(lambda_val)
+    return classes_depuis_surclassement(sigma[:, :, 0] >= l, sigma[:, :, 1] >= l)
+
+
+def classer(X, P, lambdas=LAMBDAS, taille_bloc=TAILLE_BLOC):
+    """Classe N produits pour tous les λ en une passe.
+
+    Retourne {λ: (pessimiste, optimiste)}, deux vecteurs int8 de longueur N.
+    """
+    conc = concordances_catalogue(X, P, taille_bloc)
+    return {l: classes_depuis_concordances(conc, l) for l in lambdas}
+
+
+def stabilite_lambda(conc, lambda_min=0.5, lambda_max=1.0):
+    """Classes pour tous les λ de [lambda_min, lambda_max] et λ de changement.
+
+    Les concordances ne prennent que les valeurs k / Σ(poids): la classification
+    ne change qu'aux paliers λ = k / Σ(poids). Retourne un dict avec
+    - 'paliers': λ de début de chaque palier (le premier vaut lambda_min),
+    - 'pess', 'opt': codes (N × paliers),
+    - 'changement_pess', 'changement_opt': premier λ où la classe diffère de
+      celle obtenue à lambda_min (NaN si elle ne change jamais).
+    """
+    denom = sum(POIDS.values())
+    paliers = [lambda_min] + [k / denom for k in range(seuil_entier(lambda_min) + 1, denom + 1)
+                              if k / denom <= lambda_max]
+    paliers = np.array(paliers)
+
+    classes = [classes_depuis_concordances(conc, l) for l in paliers]
+    stabilite = {
+        'paliers': paliers,
+        'pess': np.column_stack([pess for pess, _ in classes]),
+        'opt': np.column_stack([opt for _, opt in classes]),
+    }
+    for procedure in ('pess', 'opt'):
+        codes = stabilite[procedure]
+        change = codes != codes[:, :1]
+        stabilite[f'changement_{procedure}'] = np.where(change.any(axis=1), paliers[np.argmax(change, axis=1)], np.nan)
+    return stabilite
+
+
+def libelles(codes):
+    """Codes 0…4 → libellés A'…E'"""
+    return np.array(CLASSES, dtype=object)[codes]
+
+
+def classes_categorielles(codes):
+    """Codes 0…4 → colonne catégorielle A'…E' (sans copie des libellés)"""
+    return pd.Categorical.from_codes(codes, dtype=CATEGORIES_CLASSES)
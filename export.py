@@ -0,0 +1,120 @@
+"""Écriture par morceaux des catalogues scorés: CSV, JSONL, Parquet et XLSX.
+
+Un Ecrivain reçoit des DataFrames les uns après les autres: CSV et JSONL sont
+écrits en ajout, Parquet par groupes de lignes (pyarrow.ParquetWriter) et
+XLSX en mode write_only d'openpyxl, où chaque ligne part dans le fichier
+temporaire de sa feuille au lieu de rester dans un classeur en mémoire.
+exporter() parcourt des positions du catalogue par morceaux de
+TAILLE_MORCEAU lignes: la mémoire utilisée ne dépend que de la taille d'un
+morceau, pas du nombre de lignes exportées.
+"""
+import numpy as np
+
+TAILLE_MORCEAU = 50_000
+
+EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'jsonl': '.jsonl', 'xlsx': '.xlsx'}
+TYPES_MIME = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'jsonl': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Lignes d'une feuille Excel, en-tête compris: au-delà, la suite va dans une nouvelle feuille
+LIGNES_MAX_XLSX = 1_048_576
+TITRE_FEUILLE = "Scores"
+
+
+class Ecrivain:
+    """Écrit les morceaux scorés les uns après les autres dans un fichier"""
+
+    def __init__(self, chemin, fmt):
+        self.chemin = chemin
+        self.fmt = fmt
+        self.premier = True
+        self._parquet = None
+        self._classeur = None
+        self._feuille = None
+        self._lignes_feuille = 0
+
+    def ecrire(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self.chemin, mode='w' if self.premier else 'a', header=self.premier, index=False)
+        elif self.fmt == 'jsonl':
+            lignes = df.to_json(orient='records', lines=True, force_ascii=False)
+            with open(self.chemin, 'w' if self.premier else 'a', encoding='utf-8') as f:
+                f.write(lignes if lignes.endswith('\n') else lignes + '\n')
+        elif self.fmt == 'xlsx':
+            self._ecrire_xlsx(df)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # Les types déduits varient d'un morceau CSV à l'autre (int puis float):
+            # les entiers sont promus en flottants pour garder un schéma stable
+            entiers = df.select_dtypes(include='int').columns
+            table = pa.Table.from_pandas(df.astype({c: 'float64' for c in entiers}), preserve_index=False)
+            if self._parquet is None:
+                # Idem pour les catégories (marque…): index int8 ou int16 selon le morceau → int32
+                schema = pa.schema([
+                    c.with_type(pa.dictionary(pa.int32(), c.type.value_type, c.type.ordered))
+                    if pa.types.is_dictionary(c.type) else c for c in table.schema], metadata=table.schema.metadata)
+                self._parquet = pq.ParquetWriter(self.chemin, schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        self.premier = False
+
+    def _ecrire_xlsx(self, df):
+        if self._classeur is None:
+            from openpyxl import Workbook
+            self._classeur = Workbook(write_only=True)
+        entete = list(df.columns)
+        if self._feuille is None:
+            self._nouvelle_feuille(entete)
+        # float32 → float64 par leur écriture décimale la plus courte (1190.4 et non 1190.400024414062)
+        flottants = df.select_dtypes(include='float32').columns
+        df = df.astype({c: str for c in flottants}).astype({c: 'float64' for c in flottants})
+        # Valeurs manquantes (NaN, NA, None) → cellules vides
+        valeurs = df.astype(object).where(df.notna(), None)
+        for ligne in valeurs.itertuples(index=False, name=None):
+            if self._lignes_feuille >= LIGNES_MAX_XLSX:
+                self._nouvelle_feuille(entete)
+            self._feuille.append(ligne)
+            self._lignes_feuille += 1
+
+    def _nouvelle_feuille(self, entete):
+        numero = len(self._classeur.worksheets) + 1
+        self._feuille = self._classeur.create_sheet(TITRE_FEUILLE if numero == 1 else f"{TITRE_FEUILLE} ({numero})")
+        self._feuille.append(entete)
+        self._lignes_feuille = 1
+
+    def fermer(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._classeur is not None:
+            self._classeur.save(self.chemin)
+
+
+def exporter(df, chemin, fmt, positions=None, colonnes=None, taille=TAILLE_MORCEAU, transformer=None,
+             progression=None):
+    """Écrit les lignes `positions` de df (toutes si None), colonnes `colonnes`, morceau par morceau.
+
+    `transformer(morceau)` est appliqué à chaque morceau avant écriture;
+    `progression(lignes écrites, total)` est appelé après chacun.
+    Retourne le nombre de lignes écrites.
+    """
+    positions = np.arange(len(df)) if positions is None else np.asarray(positions)
+    colonnes = list(df.columns) if colonnes is None else colonnes
+    ecrivain = Ecrivain(chemin, fmt)
+    try:
+        if not len(positions):
+            # Fichier vide mais lisible: en-tête CSV, schéma Parquet, feuille XLSX
+            ecrivain.ecrire(df.iloc[:0][colonnes])
+        for debut in range(0, len(positions), taille):
+            morceau = df.iloc[positions[debut:debut + taille]][colonnes]
+            if transformer is not None:
+                morceau = transformer(morceau)
+            ecrivain.ecrire(morceau)
+            if progression is not None:
+                progression(min(debut + taille, len(positions)), len(positions))
+    finally:
+        ecrivain.fermer()
+    return len(positions)
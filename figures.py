@@ -0,0 +1,62 @@
+"""Cache LRU des figures Plotly, partagé entre les rafraîchissements et les sessions.
+
+Chaque interaction Streamlit réexécute la page et reconstruisait toutes ses
+figures. Une figure est désormais identifiée par (version des données, page,
+graphique, paramètres): tant que cette clé ne change pas, la figure est
+relue depuis son JSON sérialisé, sans revalidation Plotly ni recalcul des
+données qui l'alimentent. Les entrées les moins récemment utilisées sont
+évincées au-delà de TAILLE_MAX octets de JSON.
+
+Désactivable avec la variable d'environnement SUPERNUTRI_CACHE_FIGURES=0
+(utile pour mesurer le gain, voir benchmarks/bench_rafraichissement.py).
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+TAILLE_MAX = int(float(os.environ.get('SUPERNUTRI_CACHE_FIGURES', 32 * 2 ** 20)))
+
+
+class CacheFigures:
+    """Figures sérialisées en JSON, évincées par ordre d'utilisation au-delà de `taille_max` octets"""
+
+    def __init__(self, taille_max=TAILLE_MAX):
+        self.taille_max = taille_max
+        self.taille = 0
+        self.succes = 0
+        self.echecs = 0
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def figure(self, cle, construire):
+        """Figure de clé `cle`, construite par `construire()` si elle n'est pas en cache"""
+        with self._verrou:
+            texte = self._entrees.get(cle)
+            if texte is not None:
+                self._entrees.move_to_end(cle)
+                self.succes += 1
+        if texte is not None:
+            import plotly.graph_objects as go
+            # Le JSON vient d'une figure déjà validée: pas de seconde validation
+            return go.Figure(json.loads(texte), _validate=False)
+
+        fig = construire()
+        if self.taille_max <= 0:
+            with self._verrou:
+                self.echecs += 1
+            return fig
+        texte = fig.to_json()
+        with self._verrou:
+            self.echecs += 1
+            if cle not in self._entrees:
+                self._entrees[cle] = texte
+                self.taille += len(texte)
+            while self.taille > self.taille_max and self._entrees:
+                _, ancien = self._entrees.popitem(last=False)
+                self.taille -= len(ancien)
+        return fig
+
+    def statistiques(self):
+        return {'entrees': len(self._entrees), 'octets': self.taille,
+                'succes': self.succes, 'echecs': self.echecs}
@@ -0,0 +1,115 @@
+"""Grille paginée des produits: filtres, tri et comptes calculés côté serveur.
+
+Le catalogue scoré est rangé une fois par version en colonnes NumPy:
+les grades (Nutri-Score, Eco-Score, ELECTRE TRI, SuperNutri) et les groupes
+en petits entiers, les nutriments en float32. Un filtre est un masque booléen
+obtenu par tables de correspondance sur ces codes et par comparaisons de
+plages; les comptes par grade sont des np.bincount sur les lignes retenues.
+L'ordre de tri de chaque colonne est calculé à la première demande puis
+gardé: une page triée se lit en parcourant cet ordre restreint au masque.
+Seules les lignes de la page courante sont extraites du DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+from electre import CRITERES
+
+COLONNES_NOTES = ['nutriscore_grade', 'nutriscore_grade_recalc', 'ecoscore_grade',
+                  'electre_pess_06', 'electre_opt_06', 'electre_pess_07', 'electre_opt_07',
+                  'supernutri_score']
+COLONNES_NUTRIMENTS = CRITERES + ['energy_kcal', 'nutriscore_score', 'ecoscore_score']
+COLONNE_BIO = 'is_organic'
+TAILLE_PAGE = 50
+
+
+class GrilleProduits:
+    """Stockage en colonnes d'un catalogue scoré pour filtrer, trier et paginer"""
+
+    def __init__(self, df, colonne_groupe=None):
+        self.df = df
+        self.n = len(df)
+        # Colonnes codées: nom → (codes int16, -1 si manquant; modalités triées)
+        self.codes = {}
+        for c in COLONNES_NOTES + ([colonne_groupe] if colonne_groupe else []):
+            if c in df.columns and c not in self.codes:
+                codes, modalites = pd.factorize(df[c].astype('string'), sort=True)
+                self.codes[c] = (codes.astype(np.int16), list(modalites))
+        self.nutriments = {c: df[c].to_numpy(dtype=np.float32, na_value=np.nan)
+                           for c in COLONNES_NUTRIMENTS if c in df.columns}
+        self.bio = (df[COLONNE_BIO].fillna(False).to_numpy(dtype=bool)
+                    if COLONNE_BIO in df.columns else None)
+        self._ordres = {}
+
+    def modalites(self, colonne):
+        return self.codes[colonne][1]
+
+    def etendue(self, colonne):
+        """(min, max) d'un nutriment sur tout le catalogue"""
+        valeurs = self.nutriments[colonne]
+        if np.isnan(valeurs).all():
+            return 0.0, 0.0
+        return float(np.nanmin(valeurs)), float(np.nanmax(valeurs))
+
+    def filtrer(self, modalites=None, bio=None, plages=None):
+        """Masque des lignes retenues.
+
+        modalites: {colonne codée: valeurs acceptées} (grades, groupe);
+        bio: True / False / None (indifférent);
+        plages: {nutriment: (min, max)} bornes incluses, valeurs manquantes exclues.
+        """
+        masque = np.ones(self.n, dtype=bool)
+        for colonne, valeurs in (modalites or {}).items():
+            codes, toutes = self.codes[colonne]
+            acceptees = np.zeros(len(toutes) + 1, dtype=bool)
+            acceptees[[toutes.index(v) for v in valeurs if v in toutes]] = True
+            masque &= acceptees[codes]
+        if bio is not None and self.bio is not None:
+            masque &= self.bio if bio else ~self.bio
+        for colonne, (bas, haut) in (plages or {}).items():
+            valeurs = self.nutriments[colonne]
+            masque &= (valeurs >= bas) & (valeurs <= haut)
+        return masque
+
+    def comptes(self, masque, colonnes=COLONNES_NOTES):
+        """{colonne: Series modalité → nombre de lignes retenues}"""
+        positions = np.flatnonzero(masque)
+        resultat = {}
+        for c in colonnes:
+            if c in self.codes:
+                codes, modalites = self.codes[c]
+                comptes = np.bincount(codes[positions] + 1, minlength=len(modalites) + 1)[1:]
+                resultat[c] = pd.Series(comptes, index=modalites)
+        return resultat
+
+    def _ordre(self, colonne, croissant):
+        """Positions de toutes les lignes triées par `colonne` (valeurs manquantes en dernier)"""
+        cle = (colonne, croissant)
+        if cle not in self._ordres:
+            if colonne in self.nutriments:
+                valeurs = self.nutriments[colonne]
+                valeurs = valeurs if croissant else -valeurs
+            elif colonne in self.codes:
+                codes = self.codes[colonne][0].astype(np.float32)
+                codes[codes < 0] = np.nan
+                valeurs = codes if croissant else -codes
+            else:
+                valeurs = self.df[colonne].astype('string').to_numpy(dtype=object, na_value=None)
+                ordre = pd.Series(valeurs).sort_values(ascending=croissant, na_position='last',
+                                                       kind='stable').index.to_numpy()
+                self._ordres[cle] = ordre
+                return ordre
+            self._ordres[cle] = np.argsort(valeurs, kind='stable')
+        return self._ordres[cle]
+
+    def positions(self, masque, tri=None, croissant=True):
+        """Positions des lignes retenues, dans l'ordre du tri"""
+        if tri is None:
+            return np.flatnonzero(masque)
+        ordre = self._ordre(tri, croissant)
+        return ordre[masque[ordre]]
+
+    def page(self, masque, numero=0, taille=TAILLE_PAGE, tri=None, croissant=True, colonnes=None):
+        """Lignes de la page `numero` (à partir de 0) parmi les lignes retenues"""
+        positions = self.positions(masque, tri, croissant)[numero * taille:(numero + 1) * taille]
+        df = self.df.iloc[positions]
+        return df[colonnes] if colonnes is not None else df
@@ -0,0 +1,198 @@
+"""Mesure des étapes de chaque rafraîchissement Streamlit.
+
+Un rafraîchissement (rerun) est découpé en étapes nommées: des jalons
+successifs au niveau du script (chargement, profils, scores, page…) et des
+étapes imbriquées (`with etape(...)`) autour des fonctions en cache, du
+classement d'un produit saisi ou de la construction d'une figure. Les
+fonctions décorées par cache_mesure comptent aussi leurs succès et échecs de
+cache: l'écart entre l'appel et le calcul est le coût du hachage et de la
+relecture par Streamlit.
+
+Le journal, commun au processus, garde une fenêtre glissante des durées par
+page et par étape (p50 / p95). Si SUPERNUTRI_TRACE désigne un fichier, chaque
+rafraîchissement y est ajouté en une ligne JSON, ainsi qu'un résumé toutes
+les INTERVALLE_RESUME_S secondes; au-delà de TAILLE_MAX_TRACE octets, le
+fichier est renommé en .1 et un nouveau est commencé.
+"""
+import functools
+import json
+import os
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+TRACE = os.environ.get('SUPERNUTRI_TRACE')
+TAILLE_MAX_TRACE = int(float(os.environ.get('SUPERNUTRI_TRACE_TAILLE', 16 * 2 ** 20)))
+INTERVALLE_RESUME_S = 60
+FENETRE = 500
+
+_locale = threading.local()
+
+
+class Mesures:
+    """Étapes et comptes de cache d'un rafraîchissement"""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.etapes = []
+        self.profondeur = 0
+        self.jalon = None
+        # nom → [appels, échecs]
+        self.caches = defaultdict(lambda: [0, 0])
+
+    @contextmanager
+    def etape(self, nom):
+        entree = {'nom': nom, 'debut_ms': (time.perf_counter() - self.debut) * 1000,
+                  'profondeur': self.profondeur, 'duree_ms': None}
+        self.etapes.append(entree)
+        self.profondeur += 1
+        try:
+            yield
+        finally:
+            self.profondeur -= 1
+            entree['duree_ms'] = (time.perf_counter() - self.debut) * 1000 - entree['debut_ms']
+
+    def nouveau_jalon(self, nom):
+        """Termine le jalon en cours et en commence un autre, au niveau du script"""
+        if self.jalon is not None:
+            self.jalon.__exit__(None, None, None)
+        self.jalon = self.etape(nom) if nom is not None else None
+        if self.jalon is not None:
+            self.jalon.__enter__()
+
+    def terminer(self, page):
+        self.nouveau_jalon(None)
+        return {'type': 'rerun', 'date': time.time(), 'page': page,
+                'duree_ms': (time.perf_counter() - self.debut) * 1000,
+                'etapes': [e for e in self.etapes if e['duree_ms'] is not None],
+                'caches': {nom: {'appels': a, 'echecs': e} for nom, (a, e) in self.caches.items()}}
+
+
+def debut_rerun():
+    """Nouvelles mesures pour le rafraîchissement du fil courant"""
+    _locale.mesures = Mesures()
+    return _locale.mesures
+
+
+def courantes():
+    return getattr(_locale, 'mesures', None)
+
+
+@contextmanager
+def etape(nom):
+    """Étape imbriquée du rafraîchissement en cours (sans effet hors rafraîchissement)"""
+    mesures = courantes()
+    if mesures is None:
+        yield
+        return
+    with mesures.etape(nom):
+        yield
+
+
+def jalon(nom):
+    mesures = courantes()
+    if mesures is not None:
+        mesures.nouveau_jalon(nom)
+
+
+def compter_cache(nom, echec):
+    mesures = courantes()
+    if mesures is not None:
+        mesures.caches[nom][0] += 1
+        mesures.caches[nom][1] += bool(echec)
+
+
+def cache_mesure(cache, nom=None):
+    """Comme le décorateur `cache` (st.cache_data, st.cache_resource), avec étapes et comptes.
+
+    La fonction décorée garde sa signature et son code source: les clés de
+    cache de Streamlit (arguments préfixés par _ ignorés compris) ne changent pas.
+    """
+    def decorer(fonction):
+        nom_cache = nom or fonction.__name__
+
+        @functools.wraps(fonction)
+        def calcul(*args, **kwargs):
+            mesures = courantes()
+            if mesures is not None:
+                mesures.caches[nom_cache][1] += 1
+            with etape(f"{nom_cache} (calcul)"):
+                return fonction(*args, **kwargs)
+
+        en_cache = cache(calcul)
+
+        @functools.wraps(fonction)
+        def appel(*args, **kwargs):
+            mesures = courantes()
+            if mesures is not None:
+                mesures.caches[nom_cache][0] += 1
+            with etape(nom_cache):
+                return en_cache(*args, **kwargs)
+
+        appel.clear = en_cache.clear
+        return appel
+    return decorer
+
+
+def _centiles(durees):
+    p50, p95 = np.percentile(durees, [50, 95])
+    return {'n': len(durees), 'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2)}
+
+
+class Journal:
+    """Fenêtres glissantes des durées par page et trace JSONL tournante, communes au processus"""
+
+    def __init__(self, chemin=TRACE, taille_max=TAILLE_MAX_TRACE, fenetre=FENETRE,
+                 intervalle=INTERVALLE_RESUME_S):
+        self.chemin = chemin
+        self.taille_max = taille_max
+        self.intervalle = intervalle
+        self.pages = defaultdict(lambda: deque(maxlen=fenetre))
+        self.etapes = defaultdict(lambda: deque(maxlen=fenetre))
+        self.caches = defaultdict(lambda: [0, 0])
+        self.dernier_resume = time.time()
+        self._verrou = threading.Lock()
+
+    def enregistrer(self, rerun):
+        with self._verrou:
+            page = rerun['page']
+            self.pages[page].append(rerun['duree_ms'])
+            for e in rerun['etapes']:
+                self.etapes[page, e['nom']].append(e['duree_ms'])
+            for nom, c in rerun['caches'].items():
+                self.caches[nom][0] += c['appels']
+                self.caches[nom][1] += c['echecs']
+            if self.chemin:
+                lignes = [rerun]
+                if rerun['date'] - self.dernier_resume >= self.intervalle:
+                    lignes.append(self._resume())
+                    self.dernier_resume = rerun['date']
+                self._ecrire(lignes)
+
+    def resume(self):
+        with self._verrou:
+            return self._resume()
+
+    def _resume(self):
+        pages = {}
+        for page, durees in self.pages.items():
+            pages[page] = {**_centiles(durees), 'etapes': {
+                nom: _centiles(d) for (p, nom), d in self.etapes.items() if p == page}}
+        return {'type': 'resume', 'date': time.time(), 'hote': socket.gethostname(), 'pid': os.getpid(),
+                'pages': pages,
+                'caches': {nom: {'appels': a, 'succes': a - e, 'echecs': e} for nom, (a, e) in self.caches.items()}}
+
+    def _ecrire(self, lignes):
+        try:
+            if os.path.exists(self.chemin) and os.path.getsize(self.chemin) > self.taille_max:
+                os.replace(self.chemin, f"{self.chemin}.1")
+            with open(self.chemin, 'a', encoding='utf-8') as f:
+                for ligne in lignes:
+                    f.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+        except OSError:
+            # La trace ne doit jamais interrompre l'application
+            pass
@@ -0,0 +1,115 @@
+"""Nutri-Score 2025 (ANSES) vectorisé.
+
+Les points sont calculés avec np.searchsorted sur des colonnes entières, ce
+qui permet de recalculer le Nutri-Score de tout le catalogue et de le comparer
+au grade stocké dans `nutriscore_grade`. Les mêmes fonctions acceptent des
+scalaires (calculateurs).
+"""
+import numpy as np
+import pandas as pd
+
+# Points négatifs
+SEUILS_ENERGIE = [335, 670, 1005, 1340, 1675, 2010, 2345, 2680, 3015, 3350]
+SEUILS_SATURES = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+SEUILS_SUCRES = [3.4, 6.8, 10, 14, 17, 20, 24, 27, 31, 34, 37, 41, 44, 48, 51]
+SEUILS_SEL = [0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0, 2.2, 2.4, 2.6, 2.8, 3.0, 3.2, 3.4, 3.6, 3.8, 4.0]
+
+# Points positifs
+SEUILS_FIBRES = [0.9, 1.9, 2.8, 3.7, 4.7]
+SEUILS_PROTEINES = [1.6, 3.2, 4.8, 6.4, 8.0]
+SEUILS_FRUITS = [40, 60, 80]          # strictement supérieur
+POINTS_FRUITS = np.array([0, 1, 2, 5])
+
+# Règle 2025: protéines non comptées si négatifs ≥ 11 et fruits/légumes < 80%
+SEUIL_NEGATIFS_PROTEINES = 11
+SEUIL_FRUITS_PROTEINES = 80
+
+GRADES = ['A', 'B', 'C', 'D', 'E']
+BORNES_GRADES = [-1, 2, 10, 18]       # score ≤ borne
+
+
+def _points(seuils, valeurs):
+    return np.searchsorted(seuils, valeurs, side="right")
+
+
+def points_nutriscore(energy_kj, saturated_fat, sugar, sel_g, fiber, protein, fruits_veg_nuts_pct):
+    """Détail des points Nutri-Score (scalaires ou tableaux de même forme)"""
+    pts = {
+        'energie': _points(SEUILS_ENERGIE, energy_kj),
+        'satures': _points(SEUILS_SATURES, saturated_fat),
+        'sucres': _points(SEUILS_SUCRES, sugar),
+        'sel': _points(SEUILS_SEL, sel_g),
+        'fruits': POINTS_FRUITS[np.searchsorted(SEUILS_FRUITS, fruits_veg_nuts_pct, side="left")],
+        'fibres': _points(SEUILS_FIBRES, fiber),
+        'proteines': _points(SEUILS_PROTEINES, protein),
+    }
+    pts['negatifs'] = pts['energie'] + pts['satures'] + pts['sucres'] + pts['sel']
+    pts['positifs'] = pts['fruits'] + pts['fibres'] + pts['proteines']
+
+    # Règle 2025
+    pts['proteines_exclues'] = ((pts['negatifs'] >= SEUIL_NEGATIFS_PROTEINES)
+                                & (np.asarray(fruits_veg_nuts_pct) < SEUIL_FRUITS_PROTEINES))
+    pts['positifs_final'] = np.where(pts['proteines_exclues'],
+                                     pts['positifs'] - pts['proteines'], pts['positifs'])
+    pts['score'] = pts['negatifs'] - pts['positifs_final']
+    return pts
+
+
+def grade_nutriscore(score):
+    """Score → indice de grade (0 = A … 4 = E)"""
+    return np.searchsorted(BORNES_GRADES, score, side="left")
+
+
+def nutriscore_colonnes(colonne, manquant=None):
+    """Nutri-Score 2025 à partir de colonnes de nutriments.
+
+    `colonne(nom)` renvoie le tableau float64 d'une colonne (NaN si absente).
+    Retourne (score, grade ou None, validité): les produits dont une valeur
+    nutritionnelle manque ne sont pas recalculés, sauf si `manquant` donne la
+    valeur à utiliser (après les conversions kcal → kJ et sodium g → mg).
+    """
+    energie = colonne('energy_kj')
+    # kJ manquants: conversion depuis les kcal quand elles existent
+    for nom_kcal in ('energy_kcal', 'energie_en_kcal'):
+        energie = np.where(np.isnan(energie), colonne(nom_kcal) * 4.184, energie)
+
+    sodium_mg = colonne('sodium_mg')
+    sodium_mg = np.where(np.isnan(sodium_mg), colonne('sodium_g') * 1000, sodium_mg)
+    sel_g = sodium_mg / 400
+
+    valeurs = [energie, colonne('saturated_fat'), colonne('sugar'), sel_g,
+               colonne('fiber'), colonne('protein'), colonne('fruits_veg_nuts_pct')]
+    if manquant is not None:
+        valeurs = [np.where(np.isnan(v), manquant, v) for v in valeurs]
+    valide = ~np.isnan(np.column_stack(valeurs)).any(axis=1)
+
+    score = points_nutriscore(*valeurs)['score']
+    grades = np.array(GRADES, dtype=object)[grade_nutriscore(score)]
+    return score, np.where(valide, grades, None), valide
+
+
+def nutriscore_catalogue(df):
+    """Recalcule le Nutri-Score 2025 de tout un catalogue.
+
+    Ajoute `nutriscore_score_recalc`, `nutriscore_grade_recalc` et
+    `nutriscore_mismatch` (grade recalculé ≠ grade stocké). Les produits dont
+    une valeur nutritionnelle manque ne sont pas recalculés.
+    """
+    def colonne(nom):
+        if nom not in df.columns:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[nom], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+    score, grades, valide = nutriscore_colonnes(colonne)
+
+    df = df.copy()
+    df['nutriscore_score_recalc'] = pd.Series(score, index=df.index).where(valide).astype('Int16')
+    df['nutriscore_grade_recalc'] = grades
+
+    if 'nutriscore_grade' in df.columns:
+        stocke = df['nutriscore_grade'].astype('string').str.upper()
+        df['nutriscore_mismatch'] = (valide & stocke.notna().to_numpy()
+                                     & (stocke.to_numpy(dtype=object, na_value='') != grades))
+    else:
+        df['nutriscore_mismatch'] = False
+    return df
@@ -0,0 +1,135 @@
+"""Classement ELECTRE TRI et SuperNutri sur plusieurs processus, en mémoire partagée.
+
+Les critères (N × 8), les profils, les groupes des lignes et leurs codes
+Eco-Score / bio sont copiés une fois dans des segments
+multiprocessing.shared_memory, auxquels chaque processus du pool s'attache à
+son démarrage. Une tâche n'est qu'un intervalle de lignes (debut, fin): le
+processus calcule les concordances, les classes pour chaque λ et le
+SuperNutri de ces lignes et les écrit directement dans les tableaux de
+sortie, eux aussi partagés. Aucun DataFrame ni tableau ne transite entre
+processus.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from electre import LAMBDAS, classes_depuis_concordances, concordances_catalogue
+
+TAILLE_TACHE_MIN = 65_536
+TACHES_PAR_PROCESSUS = 4
+
+# Tableaux partagés vus par un processus du pool: nom → tableau
+_tableaux = {}
+_segments = []
+
+
+class TableauxPartages:
+    """Tableaux NumPy dans des segments de mémoire partagée, libérés à la sortie du bloc with"""
+
+    def __init__(self):
+        self.segments = []
+        self.descripteurs = {}
+        self.tableaux = {}
+
+    def creer(self, nom, forme, dtype, valeurs=None):
+        dtype = np.dtype(dtype)
+        segment = shared_memory.SharedMemory(create=True, size=max(math.prod(forme) * dtype.itemsize, 1))
+        self.segments.append(segment)
+        self.descripteurs[nom] = (segment.name, forme, dtype.str)
+        self.tableaux[nom] = np.ndarray(forme, dtype=dtype, buffer=segment.buf)
+        if valeurs is not None:
+            self.tableaux[nom][...] = valeurs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # Plus aucune vue ne doit référencer les segments à leur fermeture
+        self.tableaux.clear()
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+
+
+def _attacher(descripteurs):
+    """Initialisation d'un processus du pool: vues sur les segments partagés"""
+    for nom, (nom_segment, forme, dtype) in descripteurs.items():
+        segment = shared_memory.SharedMemory(name=nom_segment)
+        _segments.append(segment)
+        _tableaux[nom] = np.ndarray(forme, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _classer_intervalle(debut, fin, lambdas, indice_supernutri):
+    t = _tableaux
+    X, groupes, P = t['X'][debut:fin], t['groupes'][debut:fin], t['P']
+    if len(P) == 1:
+        conc = concordances_catalogue(X, P[0])
+    else:
+        conc = np.empty((fin - debut, P.shape[1], 2), dtype=np.uint8)
+        for g in np.unique(groupes):
+            lignes = groupes == g
+            conc[lignes] = concordances_catalogue(X[lignes], P[g])
+    t['conc'][debut:fin] = conc
+    for k, l in enumerate(lambdas):
+        t['pess'][k, debut:fin], t['opt'][k, debut:fin] = classes_depuis_concordances(conc, l)
+    if indice_supernutri is not None:
+        cle = (t['pess'][indice_supernutri, debut:fin], t['eco'][debut:fin], t['bio'][debut:fin])
+        t['supernutri'][debut:fin] = t['table_grades'][cle]
+        t['regles'][debut:fin] = t['table_regles'][cle]
+    return fin - debut
+
+
+def intervalles(n, jobs, taille_min=TAILLE_TACHE_MIN):
+    """Bornes (debut, fin) des tâches: TACHES_PAR_PROCESSUS par processus pour équilibrer la charge"""
+    taille = max(taille_min, math.ceil(n / (jobs * TACHES_PAR_PROCESSUS)))
+    return [(debut, min(debut + taille, n)) for debut in range(0, n, taille)]
+
+
+def classer_partage(X, P, lambdas=LAMBDAS, jobs=2, groupes=None, supernutri=None):
+    """Concordances, classes et SuperNutri de toutes les lignes de X, calculés par `jobs` processus.
+
+    P est une matrice de profils (6 × 8) ou, avec `groupes` (code 0…G-1 de
+    chaque ligne), une pile (G × 6 × 8). `supernutri` = (table des grades,
+    table des règles, codes Eco-Score, codes bio) de scoring.table_supernutri,
+    appliquée à la classe pessimiste de λ = 0.6.
+    Retourne (conc N × 6 × 2, {λ: (pess, opt)}, (grades, règles) ou None).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    P = np.asarray(P, dtype=np.float64)
+    if P.ndim == 2:
+        P = P[None]
+    n, lambdas = len(X), list(lambdas)
+    indice_supernutri = lambdas.index(0.6) if supernutri is not None and 0.6 in lambdas else None
+
+    with TableauxPartages() as partage:
+        partage.creer('X', X.shape, np.float64, X)
+        partage.creer('P', P.shape, np.float64, P)
+        partage.creer('groupes', (n,), np.int32, 0 if groupes is None else groupes)
+        partage.creer('conc', (n, P.shape[1], 2), np.uint8)
+        partage.creer('pess', (len(lambdas), n), np.int8)
+        partage.creer('opt', (len(lambdas), n), np.int8)
+        if indice_supernutri is not None:
+            table_grades, table_regles, eco, bio = supernutri
+            partage.creer('table_grades', table_grades.shape, table_grades.dtype, table_grades)
+            partage.creer('table_regles', table_regles.shape, table_regles.dtype, table_regles)
+            partage.creer('eco', (n,), np.int8, eco)
+            partage.creer('bio', (n,), np.int8, bio)
+            partage.creer('supernutri', (n,), np.uint8)
+            partage.creer('regles', (n,), np.uint8)
+
+        bornes = intervalles(n, jobs)
+        if bornes:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(bornes)), initializer=_attacher,
+                                     initargs=(partage.descripteurs,)) as pool:
+                list(pool.map(_classer_intervalle, *zip(*bornes), [lambdas] * len(bornes),
+                              [indice_supernutri] * len(bornes)))
+
+        # Copies hors des segments avant leur libération
+        t = partage.tableaux
+        classes = {l: (t['pess'][k].copy(), t['opt'][k].copy()) for k, l in enumerate(lambdas)}
+        scores_supernutri = (t['supernutri'].copy(), t['regles'].copy()) if indice_supernutri is not None else None
+        conc = t['conc'].copy()
+        del t
+    return conc, classes, scores_supernutri
@@ -0,0 +1,54 @@
+"""Profils ELECTRE TRI précalculés, partagés entre les pages et les sessions.
+
+Les profils π1…π6 ne dépendent que du jeu de données: ils sont calculés une
+fois par empreinte de données (voir chargement.empreinte_fichiers) puis
+réutilisés par calculate_all_scores et par les deux calculateurs. Classer un
+produit saisi devient une simple comparaison de tableaux.
+"""
+import numpy as np
+
+from cache_scores import lire_dernier
+from chargement import assembler_catalogue
+from electre import (CRITERES, LAMBDAS, classer, construire_profils_groupes, libelles, profils_depuis_tableau,
+                     profils_en_tableau, profils_proches)
+
+
+def profils_communs(catalogue, reprendre=False):
+    """Profils π1…π6 communs à tout le catalogue, ceux de calculate_all_scores.
+
+    Avec `reprendre`, les profils communs du dernier calcul sur disque sont conservés
+    tant que les nouvelles données ne les déplacent pas au-delà de TOLERANCE_PROFILS:
+    seules les lignes modifiées sont alors recalculées.
+    """
+    profils = construire_profils_groupes(catalogue)[None]
+    precedent = lire_dernier() if reprendre else None
+    if precedent is not None and list(precedent[1]['groupes']) == [""]:
+        P_precedent = np.asarray(precedent[1]['profils'][0])
+        if profils_proches(P_precedent, profils_en_tableau(profils)):
+            profils = profils_depuis_tableau(P_precedent)
+    return profils
+
+
+def profils_catalogues(catalogues, reprendre=False):
+    """Matrice des profils communs de {groupe: DataFrame}, assemblés en un catalogue comme dans l'application"""
+    return profils_en_tableau(profils_communs(assembler_catalogue(catalogues), reprendre))
+
+
+class ProfilsELECTRE:
+    """Profils π1…π6 d'un jeu de données identifié par son empreinte"""
+
+    def __init__(self, profils, empreinte):
+        self.profils = profils
+        self.empreinte = empreinte
+        self.P = profils_en_tableau(profils)
+
+    def classer_produit(self, produit, lambdas=LAMBDAS):
+        """Classe un produit saisi (dict critère → valeur).
+
+        Retourne {λ: (classe pessimiste, classe optimiste)} en libellés A'…E'.
+        Les valeurs passent par float32, comme les nutriments du catalogue, pour
+        être comparées aux profils exactement comme un produit du catalogue.
+        """
+        x = np.array([[produit.get(crit, 0) for crit in CRITERES]], dtype=np.float32)
+        resultats = classer(x, self.P, lambdas)
+        return {l: (libelles(pess[0]), libelles(opt[0])) for l, (pess, opt) in resultats.items()}
@@ -0,0 +1,127 @@
+"""Recherche de produits par nom, marque et code-barres.
+
+Deux index construits une fois par version du catalogue:
+- codes-barres: table de hachage exacte (pd.Index) sur les codes normalisés
+  (chiffres seuls, sans zéros de tête: EAN-13 et UPC-A se retrouvent);
+- texte: index inversé des mots du nom et de la marque, sans accents ni
+  casse. Les mots distincts sont triés, ce qui permet la recherche par
+  préfixe par dichotomie (« yaou » trouve « yaourt »); les positions des
+  lignes de chaque mot sont stockées à plat (CSR).
+
+Une requête de plusieurs mots renvoie les produits contenant tous les mots.
+"""
+import numpy as np
+import pandas as pd
+
+COLONNES_TEXTE = ['product_name', 'brand']
+COLONNES_CODE = ['code_barre']
+# En dessous de cette longueur, un mot de la requête doit correspondre exactement
+LONGUEUR_MIN_PREFIXE = 2
+LIMITE_DEFAUT = 50
+
+
+def normaliser(textes):
+    """Minuscules, sans accents, ponctuation remplacée par des espaces (Series → Series)"""
+    return (textes.astype('string').fillna('').str.normalize('NFKD')
+            .str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip())
+
+
+def normaliser_code(codes):
+    """Code-barres → chiffres seuls, sans zéros de tête"""
+    return (codes.astype('string').fillna('').str.replace(r'\D', '', regex=True)
+            .str.lstrip('0'))
+
+
+class IndexRecherche:
+    """Index code-barres et texte d'un catalogue (positions de lignes)"""
+
+    def __init__(self, df):
+        self.n = len(df)
+
+        # Codes-barres: première colonne de code présente
+        codes = [normaliser_code(df[c]) for c in COLONNES_CODE if c in df.columns]
+        self.codes = pd.Index(codes[0].to_numpy(dtype=object)) if codes else None
+
+        # Mots de chaque valeur distincte de chaque colonne texte (les noms et
+        # marques se répètent: la normalisation ne porte que sur les valeurs distinctes)
+        colonnes = []
+        for c in COLONNES_TEXTE:
+            if c in df.columns:
+                codes_valeurs, valeurs = pd.factorize(df[c])
+                mots = normaliser(pd.Series(valeurs, dtype=object)).str.split().explode().dropna()
+                mots = mots[mots != '']
+                colonnes.append((codes_valeurs, mots.index.to_numpy(dtype=np.int64),
+                                 mots.to_numpy(dtype=object), len(valeurs)))
+        tous = np.concatenate([m for _, _, m, _ in colonnes]) if colonnes else np.empty(0, dtype=object)
+        ids_mots, self.mots = pd.factorize(tous, sort=True)
+        self.mots = np.asarray(self.mots, dtype=object)
+
+        # Paires (mot, ligne): chaque ligne reçoit les mots de sa valeur
+        paires = []
+        decalage_mots = 0
+        for codes_valeurs, valeur_mot, mots, n_valeurs in colonnes:
+            ids = ids_mots[decalage_mots:decalage_mots + len(mots)].astype(np.int64)
+            decalage_mots += len(mots)
+            nb = np.bincount(valeur_mot, minlength=n_valeurs)
+            debuts_valeur = np.cumsum(nb) - nb
+            lignes = np.flatnonzero(codes_valeurs >= 0)
+            k = nb[codes_valeurs[lignes]]
+            rang = np.arange(k.sum()) - np.repeat(np.cumsum(k) - k, k)
+            positions = np.repeat(debuts_valeur[codes_valeurs[lignes]], k) + rang
+            paires.append(ids[positions] * max(self.n, 1) + np.repeat(lignes, k))
+        paires = np.sort(np.concatenate(paires)) if paires else np.empty(0, dtype=np.int64)
+        paires = paires[np.r_[True, paires[1:] != paires[:-1]]] if len(paires) else paires
+
+        # CSR: les lignes du mot i sont postings[debuts[i]:debuts[i + 1]]
+        self.postings = paires % max(self.n, 1)
+        self.debuts = np.searchsorted(paires // max(self.n, 1), np.arange(len(self.mots) + 1))
+
+    def _lignes_mot(self, mot):
+        """Lignes contenant un mot commençant par `mot` (ou égal si mot court)"""
+        debut = np.searchsorted(self.mots, mot, side='left')
+        if len(mot) < LONGUEUR_MIN_PREFIXE:
+            fin = debut + int(debut < len(self.mots) and self.mots[debut] == mot)
+        else:
+            fin = np.searchsorted(self.mots, mot + '\uffff', side='left')
+        if fin - debut == 1:
+            return self.postings[self.debuts[debut]:self.debuts[debut + 1]]
+        return np.unique(self.postings[self.debuts[debut]:self.debuts[fin]])
+
+    def par_code(self, code):
+        """Positions des lignes de code-barres exactement `code`"""
+        if self.codes is None:
+            return np.empty(0, dtype=np.int64)
+        cle = normaliser_code(pd.Series([code])).iloc[0]
+        return self.codes.get_indexer_for([cle]).astype(np.int64) if cle else np.empty(0, dtype=np.int64)
+
+    def rechercher(self, requete, limite=LIMITE_DEFAUT):
+        """Positions des produits correspondant à la requête (au plus `limite`).
+
+        Une requête faite uniquement de chiffres est d'abord cherchée comme code-barres.
+        Retourne (positions, nombre total de correspondances).
+        """
+        requete = str(requete).strip()
+        if requete.replace(' ', '').isdigit():
+            trouves = self.par_code(requete)
+            trouves = trouves[trouves >= 0]
+            if len(trouves):
+                return trouves[:limite], len(trouves)
+
+        mots = normaliser(pd.Series([requete])).iloc[0].split()
+        if not mots:
+            return np.empty(0, dtype=np.int64), 0
+        # Mots les plus longs d'abord: ensembles plus petits, arrêt plus tôt si vide
+        resultat = None
+        for mot in sorted(mots, key=len, reverse=True):
+            lignes = self._lignes_mot(mot)
+            if resultat is None:
+                resultat = lignes
+            else:
+                # Intersection de deux listes triées par marquage: O(N) sans tri
+                marque = np.zeros(self.n, dtype=bool)
+                marque[resultat] = True
+                resultat = lignes[marque[lignes]]
+            if len(resultat) == 0:
+                break
+        return resultat[:limite], len(resultat)
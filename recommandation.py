@@ -0,0 +1,73 @@
+"""Alternatives plus saines: k plus proches voisins de meilleur SuperNutri-Score.
+
+Les produits sont placés dans l'espace des 8 critères ELECTRE TRI, chaque
+critère étant ramené à l'étendue de ses profils (|π6 − π1|) et pondéré par
+√poids: la distance euclidienne compte alors deux fois plus l'énergie, les
+sucres et les graisses saturées, comme le modèle. Un arbre k-d (cKDTree) est
+construit une fois par version du catalogue pour chaque grade SuperNutri (et
+pour chaque couple catégorie × grade): chercher les alternatives d'un produit
+de grade C revient à interroger les arbres A et B et à fusionner les voisins.
+"""
+import numpy as np
+import pandas as pd
+
+from electre import CRITERES, POIDS, matrice_criteres
+
+GRADES = ['A', 'B', 'C', 'D', 'E']
+K_DEFAUT = 5
+
+
+class Recommandeur:
+    """Arbres k-d par grade SuperNutri (et par catégorie) d'un catalogue scoré"""
+
+    def __init__(self, df, P, colonne=None):
+        X = matrice_criteres(df)
+        etendue = np.abs(P[-1] - P[0]).astype(np.float64)
+        etendue[etendue == 0] = 1.0
+        self.echelle = np.sqrt([POIDS[c] for c in CRITERES]) / etendue
+        # Critère manquant: médiane du catalogue (les arbres k-d n'acceptent pas NaN)
+        self.medianes = np.nan_to_num(np.nanmedian(X, axis=0)) if len(X) else np.zeros(len(CRITERES))
+        Z = self._normaliser(X)
+
+        grades = pd.Categorical(df['supernutri_score'].astype('string'), categories=GRADES).codes
+
+        # (catégorie ou None, code du grade) → (arbre, positions des lignes)
+        self.arbres = {}
+        for g in range(len(GRADES)):
+            self._ajouter_arbre((None, g), np.flatnonzero(grades == g), Z)
+        if colonne is not None:
+            cles = pd.DataFrame({'grade': grades, 'categorie': df[colonne].astype('string').fillna('').to_numpy()})
+            for (g, categorie), positions in cles.groupby(['grade', 'categorie'], sort=False).indices.items():
+                if g >= 0:
+                    self._ajouter_arbre((categorie, int(g)), positions, Z)
+
+    def _ajouter_arbre(self, cle, positions, Z):
+        # scipy n'est importé qu'à la construction du premier arbre (démarrage de l'application)
+        from scipy.spatial import cKDTree
+        if len(positions):
+            self.arbres[cle] = (cKDTree(Z[positions]), positions)
+
+    def _normaliser(self, X):
+        X = np.where(np.isnan(X), self.medianes, X)
+        return X * self.echelle
+
+    def alternatives(self, produit, grade, k=K_DEFAUT, categorie=None):
+        """Les k produits les plus proches de `produit` (dict critère → valeur) de grade strictement meilleur.
+
+        Retourne (positions dans le catalogue, distances), triées par distance.
+        """
+        z = self._normaliser(np.array([[produit.get(c, np.nan) for c in CRITERES]], dtype=np.float64))[0]
+        positions, distances = [], []
+        for g in range(GRADES.index(grade)):
+            if (categorie, g) not in self.arbres:
+                continue
+            arbre, lignes = self.arbres[categorie, g]
+            d, i = arbre.query(z, k=min(k, arbre.n))
+            d, i = np.atleast_1d(d), np.atleast_1d(i)
+            positions.append(lignes[i])
+            distances.append(d)
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        positions, distances = np.concatenate(positions), np.concatenate(distances)
+        ordre = np.argsort(distances, kind='stable')[:k]
+        return positions[ordre], distances[ordre]
@@ -0,0 +1,92 @@
+"""Robustesse des classes ELECTRE TRI aux poids des critères (Monte-Carlo).
+
+Les poids POIDS sont tirés au hasard (Dirichlet autour des poids actuels, ou
+uniformément sur le simplexe) et tout le catalogue est reclassé pour chaque
+tirage. Les comparaisons critère par critère ne dépendent pas des poids: elles
+sont calculées une fois (electre.masques_catalogue), puis chaque tirage se
+réduit à une table de 256 booléens « concordance ≥ λ » indexée par les masques.
+
+Le résultat est, pour chaque produit, la part des tirages qui le classent en
+A'…E' (acceptabilité de classe). Les tirages sont répartis sur un pool de
+processus; chaque processus reçoit les masques une seule fois.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from electre import CLASSES, CRITERES, POIDS, classes_depuis_surclassement, classes_pessimistes, table_poids
+
+MODES_TIRAGE = ('dirichlet', 'simplexe')
+CONCENTRATION_DEFAUT = 50.0
+TIRAGES_PAR_TACHE = 64
+
+_masques = None
+
+
+def tirer_poids(n, mode='dirichlet', concentration=CONCENTRATION_DEFAUT, seed=None):
+    """n vecteurs de poids (n × 8), normalisés à une somme de 1.
+
+    'dirichlet': centrés sur POIDS, d'autant plus proches que la concentration est grande.
+    'simplexe': uniformes sur le simplexe (aucun a priori sur les poids).
+    """
+    if mode not in MODES_TIRAGE:
+        raise ValueError(f"Mode de tirage inconnu: {mode} (attendu: {', '.join(MODES_TIRAGE)})")
+    rng = np.random.default_rng(seed)
+    if mode == 'simplexe':
+        alpha = np.ones(len(CRITERES))
+    else:
+        poids = np.array([POIDS[c] for c in CRITERES], dtype=np.float64)
+        alpha = concentration * poids / poids.sum()
+    return rng.dirichlet(alpha, size=n)
+
+
+def comptes_classes(masques, poids, lambda_val, procedure='pess'):
+    """Nombre de tirages par classe pour chaque produit (uint32, N × 5)"""
+    n_classes = len(CLASSES)
+    # Les procédures n'utilisent que π1…π5
+    h_sur_b = np.ascontiguousarray(masques[:, :n_classes, 0])
+    b_sur_h = np.ascontiguousarray(masques[:, :n_classes, 1])
+
+    # Case (produit, classe) de chaque produit: n_classes × produit + code
+    decalages = np.arange(len(masques), dtype=np.intp) * n_classes
+    comptes = np.zeros(len(masques) * n_classes, dtype=np.int64)
+    for w in poids:
+        surclasse = table_poids(w) >= lambda_val
+        h_ok = surclasse[h_sur_b]
+        if procedure == 'pess':
+            # La procédure pessimiste ne regarde pas C(πi, H): ni évalué ni classé en optimiste
+            codes = classes_pessimistes(h_ok)
+        else:
+            codes = classes_depuis_surclassement(h_ok, surclasse[b_sur_h])[1]
+        comptes += np.bincount(decalages + codes, minlength=len(comptes))
+    return comptes.reshape(len(masques), n_classes).astype(np.uint32)
+
+
+def _initialiser(masques):
+    global _masques
+    _masques = masques
+
+
+def _compter(poids, lambda_val, procedure):
+    return comptes_classes(_masques, poids, lambda_val, procedure)
+
+
+def acceptabilite_classes(masques, n_tirages=1000, lambda_val=0.6, procedure='pess',
+                          mode='dirichlet', concentration=CONCENTRATION_DEFAUT, seed=None, jobs=None):
+    """Part des tirages de poids classant chaque produit en A'…E' (float32, N × 5).
+
+    `masques` vient de electre.masques_catalogue. jobs=1 calcule dans le processus courant.
+    """
+    poids = tirer_poids(n_tirages, mode, concentration, seed)
+    jobs = jobs or os.cpu_count() or 1
+    lots = [poids[debut:debut + TIRAGES_PAR_TACHE] for debut in range(0, len(poids), TIRAGES_PAR_TACHE)]
+
+    if jobs == 1 or len(lots) == 1:
+        comptes = comptes_classes(masques, poids, lambda_val, procedure)
+    else:
+        comptes = np.zeros((len(masques), len(CLASSES)), dtype=np.uint32)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_initialiser, initargs=(masques,)) as pool:
+            for partiel in pool.map(_compter, lots, [lambda_val] * len(lots), [procedure] * len(lots)):
+                comptes += partiel
+    return (comptes / n_tirages).astype(np.float32)
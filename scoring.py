@@ -0,0 +1,264 @@
+"""Calcul des scores d'un catalogue, sans dépendance à Streamlit.
+
+Utilisé par app.py (calculate_all_scores) et par la CLI supernutri.py.
+"""
+import numpy as np
+import pandas as pd
+
+from electre import (CLASSES, LAMBDAS, classes_categorielles, classes_depuis_concordances, concordances_catalogue,
+                     matrice_criteres, suffixe_lambda)
+from nutriscore import nutriscore_catalogue
+from partage import classer_partage
+
+# Règles SuperNutri pouvant être rapportées par calculate_supernutri
+REGLES_SUPERNUTRI = {
+    'bonus_eco_a': "Bonus Eco-Score A: +1 grade",
+    'malus_eco_de': "Malus Eco-Score D/E: -1 grade",
+    'bonus_bio': "Bonus Bio: +1 grade",
+    'plafond_eco_e': "Limitation Eco-Score E: grade max = C",
+}
+
+
+def calculate_supernutri(row, electre_pess_06, regles=None):
+    """Calcule SuperNutri-Score
+
+    Si `regles` est une liste, on y ajoute le nom des règles appliquées
+    (voir REGLES_SUPERNUTRI), dans l'ordre d'application.
+    """
+    map_in = {"A'":1, "B'":2, "C'":3, "D'":4, "E'":5}
+    map_out = {1:"A", 2:"B", 3:"C", 4:"D", 5:"E"}
+    appliquees = regles if regles is not None else []
+
+    score = map_in[electre_pess_06]
+    eco = str(row.get('ecoscore_grade', 'C')).upper()
+    is_bio = str(row.get('is_organic', 'No')).lower() in ['yes', 'oui', '1', 'true']
+
+    if eco == "A" and score > 1:
+        score -= 1
+        appliquees.append('bonus_eco_a')
+    if eco in ["D", "E"] and score < 5:
+        score += 1
+        appliquees.append('malus_eco_de')
+    if is_bio and eco != "E" and score > 1:
+        score -= 1
+        appliquees.append('bonus_bio')
+    if eco == "E":
+        score = max(score, 3)
+        appliquees.append('plafond_eco_e')
+
+    score = max(1, min(5, score))
+    return map_out[score]
+
+
+# Table SuperNutri: le résultat ne dépend que de (classe ELECTRE, Eco-Score, bio).
+# Eco-Score: A…E, puis toute autre valeur (manquante, "unknown"…) en dernier.
+ECO_SUPERNUTRI = ['A', 'B', 'C', 'D', 'E', '?']
+GRADES_SUPERNUTRI = np.array(['A', 'B', 'C', 'D', 'E'], dtype=object)
+CATEGORIES_SUPERNUTRI = pd.CategoricalDtype(GRADES_SUPERNUTRI, ordered=True)
+# Bit de chaque règle dans la colonne supernutri_regles
+BITS_REGLES = {nom: 1 << i for i, nom in enumerate(REGLES_SUPERNUTRI)}
+
+
+def table_supernutri():
+    """(grades, règles) uint8 de forme 5 classes × 6 Eco-Scores × 2 (bio).
+
+    Obtenue en appelant calculate_supernutri sur chaque combinaison: les
+    règles restent écrites une seule fois.
+    """
+    grades = np.zeros((len(CLASSES), len(ECO_SUPERNUTRI), 2), dtype=np.uint8)
+    masques = np.zeros_like(grades)
+    for i, classe in enumerate(CLASSES):
+        for j, eco in enumerate(ECO_SUPERNUTRI):
+            for bio in (0, 1):
+                regles = []
+                grade = calculate_supernutri({'ecoscore_grade': eco, 'is_organic': 'yes' if bio else 'no'},
+                                             classe, regles)
+                grades[i, j, bio] = GRADES_SUPERNUTRI.tolist().index(grade)
+                masques[i, j, bio] = sum(BITS_REGLES[r] for r in regles)
+    return grades, masques
+
+
+def _codes_distincts(colonne, code):
+    """code(str(valeur)) calculé sur les seules valeurs distinctes de `colonne`.
+
+    Dans une colonne object, factorize confond 1, 1.0 et True, que str()
+    distingue: si elle contient des valeurs non textuelles, on factorise
+    leur texte.
+    """
+    codes, valeurs = pd.factorize(colonne)
+    if colonne.dtype == object and any(not isinstance(v, str) for v in valeurs):
+        codes, valeurs = pd.factorize(colonne.map(str))
+    # Valeur manquante (None, NaN, NA): même code pour toutes
+    table = [code(str(v)) for v in valeurs] + [code('nan')]
+    return np.array(table, dtype=np.int64)[codes]
+
+
+def _code_eco(valeur):
+    eco = str(valeur).upper()
+    return ECO_SUPERNUTRI.index(eco) if eco in ECO_SUPERNUTRI[:-1] else len(ECO_SUPERNUTRI) - 1
+
+
+def _code_bio(valeur):
+    return int(str(valeur).lower() in ['yes', 'oui', '1', 'true'])
+
+
+def codes_supernutri(df):
+    """(codes Eco-Score, codes bio) de chaque ligne: les deux derniers indices de la table"""
+    n = len(df)
+    eco = (_codes_distincts(df['ecoscore_grade'], _code_eco) if 'ecoscore_grade' in df.columns
+           else np.full(n, ECO_SUPERNUTRI.index('C')))
+    bio = (_codes_distincts(df['is_organic'], _code_bio) if 'is_organic' in df.columns
+           else np.zeros(n, dtype=np.int64))
+    return eco, bio
+
+
+def supernutri_catalogue(df_calc, classe=None):
+    """(grades SuperNutri, masques des règles appliquées uint8) de toutes les lignes.
+
+    Même résultat que calculate_supernutri ligne à ligne: les valeurs
+    distinctes sont codées, puis la table est lue par indexation.
+    `classe` (codes 0…4 de electre_pess_06) évite de relire les libellés.
+    """
+    codes, masques = _codes_supernutri(df_calc, classe)
+    return GRADES_SUPERNUTRI[codes], masques
+
+
+def _codes_supernutri(df_calc, classe=None):
+    """(codes 0…4 des grades SuperNutri, masques des règles) de toutes les lignes"""
+    grades, masques = table_supernutri()
+    if classe is None:
+        classe = pd.Categorical(df_calc['electre_pess_06'], categories=CLASSES).codes
+    eco, bio = codes_supernutri(df_calc)
+    return grades[classe, eco, bio], masques[classe, eco, bio]
+
+
+def supernutri_produit(classe, ecoscore_grade, is_organic):
+    """(grade SuperNutri, noms des règles appliquées) d'un seul produit, lus dans la table"""
+    grades, masques = table_supernutri()
+    i, j, k = CLASSES.index(classe), _code_eco(ecoscore_grade), _code_bio(is_organic)
+    return GRADES_SUPERNUTRI[grades[i, j, k]], regles_depuis_masque(masques[i, j, k])
+
+
+def regles_depuis_masque(masque):
+    """Noms des règles (clés de REGLES_SUPERNUTRI) d'un masque supernutri_regles"""
+    return [nom for nom, bit in BITS_REGLES.items() if int(masque) & bit]
+
+
+def _scores(df, P, lambdas=LAMBDAS, conc=None, jobs=1, groupes=None):
+    """Corps de score_dataframe; retourne (df_calc, conc).
+
+    Avec jobs > 1 et sans `conc`, concordances, classes et SuperNutri sont
+    calculés par jobs processus en mémoire partagée (partage.classer_partage);
+    P peut alors être une pile (G × 6 × 8) choisie ligne à ligne par `groupes`.
+    """
+    # Nutri-Score 2025 recalculé pour tout le catalogue (audit du grade stocké)
+    df_calc = nutriscore_catalogue(df)
+
+    supernutri = None
+    if conc is None and jobs > 1:
+        conc, classes, supernutri = classer_partage(
+            matrice_criteres(df_calc), P, lambdas, jobs, groupes, (*table_supernutri(), *codes_supernutri(df_calc)))
+    else:
+        # Concordances calculées une fois, puis un simple seuil par λ
+        if conc is None:
+            conc = concordances_catalogue(matrice_criteres(df_calc), P)
+        classes = {l: classes_depuis_concordances(conc, l) for l in lambdas}
+    for l, (pess, opt) in classes.items():
+        df_calc[f'electre_pess_{suffixe_lambda(l)}'] = classes_categorielles(pess)
+        df_calc[f'electre_opt_{suffixe_lambda(l)}'] = classes_categorielles(opt)
+
+    if supernutri is None:
+        supernutri = _codes_supernutri(df_calc, classes[0.6][0] if 0.6 in classes else None)
+    df_calc['supernutri_score'] = pd.Categorical.from_codes(supernutri[0], dtype=CATEGORIES_SUPERNUTRI)
+    df_calc['supernutri_regles'] = supernutri[1]
+    return df_calc, conc
+
+
+def score_dataframe(df, P, lambdas=LAMBDAS, conc=None, jobs=1):
+    """Ajoute Nutri-Score recalculé, ELECTRE TRI (tous les λ) et SuperNutri-Score.
+
+    P est la matrice (6 × 8) des profils, calculée sur tout le catalogue.
+    Classes ELECTRE et grade SuperNutri sont des colonnes catégorielles
+    ordonnées (codes sur 1 octet), supernutri_regles un masque uint8.
+    `conc` (N × 6 × 2) évite de recalculer les concordances si elles sont déjà connues.
+    jobs > 1: classement réparti sur jobs processus en mémoire partagée.
+    """
+    return _scores(df, P, lambdas, conc, jobs)[0]
+
+
+def empreintes_lignes(df):
+    """Empreinte 64 bits du contenu de chaque ligne (uint64, indépendante de l'index)"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def score_groupes(df, profils, colonne=None, lambdas=LAMBDAS, jobs=1):
+    """score_dataframe avec des profils propres à chaque groupe de `colonne`.
+
+    `profils` est une matrice (6 × 8) commune si colonne=None, sinon
+    {groupe: matrice}. Avec jobs > 1, toutes les lignes sont classées en une
+    passe sur jobs processus en mémoire partagée, chacune avec les profils de
+    son groupe; sinon groupe par groupe, puis remises dans l'ordre des lignes.
+    Retourne (df_calc, conc).
+    """
+    if colonne is None:
+        return _scores(df, profils, lambdas, jobs=jobs)
+
+    indices = df.groupby(colonne, observed=True).indices
+    groupes = list(indices)
+    if len(groupes) <= 1:
+        return _scores(df, profils[groupes[0]] if groupes else next(iter(profils.values())), lambdas, jobs=jobs)
+
+    if jobs > 1:
+        codes = np.zeros(len(df), dtype=np.int32)
+        for i, g in enumerate(groupes):
+            codes[indices[g]] = i
+        return _scores(df, np.stack([profils[g] for g in groupes]), lambdas, jobs=jobs, groupes=codes)
+
+    resultats = [_scores(df.iloc[indices[g]], profils[g], lambdas) for g in groupes]
+
+    # Retour à l'ordre des lignes de df
+    ordre = np.argsort(np.concatenate([indices[g] for g in groupes]), kind='stable')
+    df_calc = pd.concat([r[0] for r in resultats]).iloc[ordre]
+    conc = np.concatenate([r[1] for r in resultats])[ordre]
+    return df_calc, conc
+
+
+def score_incremental(df, profils, precedent=None, colonne=None, lambdas=LAMBDAS, jobs=1):
+    """score_groupes limité aux lignes nouvelles ou modifiées.
+
+    `precedent` = (df_calc, conc, empreintes) d'un calcul fait avec les mêmes
+    profils; les lignes dont l'empreinte y figure reprennent leurs scores et
+    leurs concordances. Sans précédent, tout est recalculé.
+    Retourne (df_calc, conc, empreintes, rapport {'reutilisees', 'recalculees', 'sources'})
+    où sources[i] est la ligne du précédent reprise pour la ligne i (-1 si recalculée).
+    """
+    empreintes = empreintes_lignes(df)
+    sources = np.full(len(df), -1, dtype=np.int64)
+    if precedent is None or len(precedent[2]) == 0:
+        df_calc, conc = score_groupes(df, profils, colonne, lambdas, jobs)
+        return df_calc, conc, empreintes, {'reutilisees': 0, 'recalculees': len(df), 'sources': sources}
+
+    ancien_calc, ancienne_conc, anciennes = precedent
+    uniques, premieres = np.unique(anciennes, return_index=True)
+    pos = np.searchsorted(uniques, empreintes).clip(max=len(uniques) - 1)
+    trouve = uniques[pos] == empreintes
+    source = premieres[pos[trouve]]
+    sources[trouve] = source
+    nouvelles = np.flatnonzero(~trouve)
+
+    # Concordances: reprises ou recalculées ligne à ligne
+    conc = np.empty((len(df), ancienne_conc.shape[1], 2), dtype=np.uint8)
+    conc[trouve] = ancienne_conc[source]
+
+    # Colonnes de score: celles du calcul précédent absentes des données brutes
+    colonnes = [c for c in ancien_calc.columns if c not in df.columns]
+    reprises = ancien_calc[colonnes].iloc[source].set_axis(np.flatnonzero(trouve))
+    parties = [reprises]
+    if len(nouvelles):
+        recalc, conc[nouvelles] = score_groupes(df.iloc[nouvelles], profils, colonne, lambdas, jobs)
+        parties.append(recalc[colonnes].set_axis(nouvelles))
+    scores = pd.concat(parties).sort_index() if len(parties) > 1 else reprises
+
+    df_calc = pd.concat([df, scores.set_axis(df.index)], axis=1)
+    rapport = {'reutilisees': int(trouve.sum()), 'recalculees': len(nouvelles), 'sources': sources}
+    return df_calc, conc, empreintes, rapport
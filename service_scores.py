@@ -0,0 +1,470 @@
+"""Service HTTP local de calcul des scores par lots (Nutri-Score, ELECTRE TRI, SuperNutri).
+
+Expose les résultats du calculateur aux autres systèmes (application mobile,
+étiquettes de rayon), avec les profils communs de l'application (ceux de
+calculate_all_scores, repris du dernier calcul sur disque s'ils sont encore
+valables):
+
+    POST /score   lot de produits en JSON (liste, ou {"produits": [...]}) ou en
+                  NDJSON (un produit par ligne, Content-Type application/x-ndjson);
+                  réponse dans le même format: scores et règles SuperNutri appliquées.
+                  Champs lus comme dans un fichier (synonymes, grades, bio), nutriment
+                  absent à 0 comme dans les calculateurs; champ mal typé: erreur 400
+    GET  /sante   état du service et empreinte des profils
+
+Les requêtes sont traitées par asyncio (connexions persistantes HTTP/1.1) et
+les produits de requêtes arrivées ensemble sont scorés en un seul lot
+vectorisé: le regroupement attend au plus ATTENTE_LOT_S après la première
+requête, ou TAILLE_LOT_MAX produits. Avec --workers N, N processus écoutent
+chacun sur le même port (SO_REUSEPORT) et le noyau leur répartit les
+connexions: le débit suit le nombre de cœurs.
+
+    python service_scores.py --port 8502
+    python service_scores.py --port 8502 --workers 8
+    curl -s localhost:8502/score -d '[{"energy_kj": 1000, "sugar": 5, "ecoscore_grade": "B"}]'
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from chargement import (COLONNE_BIO, COLONNE_LABELS, COLONNES_GRADES, COLONNES_NUMERIQUES, CONVERSIONS, SYNONYMES,
+                        lire_catalogue, typer_morceau)
+from electre import (CRITERES, LAMBDAS, classes_depuis_concordances, concordances_catalogue, libelles,
+                     suffixe_lambda)
+from nutriscore import nutriscore_colonnes
+from profils import profils_catalogues
+from scoring import GRADES_SUPERNUTRI, codes_supernutri, regles_depuis_masque, table_supernutri
+
+HOTE = '127.0.0.1'
+PORT = 8502
+FICHIERS = ['Products.csv', 'data_yaourt.csv']
+ATTENTE_LOT_S = 0.001
+TAILLE_LOT_MAX = 20_000
+TAILLE_CORPS_MAX = 16 * 2 ** 20
+# Champs d'identification recopiés tels quels dans la réponse
+IDENTIFIANTS = ['product_id', 'code_barre', 'product_name']
+TYPES_NDJSON = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+# Nutriments lus dans un produit: critères ELECTRE, et ceux dont ils sont déduits s'ils manquent
+NUTRIMENTS = CRITERES + [source for _, source, _ in CONVERSIONS]
+# Grades, bio et étiquettes: valeurs scalaires, typées comme à la lecture d'un fichier (typer_morceau)
+CHAMPS_TEXTE = COLONNES_GRADES + [COLONNE_BIO, COLONNE_LABELS]
+# Noms acceptés pour chaque champ: le nom canonique, puis ses synonymes (chargement.SYNONYMES)
+NOMS_SOURCES = {c: [c] + [s for s, canonique in SYNONYMES.items() if canonique == c]
+                for c in COLONNES_NUMERIQUES + CHAMPS_TEXTE}
+CHAMPS_NUMERIQUES = {nom for c in COLONNES_NUMERIQUES for nom in NOMS_SOURCES[c]}
+CHAMPS_SCALAIRES = {nom for c in CHAMPS_TEXTE for nom in NOMS_SOURCES[c]}
+# Champs textuels dont dépend le SuperNutri-Score (bio lu dans les étiquettes à défaut)
+CHAMPS_SUPERNUTRI = ['ecoscore_grade', COLONNE_BIO, COLONNE_LABELS]
+# (codes Eco-Score, bio) des lignes de CHAMPS_SUPERNUTRI déjà typées, par jeu de champs présents
+CODES_TEXTES = {}
+CODES_TEXTES_MAX = 10_000
+# (grades, règles) par (classe, Eco-Score, bio), calculée une fois pour tous les lots
+TABLE_SUPERNUTRI = table_supernutri()
+
+
+class RequeteInvalide(ValueError):
+    """Corps de requête illisible: réponse 400"""
+
+
+# ============================================================
+# CALCUL D'UN LOT
+# ============================================================
+def _valeurs(produits, nom):
+    """Valeurs du champ `nom` de chaque produit, lues sous un synonyme si le nom canonique manque"""
+    sources = NOMS_SOURCES.get(nom, [nom])
+    if len(sources) == 1:
+        return [p.get(nom) for p in produits]
+    return [p[nom] if nom in p else next((p[s] for s in sources if s in p), None) for p in produits]
+
+
+def _nombres(valeurs):
+    """Colonne float64 des valeurs, construite en une fois (manquant ou vide → NaN)"""
+    try:
+        # Cas courant: nombres, None ou textes numériques, convertis par NumPy en un appel
+        return np.array(valeurs, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Texte vide (ou illisible, hors des requêtes vérifiées par lire_produits): NaN pour ces seules valeurs
+        return pd.to_numeric(pd.Series(valeurs, dtype=object), errors='coerce').to_numpy(np.float64, na_value=np.nan)
+
+
+def _nutriments(produits):
+    """{nutriment: tableau float32} du lot, comme une colonne lue dans un fichier.
+
+    kJ et sodium_g manquants sont déduits des kcal et de sodium_mg avec les
+    mêmes CONVERSIONS que typer_morceau, en float32.
+    """
+    colonnes = {c: _nombres(_valeurs(produits, c)).astype(np.float32) for c in NUTRIMENTS}
+    for col, source, facteur in CONVERSIONS:
+        colonnes[col] = np.where(np.isnan(colonnes[col]), colonnes[source] * facteur, colonnes[col])
+    return colonnes
+
+
+def _codes_supernutri(produits):
+    """(codes Eco-Score, codes bio) du lot, lus comme dans un fichier (typer_morceau puis codes_supernutri).
+
+    Seules les lignes (Eco-Score, bio, étiquettes) encore jamais rencontrées
+    sont typées; leurs codes sont gardés dans CODES_TEXTES (au plus
+    CODES_TEXTES_MAX lignes). Une valeur est lue par son texte, comme dans
+    typer_morceau: 1, 1.0 et True restent distincts. Un champ absent de tout
+    le lot est une colonne absente.
+    """
+    textes = {c: _valeurs(produits, c) for c in CHAMPS_SUPERNUTRI}
+    textes = {c: valeurs for c, valeurs in textes.items() if any(v is not None for v in valeurs)}
+    lignes = list(zip(*([str(v) for v in valeurs] for valeurs in textes.values()))) if textes else [()] * len(produits)
+    connues = CODES_TEXTES.setdefault(tuple(textes), {})
+    nouvelles = [ligne for ligne in set(lignes) if ligne not in connues]
+    if nouvelles:
+        if len(connues) + len(nouvelles) > CODES_TEXTES_MAX:
+            connues.clear()
+        df = typer_morceau(pd.DataFrame(nouvelles, columns=list(textes), index=range(len(nouvelles)), dtype=object))
+        connues.update(zip(nouvelles, zip(*(codes.tolist() for codes in codes_supernutri(df)))))
+    codes = np.array([connues[ligne] for ligne in lignes], dtype=np.int64).reshape(len(lignes), 2)
+    return codes[:, 0], codes[:, 1]
+
+
+def scorer_produits(produits, P):
+    """Scores d'une liste de produits (dicts aux colonnes de Products.csv).
+
+    Mêmes calculs que score_dataframe, sur des tableaux NumPy construits une
+    fois par lot: Nutri-Score 2025 (nutriscore_colonnes), ELECTRE TRI pour
+    chaque λ (critères en float32 comme le catalogue) et SuperNutri (table
+    des règles, indexée comme dans supernutri_catalogue). Noms et valeurs sont
+    lus comme dans un fichier (chargement.SYNONYMES, typer_morceau); un
+    nutriment non renseigné vaut 0, comme un champ des calculateurs.
+    """
+    colonnes = _nutriments(produits)
+
+    def colonne(nom):
+        if nom not in colonnes:
+            return np.full(len(produits), np.nan)
+        return colonnes[nom].astype(np.float64)
+
+    score, grades, valide = nutriscore_colonnes(colonne, manquant=0)
+    X = np.nan_to_num(np.column_stack([colonnes[c] for c in CRITERES]), nan=0)
+    conc = concordances_catalogue(X, P)
+    classes, pess_06 = {}, None
+    for l in LAMBDAS:
+        pess, opt = classes_depuis_concordances(conc, l)
+        classes[f'electre_pess_{suffixe_lambda(l)}'] = libelles(pess).tolist()
+        classes[f'electre_opt_{suffixe_lambda(l)}'] = libelles(opt).tolist()
+        if l == 0.6:
+            pess_06 = pess
+
+    # SuperNutri: table des règles indexée par (classe, Eco-Score, bio)
+    table_grades, table_masques = TABLE_SUPERNUTRI
+    eco, bio = _codes_supernutri(produits)
+    supernutri = GRADES_SUPERNUTRI[table_grades[pess_06, eco, bio]].tolist()
+    masques = table_masques[pess_06, eco, bio]
+    noms_regles = {m: regles_depuis_masque(m) for m in np.unique(masques).tolist()}
+
+    # Réponse: colonnes converties en listes Python une fois, puis lues par indice
+    scores = np.where(valide, score, 0).tolist()
+    valide, grades = valide.tolist(), grades.tolist()
+    resultats = []
+    for i, (p, masque) in enumerate(zip(produits, masques.tolist())):
+        r = {c: p[c] for c in IDENTIFIANTS if c in p}
+        r['nutriscore_score'] = scores[i] if valide[i] else None
+        r['nutriscore_grade'] = grades[i]
+        for nom, valeurs in classes.items():
+            r[nom] = valeurs[i]
+        r['supernutri_score'] = supernutri[i]
+        r['regles'] = noms_regles[masque]
+        resultats.append(r)
+    return resultats
+
+
+def lire_produits(corps, type_contenu):
+    """Corps JSON ou NDJSON → (liste de produits, réponse en NDJSON ?)"""
+    ndjson = type_contenu.split(';')[0].strip().lower() in TYPES_NDJSON
+    try:
+        if ndjson:
+            produits = [json.loads(ligne) for ligne in corps.splitlines() if ligne.strip()]
+        else:
+            produits = json.loads(corps)
+            if isinstance(produits, dict):
+                produits = produits['produits'] if 'produits' in produits else [produits]
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise RequeteInvalide(f"JSON invalide: {e}") from e
+    if not isinstance(produits, list) or not all(isinstance(p, dict) for p in produits):
+        raise RequeteInvalide("attendu: une liste de produits (objets JSON)")
+    verifier_champs(produits)
+    return produits, ndjson
+
+
+def _est_nombre(valeur):
+    """Nombre JSON (pas un booléen), null, ou texte numérique ou vide"""
+    if valeur is None or type(valeur) in (int, float):
+        return True
+    if not isinstance(valeur, str):
+        return False
+    try:
+        float(valeur or 'nan')
+    except ValueError:
+        return False
+    return True
+
+
+def verifier_champs(produits):
+    """RequeteInvalide si un nutriment n'est pas un nombre, ou si un grade, le bio ou les étiquettes sont composés"""
+    for i, p in enumerate(produits):
+        for nom, valeur in p.items():
+            # Cas courant: nombre ou null, valable pour tous les champs
+            if valeur is None or type(valeur) is float or type(valeur) is int:
+                continue
+            if nom in CHAMPS_NUMERIQUES and not _est_nombre(valeur):
+                attendu = "un nombre"
+            elif nom in CHAMPS_SCALAIRES and isinstance(valeur, (list, dict)):
+                attendu = "une valeur simple"
+            else:
+                continue
+            raise RequeteInvalide(f"produit {i}: {nom} doit être {attendu} (reçu {json.dumps(valeur)[:50]})")
+
+
+# ============================================================
+# REGROUPEMENT DES REQUÊTES
+# ============================================================
+class Regroupeur:
+    """Regroupe les produits des requêtes concurrentes et les score en un seul lot"""
+
+    def __init__(self, P, attente=ATTENTE_LOT_S, taille_max=TAILLE_LOT_MAX):
+        self.P = P
+        self.attente = attente
+        self.taille_max = taille_max
+        self.file = asyncio.Queue()
+        self.lots = 0
+        self.produits = 0
+
+    async def scorer(self, produits):
+        futur = asyncio.get_running_loop().create_future()
+        await self.file.put((produits, futur))
+        return await futur
+
+    async def boucle(self):
+        boucle = asyncio.get_running_loop()
+        while True:
+            lot = [await self.file.get()]
+            n = len(lot[0][0])
+            fin = boucle.time() + self.attente
+            while n < self.taille_max:
+                reste = fin - boucle.time()
+                try:
+                    attente = self.file.get_nowait() if reste <= 0 else await asyncio.wait_for(self.file.get(), reste)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                lot.append(attente)
+                n += len(attente[0])
+
+            tous = [p for produits, _ in lot for p in produits]
+            try:
+                resultats = scorer_produits(tous, self.P)
+            except Exception as e:
+                if len(lot) > 1:
+                    # Erreur inattendue: chaque requête est rescorée seule, l'erreur ne revient qu'à la sienne
+                    for produits, futur in lot:
+                        self.scorer_seule(produits, futur)
+                elif not lot[0][1].done():
+                    lot[0][1].set_exception(e)
+                continue
+            self.lots += 1
+            self.produits += len(tous)
+            debut = 0
+            for produits, futur in lot:
+                # Futur annulé si le client s'est déconnecté entre-temps
+                if not futur.done():
+                    futur.set_result(resultats[debut:debut + len(produits)])
+                debut += len(produits)
+
+    def scorer_seule(self, produits, futur):
+        """Score une requête hors lot; une exception est renvoyée à elle seule, le service continue"""
+        if futur.done():
+            return
+        try:
+            resultats = scorer_produits(produits, self.P)
+        except Exception as e:
+            futur.set_exception(e)
+            return
+        self.lots += 1
+        self.produits += len(produits)
+        futur.set_result(resultats)
+
+
+# ============================================================
+# SERVEUR HTTP
+# ============================================================
+STATUTS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           411: 'Length Required', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def reponse(statut, corps, type_contenu='application/json', garder=True):
+    entetes = (f"HTTP/1.1 {statut} {STATUTS[statut]}\r\nContent-Type: {type_contenu}\r\n"
+               f"Content-Length: {len(corps)}\r\nConnection: {'keep-alive' if garder else 'close'}\r\n\r\n")
+    return entetes.encode('latin-1') + corps
+
+
+def erreur(statut, message, garder=True):
+    return reponse(statut, json.dumps({'erreur': message}, ensure_ascii=False).encode(), garder=garder)
+
+
+def empreinte_profils(P):
+    return hashlib.sha256(np.ascontiguousarray(P, dtype=np.float64).tobytes()).hexdigest()
+
+
+class Service:
+    def __init__(self, P):
+        self.regroupeur = Regroupeur(P)
+        self.empreinte_profils = empreinte_profils(P)
+        self.debut = time.time()
+
+    async def traiter(self, methode, chemin, entetes, corps):
+        if chemin == '/sante':
+            # Avec plusieurs processus, compteurs du seul processus qui répond
+            etat = {'statut': 'ok', 'profils': self.empreinte_profils, 'pid': os.getpid(),
+                    'lots': self.regroupeur.lots, 'produits': self.regroupeur.produits,
+                    'depuis_s': round(time.time() - self.debut)}
+            return reponse(200, json.dumps(etat).encode())
+        if chemin != '/score':
+            return erreur(404, f"chemin inconnu: {chemin}")
+        if methode != 'POST':
+            return erreur(405, "utiliser POST /score")
+        try:
+            produits, ndjson = lire_produits(corps, entetes.get('content-type', ''))
+        except RequeteInvalide as e:
+            return erreur(400, str(e))
+        try:
+            resultats = await self.regroupeur.scorer(produits)
+        except Exception as e:
+            return erreur(500, f"{type(e).__name__}: {e}")
+        if ndjson:
+            corps = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in resultats)
+            return reponse(200, corps.encode(), 'application/x-ndjson')
+        return reponse(200, json.dumps({'resultats': resultats}, ensure_ascii=False).encode())
+
+    async def connexion(self, lecteur, ecrivain):
+        """Requêtes successives d'une connexion persistante"""
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    break
+                try:
+                    methode, chemin, version = ligne.decode('latin-1').split()
+                except ValueError:
+                    ecrivain.write(erreur(400, "ligne de requête invalide", garder=False))
+                    break
+                entetes = {}
+                while (ligne := await lecteur.readline()) not in (b'\r\n', b'\n', b''):
+                    nom, _, valeur = ligne.decode('latin-1').partition(':')
+                    entetes[nom.strip().lower()] = valeur.strip()
+                garder = (entetes.get('connection', '').lower() != 'close'
+                          and (version == 'HTTP/1.1' or entetes.get('connection', '').lower() == 'keep-alive'))
+
+                if 'chunked' in entetes.get('transfer-encoding', '').lower():
+                    ecrivain.write(erreur(411, "Content-Length requis", garder=False))
+                    break
+                taille = entetes.get('content-length', '0') or '0'
+                if not taille.isdigit():
+                    ecrivain.write(erreur(400, "Content-Length invalide", garder=False))
+                    break
+                taille = int(taille)
+                if taille > TAILLE_CORPS_MAX:
+                    ecrivain.write(erreur(413, f"corps limité à {TAILLE_CORPS_MAX} octets", garder=False))
+                    break
+                corps = await lecteur.readexactly(taille) if taille else b''
+
+                ecrivain.write(await self.traiter(methode, chemin.split('?')[0], entetes, corps))
+                await ecrivain.drain()
+                if not garder:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            ecrivain.close()
+
+
+async def servir(P, hote=HOTE, port=PORT, pret=None):
+    """Sert sur hote:port. Processus d'un groupe (`pret`: sémaphore libéré une fois à l'écoute): socket SO_REUSEPORT"""
+    service = Service(P)
+    tache = asyncio.create_task(service.regroupeur.boucle())
+    serveur = await asyncio.start_server(service.connexion, hote, port, backlog=1024, reuse_port=pret is not None)
+    if pret is None:
+        port = serveur.sockets[0].getsockname()[1]
+        print(f"Service de scores sur http://{hote}:{port} (profils {service.empreinte_profils[:12]})", flush=True)
+    else:
+        pret.release()
+    async with serveur:
+        try:
+            await serveur.serve_forever()
+        finally:
+            tache.cancel()
+
+
+def _processus(P, hote, port, pret):
+    try:
+        asyncio.run(servir(P, hote, port, pret))
+    except KeyboardInterrupt:
+        pass
+
+
+def servir_processus(P, hote=HOTE, port=PORT, workers=2):
+    """`workers` processus servant le même port, chacun avec son socket SO_REUSEPORT"""
+    # Socket lié mais pas à l'écoute: réserve le port (choisi par le système si 0) sans recevoir de connexions
+    with socket.socket(socket.AF_INET6 if ':' in hote else socket.AF_INET) as reserve:
+        reserve.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        reserve.bind((hote, port))
+        port = reserve.getsockname()[1]
+        pret = multiprocessing.Semaphore(0)
+        processus = [multiprocessing.Process(target=_processus, args=(P, hote, port, pret), daemon=True)
+                     for _ in range(workers)]
+        for p in processus:
+            p.start()
+        for _ in processus:
+            pret.acquire()
+    print(f"Service de scores sur http://{hote}:{port} ({workers} processus, profils {empreinte_profils(P)[:12]})",
+          flush=True)
+    # SIGTERM comme Ctrl+C: les processus du groupe sont arrêtés avec le principal
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for p in processus:
+            p.join()
+    finally:
+        for p in processus:
+            p.terminate()
+
+
+def charger_profils(chemins):
+    """Matrice des profils communs du catalogue formé par `chemins`, comme l'application"""
+    catalogues = {os.path.splitext(os.path.basename(c))[0]: lire_catalogue(c)[0] for c in chemins}
+    return profils_catalogues(catalogues, reprendre=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fichiers', nargs='*', default=FICHIERS,
+                        help="catalogue servant à calculer les profils (défaut: fichiers de l'application)")
+    parser.add_argument('--hote', default=HOTE)
+    parser.add_argument('--port', type=int, default=PORT, help="0: port libre choisi par le système")
+    parser.add_argument('--workers', type=int, default=1, help="processus servant le port (un par cœur)")
+    args = parser.parse_args()
+
+    P = charger_profils(args.fichiers)
+    try:
+        if args.workers > 1:
+            servir_processus(P, args.hote, args.port, args.workers)
+        else:
+            asyncio.run(servir(P, args.hote, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Sketches de quantiles fusionnables (KLL) pour construire les profils ELECTRE.
+
+Un sketch résume un flux de valeurs en O(k) éléments pondérés. Les sketches de
+plusieurs partitions se fusionnent, ce qui permet de calculer les profils
+π1…π6 d'un catalogue hors mémoire en une seule passe de lecture.
+
+Erreur de rang: borne publiée pour KLL avec des capacités en (2/3)^h (Apache
+DataSketches, erreur sur un quantile avec 99 % de confiance):
+ε ≈ COEF_ERREUR / k^EXPOSANT_ERREUR, inversée par k_pour_erreur. Tant que
+le flux tient dans le premier niveau (n ≤ k), les quantiles sont exacts et
+identiques à pandas (interpolation linéaire).
+"""
+import math
+
+import numpy as np
+
+from electre import CRITERES, DEFAUTS_PROFILS, QUANTILES, SENS
+
+# ε(k) = COEF_ERREUR / k^EXPOSANT_ERREUR (DataSketches, KllSketch.getNormalizedRankError, un quantile)
+COEF_ERREUR = 2.296
+EXPOSANT_ERREUR = 0.9723
+K_DEFAUT = 2000
+RATIO_CAPACITE = 2 / 3
+
+
+def k_pour_erreur(erreur):
+    """Taille de sketch pour une erreur de rang cible (ex. 0.001 → 0.1% des produits)"""
+    return max(8, math.ceil((COEF_ERREUR / erreur) ** (1 / EXPOSANT_ERREUR)))
+
+
+class KLLSketch:
+    """Sketch KLL: compacteurs empilés, le niveau h pèse 2^h"""
+
+    def __init__(self, k=K_DEFAUT, seed=None):
+        self.k = k
+        self.n = 0
+        self.niveaux = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacite(self, h):
+        profondeur = len(self.niveaux) - 1 - h
+        return max(2, math.ceil(self.k * RATIO_CAPACITE ** profondeur))
+
+    def ajouter(self, valeurs):
+        """Ajoute un lot de valeurs (les NaN sont ignorés)"""
+        valeurs = np.asarray(valeurs, dtype=np.float64).ravel()
+        valeurs = valeurs[~np.isnan(valeurs)]
+        if len(valeurs):
+            self.n += len(valeurs)
+            self.niveaux[0] = np.concatenate([self.niveaux[0], valeurs])
+            self._compresser()
+        return self
+
+    def fusionner(self, autre):
+        """Fusionne un autre sketch (même k) dans celui-ci"""
+        while len(self.niveaux) < len(autre.niveaux):
+            self.niveaux.append(np.empty(0, dtype=np.float64))
+        for h, niveau in enumerate(autre.niveaux):
+            self.niveaux[h] = np.concatenate([self.niveaux[h], niveau])
+        self.n += autre.n
+        self._compresser()
+        return self
+
+    def _compresser(self):
+        h = 0
+        while h < len(self.niveaux):
+            niveau = self.niveaux[h]
+            if len(niveau) <= self._capacite(h):
+                h += 1
+                continue
+            if h + 1 == len(self.niveaux):
+                self.niveaux.append(np.empty(0, dtype=np.float64))
+            niveau = np.sort(niveau)
+            # Taille impaire: le dernier élément reste au niveau h
+            reste = niveau[len(niveau) - len(niveau) % 2:]
+            paires = niveau[:len(niveau) - len(niveau) % 2]
+            promus = paires[self._rng.integers(2)::2]
+            self.niveaux[h] = reste
+            self.niveaux[h + 1] = np.concatenate([self.niveaux[h + 1], promus])
+            # Ajouter un niveau réduit les capacités des niveaux inférieurs
+            h = 0
+
+    def taille(self):
+        """Nombre d'éléments conservés"""
+        return sum(len(niveau) for niveau in self.niveaux)
+
+    def quantile(self, q):
+        """Quantile approché (interpolation linéaire sur les rangs pondérés)"""
+        if self.n == 0:
+            return float('nan')
+        valeurs = np.concatenate(self.niveaux)
+        poids = np.concatenate([np.full(len(niveau), 2.0 ** h) for h, niveau in enumerate(self.niveaux)])
+        ordre = np.argsort(valeurs, kind='stable')
+        valeurs, poids = valeurs[ordre], poids[ordre]
+        # Rang central de chaque élément; avec des poids 1, identique à pandas
+        centres = np.cumsum(poids) - poids / 2
+        total = poids.sum()
+        return float(np.interp(q * (total - 1) + 0.5, centres, valeurs))
+
+
+class SketchesProfils:
+    """Un sketch par critère, alimenté par morceaux de catalogue"""
+
+    def __init__(self, k=K_DEFAUT, seed=None):
+        self.k = k
+        self.sketches = {crit: KLLSketch(k, seed) for crit in CRITERES}
+
+    def ajouter(self, df):
+        for crit in CRITERES:
+            if crit in df.columns:
+                self.sketches[crit].ajouter(df[crit].to_numpy(dtype=np.float64, na_value=np.nan))
+        return self
+
+    def fusionner(self, autre):
+        for crit in CRITERES:
+            self.sketches[crit].fusionner(autre.sketches[crit])
+        return self
+
+    def profils(self):
+        """Profils π1…π6 au même format que electre.construire_profils.
+
+        Un critère jamais rencontré prend les valeurs par défaut.
+        """
+        profils = {}
+        for i, q in enumerate(QUANTILES, start=1):
+            profils[f"pi{i}"] = {}
+            for crit in CRITERES:
+                sketch = self.sketches[crit]
+                if sketch.n:
+                    profils[f"pi{i}"][crit] = sketch.quantile(q if SENS[crit] == 'max' else 1-q)
+                else:
+                    profils[f"pi{i}"][crit] = DEFAUTS_PROFILS[crit][i-1]
+        return profils
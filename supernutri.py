@@ -0,0 +1,177 @@
+"""CLI de calcul par lots ELECTRE TRI / SuperNutri-Score, sans Streamlit.
+
+Les fichiers d'entrée ont la forme de Products.csv / data_yaourt.csv (CSV,
+Parquet ou JSONL). Les profils π1…π6 sont calculés sur l'ensemble des
+fichiers (comme dans l'application), puis chaque fichier est lu et scoré par
+morceaux de taille bornée.
+
+    python supernutri.py Products.csv data_yaourt.csv --output-dir scores/
+    python supernutri.py catalogue.parquet --format parquet --jobs 8
+    python supernutri.py Products.csv --format xlsx
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from chargement import CONVERSIONS, lire_morceaux_csv, nom_canonique, normaliser_morceau
+from electre import CRITERES, profils_en_tableau
+from export import EXTENSIONS, Ecrivain
+from profils import profils_catalogues
+from scoring import score_dataframe
+from sketches import SketchesProfils, k_pour_erreur
+
+FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet',
+           '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+# Colonnes lues pour les profils: les 8 critères, et celles dont ils sont déduits s'ils manquent
+COLONNES_PROFILS = set(CRITERES) | {source for _, source, _ in CONVERSIONS}
+
+
+def format_fichier(chemin):
+    ext = os.path.splitext(chemin)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Format non reconnu pour {chemin} (attendu: CSV, Parquet ou JSONL)")
+    return FORMATS[ext]
+
+
+# ============================================================
+# LECTURE PAR MORCEAUX
+# ============================================================
+def lire_morceaux(chemin, taille, colonnes=None):
+    """Itère sur le fichier par DataFrames normalisés d'au plus `taille` lignes"""
+    fmt = format_fichier(chemin)
+    if fmt == 'csv':
+        yield from lire_morceaux_csv(chemin, taille, colonnes)
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+        fichier = pq.ParquetFile(chemin)
+        if colonnes is not None:
+            colonnes = [c for c in fichier.schema_arrow.names if nom_canonique(c) in colonnes]
+        for batch in fichier.iter_batches(batch_size=taille, columns=colonnes):
+            yield normaliser_morceau(batch.to_pandas())
+    else:
+        for morceau in pd.read_json(chemin, lines=True, chunksize=taille):
+            if colonnes is not None:
+                morceau = morceau[[c for c in morceau.columns if nom_canonique(c) in colonnes]]
+            yield normaliser_morceau(morceau)
+
+
+def calculer_profils(chemins, taille, erreur_sketch=None):
+    """Profils π1…π6 sur tous les fichiers, en ne lisant que les 8 critères (et leurs CONVERSIONS).
+
+    Les fichiers sont assemblés en un catalogue et les profils calculés comme
+    dans l'application (profils.profils_communs, profils du dernier calcul
+    repris s'ils restent proches): la CLI et l'interface classent avec le même P.
+    Avec `erreur_sketch`, les quantiles sont approchés par des sketches KLL en
+    une passe à mémoire constante au lieu de garder les 8 colonnes en mémoire.
+    """
+    if erreur_sketch is not None:
+        sketches = SketchesProfils(k_pour_erreur(erreur_sketch))
+        for chemin in chemins:
+            for morceau in lire_morceaux(chemin, taille, colonnes=COLONNES_PROFILS):
+                sketches.ajouter(morceau)
+        return profils_en_tableau(sketches.profils())
+
+    catalogues = {}
+    for chemin in chemins:
+        morceaux = list(lire_morceaux(chemin, taille, colonnes=COLONNES_PROFILS))
+        catalogues[chemin] = pd.concat(morceaux, ignore_index=True) if morceaux else pd.DataFrame()
+    return profils_catalogues(catalogues, reprendre=True)
+
+
+# ============================================================
+# CALCUL
+# ============================================================
+def _scorer_morceau(args):
+    morceau, P = args
+    return score_dataframe(morceau, P)
+
+
+def scorer_fichier(chemin, sortie, fmt, P, taille, executeur, jobs):
+    """Score un fichier morceau par morceau, en gardant au plus 2 × jobs morceaux en vol"""
+    ecrivain = Ecrivain(sortie, fmt)
+    n = 0
+    en_vol = []
+    try:
+        for morceau in lire_morceaux(chemin, taille):
+            if executeur is None:
+                resultat = score_dataframe(morceau, P)
+                ecrivain.ecrire(resultat)
+                n += len(resultat)
+                continue
+            en_vol.append(executeur.submit(_scorer_morceau, (morceau, P)))
+            if len(en_vol) >= 2 * jobs:
+                resultat = en_vol.pop(0).result()
+                ecrivain.ecrire(resultat)
+                n += len(resultat)
+        for futur in en_vol:
+            resultat = futur.result()
+            ecrivain.ecrire(resultat)
+            n += len(resultat)
+    finally:
+        ecrivain.fermer()
+    return n
+
+
+def rss_max_mo():
+    """Pic de mémoire résidente (Mo) du processus principal et des workers"""
+    soi = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    enfants = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss est en Ko sous Linux, en octets sous macOS
+    diviseur = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return soi / diviseur, enfants / diviseur
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='supernutri', description="Calcul par lots ELECTRE TRI et SuperNutri-Score")
+    parser.add_argument('entrees', nargs='+', help="fichiers CSV, Parquet ou JSONL")
+    parser.add_argument('--output-dir', default='.', help="dossier de sortie (défaut: .)")
+    parser.add_argument('--format', choices=sorted(EXTENSIONS),
+                        help="format de sortie (défaut: celui de chaque entrée)")
+    parser.add_argument('--chunksize', type=int, default=100_000,
+                        help="lignes par morceau (défaut: 100000)")
+    parser.add_argument('--jobs', type=int, default=1, help="processus de calcul (défaut: 1)")
+    parser.add_argument('--sketch-erreur', type=float, metavar='EPS',
+                        help="profils approchés par sketches KLL avec cette erreur de rang "
+                             "(ex. 0.001), en une passe à mémoire constante")
+    args = parser.parse_args(argv)
+
+    for chemin in args.entrees:
+        format_fichier(chemin)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    debut = time.perf_counter()
+    P = calculer_profils(args.entrees, args.chunksize, args.sketch_erreur)
+    duree_profils = time.perf_counter() - debut
+
+    executeur = ProcessPoolExecutor(args.jobs) if args.jobs > 1 else None
+    total = 0
+    try:
+        for chemin in args.entrees:
+            fmt = args.format or format_fichier(chemin)
+            nom = os.path.splitext(os.path.basename(chemin))[0]
+            sortie = os.path.join(args.output_dir, f"{nom}_scores{EXTENSIONS[fmt]}")
+            t0 = time.perf_counter()
+            n = scorer_fichier(chemin, sortie, fmt, P, args.chunksize, executeur, args.jobs)
+            total += n
+            print(f"{chemin} → {sortie}: {n} lignes en {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+    finally:
+        if executeur is not None:
+            executeur.shutdown()
+
+    duree = time.perf_counter() - debut
+    rss_principal, rss_workers = rss_max_mo()
+    print(f"Profils: {duree_profils:.2f} s | Total: {total} lignes en {duree:.2f} s "
+          f"({total / duree if duree else 0:,.0f} lignes/s) | "
+          f"RSS max: {rss_principal:.0f} Mo (principal), {rss_workers:.0f} Mo (workers)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
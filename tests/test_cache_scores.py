@@ -0,0 +1,55 @@
+"""Cache disque des scores: aller-retour, élagage et entrée « dernier »"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cache_scores import cle_cache, ecrire_scores, elaguer, lire_dernier, lire_scores
+
+pytest.importorskip('pyarrow')
+
+
+def entree(i):
+    tables = {'scores': pd.DataFrame({
+        'product_id': [f"P{i}-{j}" for j in range(3)],
+        'sugar': np.array([1.5, np.nan, 3.25], dtype=np.float32),
+        'electre_pess_06': pd.Categorical(["A'", "C'", "E'"], categories=["A'", "B'", "C'", "D'", "E'"],
+                                          ordered=True),
+    })}
+    tableaux = {'conc': np.arange(36, dtype=np.uint8).reshape(3, 6, 2) + i}
+    return tables, tableaux
+
+
+def test_aller_retour(tmp_path):
+    cle = cle_cache("donnees", np.zeros((6, 8)))
+    tables, tableaux = entree(0)
+    assert ecrire_scores(cle, tables, tableaux, str(tmp_path))
+    # Entrée déjà présente: pas de réécriture
+    assert not ecrire_scores(cle, tables, tableaux, str(tmp_path))
+
+    lues, tableaux_lus = lire_scores(cle, str(tmp_path))
+    pd.testing.assert_frame_equal(lues['scores'], tables['scores'])
+    np.testing.assert_array_equal(tableaux_lus['conc'], tableaux['conc'])
+    assert not tableaux_lus['conc'].flags.writeable
+    assert lire_scores(cle_cache("autres", np.zeros((6, 8))), str(tmp_path)) is None
+
+
+def test_cle_depend_des_profils():
+    P = np.zeros((6, 8))
+    assert cle_cache("donnees", P) == cle_cache("donnees", P.copy())
+    assert cle_cache("donnees", P) != cle_cache("donnees", P + 1)
+
+
+def test_elagage_garde_dernier(tmp_path):
+    repertoire = str(tmp_path)
+    cles = [cle_cache(f"donnees {i}", np.zeros((6, 8))) for i in range(4)]
+    for i, cle in enumerate(cles):
+        ecrire_scores(cle, *entree(i), repertoire)
+        os.utime(os.path.join(repertoire, cle), (i, i))
+    # La dernière écrite est la plus ancienne à l'élagage: elle est tout de même gardée
+    os.utime(os.path.join(repertoire, cles[-1]), (0, 0))
+    supprimees = elaguer(repertoire, garder=1)
+    assert sorted(supprimees) == sorted(cles[:-2])
+    assert sorted(n for n in os.listdir(repertoire) if not n.startswith('dernier')) == sorted(cles[-2:])
+    np.testing.assert_array_equal(lire_dernier(repertoire)[1]['conc'], entree(3)[1]['conc'])
@@ -0,0 +1,57 @@
+"""Mise à jour incrémentale du cube contre une reconstruction complète"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_electre import dataframe_synthetique
+from chargement import typer_morceau
+from cube import construire_cube, cube_incremental
+from electre import construire_profils, profils_en_tableau
+from scoring import score_incremental
+
+
+@pytest.fixture(scope='module')
+def catalogue():
+    rng = np.random.default_rng(0)
+    brut = dataframe_synthetique(2000)
+    brut['category'] = rng.integers(5, size=len(brut)).astype(str)
+    df = typer_morceau(brut.astype({c: 'string' for c in ('nutriscore_grade', 'ecoscore_grade', 'is_organic')}))
+    P = profils_en_tableau(construire_profils(df))
+    return df, P, score_incremental(df, P)
+
+
+def verifier(catalogue, modifie, colonne):
+    df, P, precedent = catalogue
+    nouveau, _, _, rapport = score_incremental(modifie, P, precedent[:3])
+    incremental = cube_incremental(construire_cube(precedent[0], colonne), precedent[0], nouveau,
+                                   rapport['sources'], colonne)
+    complet = construire_cube(nouveau, colonne)
+    np.testing.assert_array_equal(incremental[0], complet[0])
+    assert list(incremental[1]) == list(complet[1])
+    return rapport
+
+
+@pytest.mark.parametrize('colonne', [None, 'category'])
+def test_lignes_modifiees(catalogue, colonne):
+    df = catalogue[0]
+    modifie = df.copy()
+    lignes = np.random.default_rng(1).choice(len(df), 50, replace=False)
+    modifie.loc[lignes, 'sugar'] = (modifie.loc[lignes, 'sugar'] * 3 + 5).astype('float32')
+    rapport = verifier(catalogue, modifie, colonne)
+    assert rapport['recalculees'] == 50
+
+
+@pytest.mark.parametrize('colonne', [None, 'category'])
+def test_lignes_retirees_et_dupliquees(catalogue, colonne):
+    df = catalogue[0]
+    modifie = pd.concat([df.iloc[100:], df.iloc[:30]], ignore_index=True)
+    rapport = verifier(catalogue, modifie, colonne)
+    assert rapport['recalculees'] == 0
+
+
+def test_categorie_nouvelle_et_disparue(catalogue):
+    df = catalogue[0]
+    modifie = df[df['category'] != '0'].reset_index(drop=True)
+    modifie['category'] = modifie['category'].cat.add_categories('nouvelle')
+    modifie.loc[:9, 'category'] = 'nouvelle'
+    verifier(catalogue, modifie, 'category')
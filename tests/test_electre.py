@@ -0,0 +1,37 @@
+"""Version vectorisée d'ELECTRE TRI contre classify_product, produit par produit"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_electre import catalogue_synthetique, verifier_equivalence
+from electre import (CRITERES, LAMBDAS, classes_depuis_concordances, classify_product,
+                     concordances_catalogue, construire_profils, libelles, profils_en_tableau)
+
+
+@pytest.fixture(scope='module')
+def catalogue():
+    X = catalogue_synthetique(500, seed=1)
+    profils = construire_profils(pd.DataFrame(X, columns=CRITERES))
+    return X, profils_en_tableau(profils), profils
+
+
+def test_classer_identique_a_classify_product(catalogue):
+    X, P, profils = catalogue
+    assert verifier_equivalence(X, P, profils) == len(X)
+
+
+@pytest.mark.parametrize('taille_bloc', [1, 7, 1000])
+def test_concordances_par_blocs(catalogue, taille_bloc):
+    X, P, profils = catalogue
+    conc = concordances_catalogue(X, P, taille_bloc)
+    for l in LAMBDAS:
+        pess, opt = classes_depuis_concordances(conc, l)
+        for ligne in range(0, len(X), 25):
+            attendu = classify_product(dict(zip(CRITERES, X[ligne])), profils, l)
+            assert (libelles(pess[ligne]), libelles(opt[ligne])) == attendu
+
+
+def test_valeurs_manquantes(catalogue):
+    _, P, profils = catalogue
+    X = np.full((1, len(CRITERES)), np.nan)
+    assert verifier_equivalence(X, P, profils) == 1